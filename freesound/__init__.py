@@ -6,3 +6,11 @@ from .freesound_filters import *
 from .freesound_fields import *
 from .freesound_descriptors import *
 from .filter_types import *
+from .freesound_layout import *
+from .freesound_crawl import *
+from .freesound_sync import *
+from .freesound_analysis import *
+from .freesound_local_filter import *
+from .freesound_catalogue import *
+from .freesound_similarity import *
+from .freesound_async import *
@@ -53,7 +53,7 @@ class Filter:
 	"""A utility class that allows you to create conditional and range filters
 	"""
 	@classmethod
-	def OR(cls,val1:Any,val2:Any) -> str:
+	def OR(cls,val1:Any,val2:Any,*values:Any) -> str:
 		"""conditional OR
 
 		you should not use this class method outside the `FreeSoundFilters` class parameters.
@@ -62,15 +62,18 @@ class Filter:
 			```
 			>>> FreeSoundFilters(type=Filter.OR('wav','aiff')).aslist
 			'type:(wav OR aiff)'
+			>>> FreeSoundFilters(id=Filter.OR(1234,5678,91011)).aslist
+			'id:(1234 OR 5678 OR 91011)'
 			```
 		Args:
 			val1 (Any): first value
 			val2 (Any): second value
+			values (Any): any further value
 
 		Returns:
 			str: a well-formatted string for the filter url parameter
 		"""
-		return f"^({val1} OR {val2})"
+		return "^(" + " OR ".join(str(value) for value in (val1,val2,*values)) + ")"
 	@classmethod
 	def AND(cls,val1:Any,val2:Any) -> str:
 		"""conditional AND
@@ -0,0 +1,218 @@
+"""
+The module contains the definitions of
+- DescriptorMatrix
+- descriptor_matrix
+
+Utility structures which turn the `analysis` of the search results into a `numpy` matrix of `float32`,
+one row for each sound and one column for each number of the requested descriptors.
+
+It requires the optional dependency `numpy`
+```
+pip install numpy
+```
+
+Descriptors are flattened in the same way for every sound: a number is one column (`lowlevel.average_loudness`),
+a list is one column per element (`lowlevel.mfcc.0`, `lowlevel.mfcc.1`, ...) and a `dict` of statistics is one column
+per statistic, in alphabetical order (`lowlevel.spectral_centroid.mean`, `lowlevel.spectral_centroid.var`, ...).
+A descriptor missing from a sound is `nan` in its row.
+
+Details at:
+-----------
+<https://freesound.org/docs/api/analysis_docs.html>
+
+Usage Example
+-------------
+>>> c.search("piano", fields=Field.analysis, descriptors=FreeSoundDescriptors([Descriptor.lowlevel_mfcc, Descriptor.lowlevel_average_loudness]).aslist)
+>>> m = c.descriptor_matrix()
+>>> m.values.shape
+(15, 14)
+>>> m.row(524545)
+array([...], dtype=float32)
+"""
+from typing import Any, Iterable
+
+try:
+	import numpy
+except ImportError:
+	numpy = None # type:ignore
+
+from .freesound_errors import DataError
+
+
+class DescriptorMatrix:
+	"""The descriptors of many sounds in a single `numpy` matrix
+
+	Args:
+		ids (list[int]): the `id` of the sound of each row
+		columns (list[str]): the name of each column
+		values (numpy.ndarray): a `float32` matrix with a row for each `id` and a column for each name
+
+	Raises:
+		DataError: if an `id` appears more than once
+	"""
+	def __init__(self, ids:list[int], columns:list[str], values:"numpy.ndarray") -> None:
+		self._ids = ids
+		self._columns = columns
+		self._values = values
+		self._index = {sound_id:row for row, sound_id in enumerate(ids)}
+		if len(self._index) != len(ids):
+			raise DataError("Each sound can have only one row in a DescriptorMatrix: some ids are repeated")
+
+	def row(self, sound_id:int) -> "numpy.ndarray":
+		"""
+		Raises:
+			KeyError: if the sound is not in the matrix
+
+		Returns:
+			the descriptors of the sound with `sound_id`
+		"""
+		return self._values[self._index[int(sound_id)]]
+
+	def column(self, name:str) -> "numpy.ndarray":
+		"""
+		Args:
+			name (str): the name of a column or of a descriptor
+
+		Raises:
+			KeyError: if no column has that name
+
+		Returns:
+			the values of the column, or of all the columns of the descriptor, for every sound
+		"""
+		selected = [position for position, column in enumerate(self._columns) if column == name or column.startswith(name + ".")]
+		if not selected:
+			raise KeyError(name)
+		if len(selected) == 1 and self._columns[selected[0]] == name:
+			return self._values[:, selected[0]]
+		return self._values[:, selected]
+
+	@property
+	def ids(self) -> list[int]:
+		return self._ids
+
+	@property
+	def columns(self) -> list[str]:
+		return self._columns
+
+	@property
+	def values(self) -> "numpy.ndarray":
+		return self._values
+
+	@property
+	def index(self) -> dict[int,int]:
+		"""
+		Returns:
+			the row of each `id`
+		"""
+		return self._index
+
+	def __len__(self) -> int:
+		return len(self._ids)
+
+	def __contains__(self, sound_id:object) -> bool:
+		return sound_id in self._index
+
+	def __repr__(self) -> str:
+		return f"<freesound.freesound_analysis.DescriptorMatrix {len(self._ids)} sounds x {len(self._columns)} columns>"
+
+def descriptor_matrix(results:Iterable[dict[str,Any]], descriptors:list[str]|str) -> DescriptorMatrix:
+	"""build a [`DescriptorMatrix`][freesound.freesound_analysis.DescriptorMatrix] out of search results
+
+	Only the results with an `analysis` are part of the matrix, and a sound listed more than once (for example after a `resume`) has a single row, from its first occurrence. `results` is read twice: once to find the shape of each descriptor, once to fill the matrix.
+	A list or a [`SpilledResults`][freesound.freesound_jsonl.SpilledResults] is read twice as it is, an iterator (a generator, a stream of `read_jsonl`) is first collected in a list.
+
+	Args:
+		results (Iterable[dict[str, Any]]): the results of a search, for example `FreeSoundClient.results_list['results']`
+		descriptors (list[str] | str): the descriptors, as a list of [`Descriptor`][freesound.freesound_descriptors.Descriptor] or as a coma-separated string
+
+	Raises:
+		ImportError: if `numpy` is not installed
+		DataError: if a descriptor is not numeric or its length changes from sound to sound
+
+	Returns:
+		the matrix
+	"""
+	_ensure_numpy()
+	if iter(results) is results:
+		# an iterator would be exhausted by the first pass
+		results = list(results)
+	if isinstance(descriptors, str):
+		descriptors = [descriptor for descriptor in descriptors.split(",") if descriptor != ""]
+	paths = [descriptor.split(".") for descriptor in descriptors]
+	# the columns of each descriptor, from the first sound which has it
+	layouts:list[list[str]|None] = [None] * len(paths)
+	seen:set[int] = set()
+	for sound in results:
+		analysis = sound.get('analysis')
+		if not isinstance(analysis, dict) or int(sound['id']) in seen:
+			continue
+		seen.add(int(sound['id']))
+		for position, path in enumerate(paths):
+			if layouts[position] is None:
+				value = _lookup(analysis, path)
+				if value is not None:
+					layouts[position] = _flatten_names(descriptors[position], value)
+	columns:list[str] = []
+	widths:list[int] = []
+	for descriptor, layout in zip(descriptors, layouts):
+		if layout is None:
+			layout = [descriptor]
+		columns.extend(layout)
+		widths.append(len(layout))
+	count = len(seen)
+	values = numpy.full((count, len(columns)), numpy.nan, dtype=numpy.float32)
+	ids:list[int] = []
+	filled:set[int] = set()
+	for sound in results:
+		analysis = sound.get('analysis')
+		if not isinstance(analysis, dict) or int(sound['id']) in filled:
+			continue
+		row = len(ids)
+		if row == count:
+			break
+		ids.append(int(sound['id']))
+		filled.add(int(sound['id']))
+		start = 0
+		for descriptor, path, width in zip(descriptors, paths, widths):
+			value = _lookup(analysis, path)
+			if value is not None:
+				numbers = _flatten_values(value)
+				if len(numbers) != width:
+					raise DataError(f"The descriptor '{descriptor}' of the sound {sound['id']} has {len(numbers)} values instead of {width}: it can not be part of a matrix")
+				values[row, start:start + width] = numbers
+			start += width
+	return DescriptorMatrix(ids, columns, values[:len(ids)])
+
+def _ensure_numpy() -> None:
+	if numpy is None:
+		raise ImportError("The descriptor matrix requires numpy. Install it with 'pip install numpy'")
+
+def _lookup(analysis:dict[str,Any], path:list[str]) -> Any:
+	value:Any = analysis
+	for key in path:
+		if not isinstance(value, dict):
+			return None
+		value = value.get(key)
+		if value is None:
+			return None
+	return value
+
+def _flatten_names(name:str, value:Any) -> list[str]:
+	if isinstance(value, dict):
+		return [column for key in sorted(value) for column in _flatten_names(f"{name}.{key}", value[key])]
+	if isinstance(value, list):
+		return [column for position, item in enumerate(value) for column in _flatten_names(f"{name}.{position}", item)]
+	if isinstance(value, (int, float)):
+		return [name]
+	raise DataError(f"The descriptor '{name}' is not numeric: it can not be part of a matrix")
+
+def _flatten_values(value:Any) -> list[float]:
+	if isinstance(value, dict):
+		return [number for key in sorted(value) for number in _flatten_values(value[key])]
+	if isinstance(value, list):
+		if all(isinstance(item, (int, float)) for item in value):
+			return value
+		return [number for item in value for number in _flatten_values(item)]
+	if isinstance(value, (int, float)):
+		return [value]
+	raise DataError(f"The value {value!r} is not numeric: it can not be part of a matrix")
@@ -16,17 +16,29 @@ The module contains the following functions:
 - `search` - see https://freesound.org/docs/api/resources_apiv2.html#search-resources
 - `get_track_info` - see https://freesound.org/docs/api/resources_apiv2.html#sound-resources
 - `get_next_page` - https://freesound.org/docs/api/resources_apiv2.html#response-sound-list
+- `page_url` - a utility to build the url of any page of a search
 - `download_track` - https://freesound.org/docs/api/resources_apiv2.html#download-sound-oauth2-required
 
 All response from these requests are parsed as `dict[str,Any]`
+
+Every request goes through a shared keep-alive `requests.Session` (see [`configure_session`][freesound.freesound_requests.configure_session])
+so that consecutive calls reuse the same connections to <freesound.org>
 """
-from requests import Response
+from requests import Response, exceptions # type:ignore
 
-from freesound.freesound_requests import make_get_request, make_post_request
-from freesound.freesound_errors import DataError
+from freesound.freesound_requests import get_retry_policy, make_get_request, make_post_request
+from freesound.freesound_errors import DataError, FreesoundError
 from typing import Any
-from urllib.parse import urlparse, parse_qsl
+from urllib.parse import urlencode, urlparse, urlunparse, parse_qsl
+from time import sleep
+import hashlib
 import json
+import os
+
+
+SEARCH_URL = "https://freesound.org/apiv2/search/text/"
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+PART_SUFFIX = ".part"
 
 
 def get_access_token(user_id:str, api_key:str, authorization_code:str) -> dict[str,Any]:
@@ -90,13 +102,13 @@ def get_my_infos(token:str) -> dict[str,Any]:
 		a `dict` containing data listed here: <https://freesound.org/docs/api/resources_apiv2.html#user-instance>
 	"""
 	#TODO implement the User class
-	header = {"Authorization": f"Bearer {token}"}
+	header = _auth_header(token)
 	user_url = "https://freesound.org/apiv2/me/"
-	user_response:Response = make_get_request(user_url,header=header)
+	user_response:Response = make_get_request(user_url,header=header,cache=False)
 	user_info = _parse_response(user_response)
 	return user_info
 
-def search(query:str, token:str,fields:str|None=None,filter:str|None=None,descriptors:str|None=None,sort_by:str='score',page_size:int=15,normalized:int=0) -> dict[str,Any]:
+def search(query:str, token:str,fields:str|None=None,filter:str|None=None,descriptors:str|None=None,sort_by:str='score',page_size:int=15,normalized:int=0,page:int|None=None) -> dict[str,Any]:
 	"""Search in the FreeSound Database
 
 	For a full documentation see: <https://freesound.org/docs/api/resources_apiv2.html#search-resources>
@@ -110,25 +122,16 @@ def search(query:str, token:str,fields:str|None=None,filter:str|None=None,descri
 		sort_by (str, optional): a valid sort paramter
 		page_size (int, optional): the max number of items inside the result array of the response
 		normalized (int, optional): wheteher the analysis values are normalized or not either 0-1
+		page (int | None, optional): which page of the results should be returned, by default the first one
 
 	Returns:
 		a sound list. See: <https://freesound.org/docs/api/resources_apiv2.html#response-sound-list>
 	"""
-	headers: dict[str, str] = {"Authorization": f"Bearer {token}"}
-	fields_list = 'id,name,type'
-	if fields is not None:
-		fields_list += ',' + fields
-
-	params: dict[str, str] = {"query":query,"fields":fields_list,"page_size":str(page_size), "sort":sort_by, "normalized":str(normalized)}
-	
-	if filter is not None and filter != '':
-		params['filter'] = filter
-	
-	if descriptors is not None and descriptors != '':
-		params['descriptors'] = descriptors
-	
-	search_url = "https://freesound.org/apiv2/search/text/"
-	search_response: Response = make_get_request(search_url, header=headers, params=params)
+	headers: dict[str, str] = _auth_header(token)
+	params = _search_params(query,fields,filter,descriptors,sort_by,page_size,normalized)
+	if page is not None:
+		params['page'] = str(page)
+	search_response: Response = make_get_request(SEARCH_URL, header=headers, params=params)
 	search = _parse_response(search_response)
 	return search
 
@@ -146,16 +149,9 @@ def get_track_info(track_id:str,token:str,fields:str|None=None,descriptors:str|N
 	Returns:
 		a dict containing all the info of a SoundInstance. see <https://freesound.org/docs/api/resources_apiv2.html#sound-resources>
 	"""
-	headers: dict[str, str] = {"Authorization": f"Bearer {token}"}
+	headers: dict[str, str] = _auth_header(token)
 	track_info_url:str = f"https://freesound.org/apiv2/sounds/{track_id}/"
-	
-	params:dict[str,Any] = {}
-	if fields is not None and fields != '':
-		params['fields'] = fields
-	
-	if descriptors is not None and descriptors != '':
-		params['descriptors'] = descriptors
-
+	params = _track_info_params(fields,descriptors)
 	file_type_response: Response = make_get_request(track_info_url, header=headers, params=params)
 	file_type = _parse_response(file_type_response)
 	return file_type
@@ -172,29 +168,128 @@ def get_next_page(url:str, token:str) -> dict[str,Any]:
 	Returns:
 		a sound list. See: <https://freesound.org/docs/api/resources_apiv2.html#response-sound-list>
 	"""
-	query: str = urlparse(url).query
-	params = dict(parse_qsl(query))
-	headers: dict[str, str] = {"Authorization": f"Bearer {token}"}
-	next_page_response:Response = make_get_request("https://freesound.org/apiv2/search/text/", header=headers, params=params)
+	params = _next_page_params(url)
+	headers: dict[str, str] = _auth_header(token)
+	next_page_response:Response = make_get_request(SEARCH_URL, header=headers, params=params)
 	next_page = _parse_response(next_page_response)
 	return next_page
 	
-def download_track(track_url:str, token:str) -> Response:
+def page_url(url:str, page:int) -> str:
+	"""A utility function to jump to any page of a search
+
+	Args:
+		url (str): a url retrieved from the `'next'` or `'previous'` field of a search result
+		page (int): the number of the page
+
+	Returns:
+		the same url pointing at `page`, to be used with [`get_next_page()`][freesound.freesound_api.get_next_page]
+	"""
+	parsed = urlparse(url)
+	params = dict(parse_qsl(parsed.query))
+	params['page'] = str(page)
+	return urlunparse(parsed._replace(query=urlencode(params)))
+
+def download_track(track_url:str, token:str, output_path:str, chunk_size:int=DOWNLOAD_CHUNK_SIZE, filesize:int|None=None, md5:str|None=None) -> int:
 	"""Download a track from a url
 
+	The body of the response is streamed in chunks of `chunk_size` bytes to a `.part` file next to `output_path`,
+	which is renamed to `output_path` only once the download is complete.
+	If a `.part` file already exists (for example after an interrupted run) the download is resumed from where it stopped
+	with an HTTP `Range` request. A connection lost while streaming is resumed in the same way following the
+	[`RetryPolicy`][freesound.freesound_retry.RetryPolicy] in use.
+
+	When `md5` is given the checksum is computed while the bytes are written and a corrupted file is downloaded again.
+
 	Args:
 		track_url (str): a valid download url retrieved from a SoundInstance
 		token (str): a valid OAuth2 access token
+		output_path (str): the path of the file where the track should be written
+		chunk_size (int, optional): the size in bytes of the chunks read from the response
+		filesize (int | None, optional): the expected size in bytes of the file (the `filesize` field of a SoundInstance)
+		md5 (str | None, optional): the expected md5 checksum of the file (the `md5` field of a SoundInstance)
+
+	Raises:
+		DataError: if the downloaded file does not match `filesize` or `md5`
 
 	Returns:
-		a `requests.Response` whose `content` can be loaded in a `ByteIO`
+		the size in bytes of the file written to `output_path`
 	"""
-	headers: dict[str, str] = {"Authorization": f"Bearer {token}"}
-	sound_file_response: Response = make_get_request(track_url, header=headers, params={})
-	if sound_file_response.ok:
-		return sound_file_response
-	else:
-		raise DataError(f"Could not Download File. Broken Data")
+	part_path = output_path + PART_SUFFIX
+	policy = get_retry_policy()
+	attempt = 0
+	while True:
+		offset = _resume_offset(part_path, filesize)
+		digest = _part_digest(part_path, offset) if md5 is not None else None
+		if filesize is None or offset < filesize:
+			attempt += 1
+			try:
+				digest = _stream_to_part(track_url, token, part_path, offset, chunk_size, digest)
+			except DataError:
+				# the server refused to resume: start again from the first byte
+				if offset == 0:
+					raise
+				os.remove(part_path)
+				continue
+			except (exceptions.ChunkedEncodingError, exceptions.ConnectionError, exceptions.Timeout) as e:
+				if not policy.should_retry(attempt):
+					raise FreesoundError(f"The download of {track_url} was interrupted {attempt} times: {e}")
+				wait = policy.delay(attempt)
+				print(f"Download interrupted. Resuming in {wait:.1f} seconds")
+				sleep(wait)
+				continue
+		if digest is not None and digest.hexdigest() != str(md5).lower():
+			os.remove(part_path)
+			if not policy.should_retry(attempt):
+				raise DataError(f"The downloaded file {output_path} is broken: its md5 checksum does not match {md5}")
+			print(f"The md5 checksum of {output_path} does not match. Downloading it again")
+			continue
+		break
+	return _finish_part(part_path, output_path, filesize)
+
+def _stream_to_part(track_url:str, token:str, part_path:str, offset:int, chunk_size:int, digest:"hashlib._Hash|None"=None) -> "hashlib._Hash|None":
+	headers: dict[str, str] = _auth_header(token)
+	if offset > 0:
+		headers["Range"] = f"bytes={offset}-"
+	sound_file_response: Response = make_get_request(track_url, header=headers, params={}, stream=True)
+	with sound_file_response:
+		if not sound_file_response.ok:
+			raise DataError(f"Could not Download File. Broken Data")
+		# a server that ignores the Range header sends the whole file again
+		mode = "ab" if offset > 0 and sound_file_response.status_code == 206 else "wb"
+		if mode == "wb" and digest is not None:
+			digest = hashlib.md5()
+		with open(part_path, mode) as file:
+			for chunk in sound_file_response.iter_content(chunk_size=chunk_size):
+				file.write(chunk)
+				if digest is not None:
+					digest.update(chunk)
+	return digest
+
+def _part_digest(part_path:str, offset:int) -> "hashlib._Hash":
+	# the bytes already on disk must be hashed before appending new ones
+	digest = hashlib.md5()
+	if offset > 0:
+		with open(part_path, "rb") as file:
+			for chunk in iter(lambda: file.read(DOWNLOAD_CHUNK_SIZE), b""):
+				digest.update(chunk)
+	return digest
+
+def _resume_offset(part_path:str, filesize:int|None) -> int:
+	if not os.path.exists(part_path):
+		return 0
+	offset = os.path.getsize(part_path)
+	if filesize is not None and offset > filesize:
+		os.remove(part_path)
+		return 0
+	return offset
+
+def _finish_part(part_path:str, output_path:str, filesize:int|None) -> int:
+	size = os.path.getsize(part_path)
+	if filesize is not None and size != filesize:
+		os.remove(part_path)
+		raise DataError(f"The downloaded file {output_path} is broken: expected {filesize} bytes but received {size}")
+	os.replace(part_path, output_path)
+	return size
 
 def _parse_response(response:Response) -> dict[str,Any]:
 	result:dict[str,Any] = {}
@@ -203,3 +298,33 @@ def _parse_response(response:Response) -> dict[str,Any]:
 	except json.JSONDecodeError:
 		raise DataError(f"There was an error parsing the Reponse from {response.url}")
 	return result
+
+def _auth_header(token:str) -> dict[str,str]:
+	return {"Authorization": f"Bearer {token}"}
+
+def _search_params(query:str,fields:str|None,filter:str|None,descriptors:str|None,sort_by:str,page_size:int,normalized:int) -> dict[str,str]:
+	fields_list = 'id,name,type'
+	if fields is not None and fields != '':
+		fields_list += ',' + fields
+
+	params: dict[str, str] = {"query":query,"fields":fields_list,"page_size":str(page_size), "sort":sort_by, "normalized":str(normalized)}
+	
+	if filter is not None and filter != '':
+		params['filter'] = filter
+	
+	if descriptors is not None and descriptors != '':
+		params['descriptors'] = descriptors
+	return params
+
+def _track_info_params(fields:str|None,descriptors:str|None) -> dict[str,str]:
+	params:dict[str,str] = {}
+	if fields is not None and fields != '':
+		params['fields'] = fields
+	
+	if descriptors is not None and descriptors != '':
+		params['descriptors'] = descriptors
+	return params
+
+def _next_page_params(url:str) -> dict[str,str]:
+	query: str = urlparse(url).query
+	return dict(parse_qsl(query))
@@ -0,0 +1,680 @@
+"""The asynchronous Freesound API
+
+This module contains the `asyncio` counterparts of the functions of the [`freesound_api`](api-fs-api.md)
+and the `AsyncFreeSoundClient`, which let hundreds of requests be in flight on a single event loop.
+
+It requires the optional dependency `aiohttp`
+```
+pip install aiohttp
+```
+
+Examples:
+	>>> async with AsyncFreeSoundClient(user_id, api_key) as c:
+	...     await c.search("piano", fields=Field.download)
+	...     await c.download_results("sound_lib", 100)
+
+The module contains the following functions:
+- `async_get_my_infos` - see https://freesound.org/docs/api/resources_apiv2.html#other-resources
+- `async_refresh_access_token` - see https://freesound.org/docs/api/authentication.html#once-you-have-your-access-token
+- `async_search` - see https://freesound.org/docs/api/resources_apiv2.html#search-resources
+- `async_get_track_info` - see https://freesound.org/docs/api/resources_apiv2.html#sound-resources
+- `async_get_next_page` - https://freesound.org/docs/api/resources_apiv2.html#response-sound-list
+- `async_download_track` - https://freesound.org/docs/api/resources_apiv2.html#download-sound-oauth2-required
+
+Every function accepts an optional `aiohttp.ClientSession`: pass one to reuse its connections, otherwise a session is opened for the single call.
+Requests go through the same [`RateLimiter`][freesound.freesound_rate_limiter.RateLimiter] and [`RetryPolicy`][freesound.freesound_retry.RetryPolicy] of the blocking API.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+import hashlib
+import json
+import os
+from typing import Any, AsyncIterator
+
+try:
+	import aiohttp
+except ImportError:
+	aiohttp = None # type:ignore
+
+from .freesound_api import DOWNLOAD_CHUNK_SIZE, PART_SUFFIX, SEARCH_URL, _auth_header, _finish_part, _next_page_params, _part_digest, _resume_offset, _search_params, _track_info_params
+from .freesound_catalogue import SoundCatalogue
+from .freesound_errors import AuthorizationError, DataError, FieldError, FreesoundError
+from .freesound_jsonl import JsonlManifest
+from .freesound_layout import FreeSoundLayout
+from .freesound_requests import get_rate_limiter, get_retry_policy, raise_for_status
+from .freesound_sound import FreeSoundSoundInstance
+from .formatting import error, info, separator, warning
+
+
+async def async_get_my_infos(token:str, session:"aiohttp.ClientSession|None"=None) -> dict[str,Any]:
+	"""get the info about the User identified by `token`
+
+	Args:
+		token (str): a valid OAuth2 access token
+		session (aiohttp.ClientSession | None, optional): the session used to make the request
+
+	Returns:
+		a `dict` containing data listed here: <https://freesound.org/docs/api/resources_apiv2.html#user-instance>
+	"""
+	async with _use_session(session) as s:
+		response = await _send_request(s, "GET", "https://freesound.org/apiv2/me/", headers=_auth_header(token))
+		return await _parse_response(response)
+
+async def async_refresh_access_token(user_id:str, api_key:str, refresh_token:str, session:"aiohttp.ClientSession|None"=None) -> dict[str,Any]:
+	"""Refresh the User "access token" when expired
+
+	Args:
+		user_id (str): your the User id
+		api_key (str): the API key
+		refresh_token (str): the "refresh_token" saved from the [`get_access_token()`][freesound.freesound_api.get_access_token] Response
+		session (aiohttp.ClientSession | None, optional): the session used to make the request
+
+	Returns:
+		a `dict` containing the following keys: `"access_token"`, `"expires_in"`, `"token_type"`, `"scope"`, `"refresh_token"`
+	"""
+	token_params: dict[str, str] = {
+		"client_id": user_id,
+		"client_secret": api_key,
+		"grant_type": "refresh_token",
+		"refresh_token": refresh_token,
+	}
+	async with _use_session(session) as s:
+		response = await _send_request(s, "POST", "https://freesound.org/apiv2/oauth2/access_token/", data=token_params)
+		return await _parse_response(response)
+
+async def async_search(query:str, token:str,fields:str|None=None,filter:str|None=None,descriptors:str|None=None,sort_by:str='score',page_size:int=15,normalized:int=0, session:"aiohttp.ClientSession|None"=None) -> dict[str,Any]:
+	"""Search in the FreeSound Database
+
+	The `asyncio` version of [`search()`][freesound.freesound_api.search]
+
+	Args:
+		query (str): a space-separatad string of words to search in the FreeSound Database
+		token (str): a valid OAuth2 access token
+		fields (str | None, optional): a coma-separated string of fields of a SoundInstance
+		filter (str | None, optional): a space-separated string of valid filter:value
+		descriptors (str | None, optional): a coma-separated string of valid sound analysis descriptors
+		sort_by (str, optional): a valid sort paramter
+		page_size (int, optional): the max number of items inside the result array of the response
+		normalized (int, optional): wheteher the analysis values are normalized or not either 0-1
+		session (aiohttp.ClientSession | None, optional): the session used to make the request
+
+	Returns:
+		a sound list. See: <https://freesound.org/docs/api/resources_apiv2.html#response-sound-list>
+	"""
+	params = _search_params(query,fields,filter,descriptors,sort_by,page_size,normalized)
+	async with _use_session(session) as s:
+		response = await _send_request(s, "GET", SEARCH_URL, headers=_auth_header(token), params=params)
+		return await _parse_response(response)
+
+async def async_get_track_info(track_id:str,token:str,fields:str|None=None,descriptors:str|None=None, session:"aiohttp.ClientSession|None"=None) -> dict[str,Any]:
+	"""Requests infos of a SoundInstance
+
+	The `asyncio` version of [`get_track_info()`][freesound.freesound_api.get_track_info]
+
+	Args:
+		track_id (str): a valid id of a sound in the freesound database
+		token (str): a valid OAuth2 access token
+		fields (str | None, optional): a coma-separated string of fields of a SoundInstance
+		descriptors (str | None, optional): a coma-separated string of valid sound analysis descriptors
+		session (aiohttp.ClientSession | None, optional): the session used to make the request
+
+	Returns:
+		a dict containing all the info of a SoundInstance. see <https://freesound.org/docs/api/resources_apiv2.html#sound-resources>
+	"""
+	track_info_url:str = f"https://freesound.org/apiv2/sounds/{track_id}/"
+	params = _track_info_params(fields,descriptors)
+	async with _use_session(session) as s:
+		response = await _send_request(s, "GET", track_info_url, headers=_auth_header(token), params=params)
+		return await _parse_response(response)
+
+async def async_get_next_page(url:str, token:str, session:"aiohttp.ClientSession|None"=None) -> dict[str,Any]:
+	"""A utility function to handle pagination in sound results
+
+	The `asyncio` version of [`get_next_page()`][freesound.freesound_api.get_next_page]
+
+	Args:
+		url str: a url retrieved from a previous 'search' request
+		token (str): a valid OAuth2 access token
+		session (aiohttp.ClientSession | None, optional): the session used to make the request
+
+	Returns:
+		a sound list. See: <https://freesound.org/docs/api/resources_apiv2.html#response-sound-list>
+	"""
+	params = _next_page_params(url)
+	async with _use_session(session) as s:
+		response = await _send_request(s, "GET", SEARCH_URL, headers=_auth_header(token), params=params)
+		return await _parse_response(response)
+
+async def async_download_track(track_url:str, token:str, output_path:str, chunk_size:int=DOWNLOAD_CHUNK_SIZE, filesize:int|None=None, md5:str|None=None, session:"aiohttp.ClientSession|None"=None) -> int:
+	"""Download a track from a url
+
+	The `asyncio` version of [`download_track()`][freesound.freesound_api.download_track]:
+	the file is written to a `.part` file, resumed with a `Range` request when interrupted, checked against `md5` and renamed once complete
+
+	Args:
+		track_url (str): a valid download url retrieved from a SoundInstance
+		token (str): a valid OAuth2 access token
+		output_path (str): the path of the file where the track should be written
+		chunk_size (int, optional): the size in bytes of the chunks read from the response
+		filesize (int | None, optional): the expected size in bytes of the file (the `filesize` field of a SoundInstance)
+		md5 (str | None, optional): the expected md5 checksum of the file (the `md5` field of a SoundInstance)
+		session (aiohttp.ClientSession | None, optional): the session used to make the request
+
+	Raises:
+		DataError: if the downloaded file does not match `filesize` or `md5`
+
+	Returns:
+		the size in bytes of the file written to `output_path`
+	"""
+	part_path = output_path + PART_SUFFIX
+	policy = get_retry_policy()
+	async with _use_session(session) as s:
+		attempt = 0
+		while True:
+			# the file system is used from a worker thread: hashing a large `.part` file must not stall the other downloads
+			offset = await asyncio.to_thread(_resume_offset, part_path, filesize)
+			digest = await asyncio.to_thread(_part_digest, part_path, offset) if md5 is not None else None
+			if filesize is None or offset < filesize:
+				attempt += 1
+				try:
+					digest = await _stream_to_part(s, track_url, token, part_path, offset, chunk_size, digest)
+				except DataError:
+					if offset == 0:
+						raise
+					await asyncio.to_thread(os.remove, part_path)
+					continue
+				except (aiohttp.ClientPayloadError, aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+					if not policy.should_retry(attempt):
+						raise FreesoundError(f"The download of {track_url} was interrupted {attempt} times: {e!r}")
+					await _wait_before_retry(attempt, "Download interrupted")
+					continue
+			if digest is not None and digest.hexdigest() != str(md5).lower():
+				await asyncio.to_thread(os.remove, part_path)
+				if not policy.should_retry(attempt):
+					raise DataError(f"The downloaded file {output_path} is broken: its md5 checksum does not match {md5}")
+				print(f"The md5 checksum of {output_path} does not match. Downloading it again")
+				continue
+			break
+	return await asyncio.to_thread(_finish_part, part_path, output_path, filesize)
+
+async def _stream_to_part(session:"aiohttp.ClientSession", track_url:str, token:str, part_path:str, offset:int, chunk_size:int, digest:"hashlib._Hash|None"=None) -> "hashlib._Hash|None":
+	headers = _auth_header(token)
+	if offset > 0:
+		headers["Range"] = f"bytes={offset}-"
+	response = await _send_request(session, "GET", track_url, headers=headers)
+	try:
+		mode = "ab" if offset > 0 and response.status == 206 else "wb"
+		if mode == "wb" and digest is not None:
+			digest = hashlib.md5()
+		file = await asyncio.to_thread(open, part_path, mode)
+		try:
+			async for chunk in response.content.iter_chunked(chunk_size):
+				await asyncio.to_thread(_write_chunk, file, chunk, digest)
+		finally:
+			await asyncio.to_thread(file.close)
+	finally:
+		response.release()
+	return digest
+
+def _write_chunk(file:Any, chunk:bytes, digest:"hashlib._Hash|None") -> None:
+	# runs in a worker thread: both the write and the hashing would block the event loop
+	file.write(chunk)
+	if digest is not None:
+		digest.update(chunk)
+
+@asynccontextmanager
+async def _use_session(session:"aiohttp.ClientSession|None") -> "AsyncIterator[aiohttp.ClientSession]":
+	if session is not None:
+		yield session
+		return
+	_ensure_aiohttp()
+	async with aiohttp.ClientSession() as new_session:
+		yield new_session
+
+def _ensure_aiohttp() -> None:
+	if aiohttp is None:
+		raise ImportError("The asynchronous API requires 'aiohttp'. Install it with: pip install aiohttp")
+
+async def _send_request(session:"aiohttp.ClientSession", method:str, url:str, **kwargs:Any) -> "aiohttp.ClientResponse":
+	# mirrors freesound_requests._send_request without blocking the event loop
+	policy = get_retry_policy()
+	limiter = get_rate_limiter()
+	timeout = aiohttp.ClientTimeout(sock_connect=5, sock_read=5)
+	attempt = 0
+	while True:
+		attempt += 1
+		if limiter is not None:
+			await limiter.acquire_async()
+		try:
+			response = await session.request(method, url, timeout=timeout, **kwargs)
+		except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+			if not policy.should_retry(attempt):
+				raise FreesoundError(f"There are problems connecting to freesound.org: {e!r}")
+			await _wait_before_retry(attempt, f"Connection error ({type(e).__name__})")
+			continue
+		if policy.should_retry(attempt, response.status):
+			if response.status == 429 and limiter is not None:
+				limiter.penalize()
+			retry_after = response.headers.get("Retry-After")
+			response.release()
+			await _wait_before_retry(attempt, f"Response {response.status} from {url}", retry_after)
+			continue
+		await _handle_response(response)
+		return response
+
+async def _wait_before_retry(attempt:int, reason:str, retry_after:str|None=None) -> None:
+	policy = get_retry_policy()
+	wait = policy.delay(attempt, retry_after)
+	print(f"{reason}. Retrying in {wait:.1f} seconds (attempt {attempt + 1} of {policy.max_attempts})")
+	await asyncio.sleep(wait)
+
+async def _handle_response(response:"aiohttp.ClientResponse") -> None:
+	print(response.url)
+	if response.status < 400:
+		return
+	details:str|None = None
+	if response.status == 400:
+		try:
+			details = (await response.json(content_type=None))['detail']
+		except (json.JSONDecodeError, KeyError, TypeError):
+			pass
+	response.release()
+	raise_for_status(response.status, str(response.url), response.method, details)
+
+async def _parse_response(response:"aiohttp.ClientResponse") -> dict[str,Any]:
+	try:
+		return await response.json(content_type=None)
+	except json.JSONDecodeError:
+		raise DataError(f"There was an error parsing the Reponse from {response.url}")
+	finally:
+		response.release()
+
+
+class AsyncFreeSoundClient:
+	"""The `asyncio` counterpart of the [`FreeSoundClient`][freesound.freesound_client.FreeSoundClient]
+
+	It shares the [`FreeSoundSoundInstance`][freesound.freesound_sound.FreeSoundSoundInstance] type and accepts the same
+	[`FreeSoundFilters`][freesound.freesound_filters.FreeSoundFilters], [`FreeSoundFields`][freesound.freesound_fields.FreeSoundFields]
+	and [`FreeSoundDescriptors`][freesound.freesound_descriptors.FreeSoundDescriptors] strings.
+	At most `max_concurrency` requests are in flight at the same time, further requests wait for a free slot.
+
+	Unlike the `FreeSoundClient` it never closes the program: errors are raised to the caller.
+	The access token must already exist in `token_file_path` (authorize once with the `FreeSoundClient` to create it).
+
+	Args:
+		user_id (str): the User id
+		api_key (str): the API key
+		download_folder (str | None, optional): the path where sound files should be downloaded.
+		token_file_path (str, optional): the Path to a `json` file containing the user's access token.
+		max_concurrency (int, optional): the maximum number of requests in flight
+		chunk_size (int, optional): the size in bytes of the chunks in which downloaded files are streamed to disk.
+		layout (str, optional): how [`download_results`][freesound.freesound_async.AsyncFreeSoundClient.download_results] arranges the files inside the download folder, one of the [`FreeSoundLayout`][freesound.freesound_layout.FreeSoundLayout] values.
+		catalogue (str | SoundCatalogue | None, optional): a [`SoundCatalogue`][freesound.freesound_catalogue.SoundCatalogue], or the path of its database, where every search result and every download is recorded.
+		results_manifest (str | None, optional): the path of a JSON Lines file where the results of every page are appended as soon as the page is received (see [`JsonlManifest`][freesound.freesound_jsonl.JsonlManifest]).
+		download_manifest (str | None, optional): the path of a JSON Lines file where every downloaded file is appended as soon as it is written.
+
+	Usage:
+		```
+		>>> async with AsyncFreeSoundClient('<your-user-id>','<your-api-key>', 'sound_lib') as c:
+		...     await c.search("piano", fields=Field.download)
+		```
+	"""
+	def __init__(self, user_id:str, api_key:str, download_folder:str|None=None, token_file_path:str="access_token.json", max_concurrency:int=10, chunk_size:int=DOWNLOAD_CHUNK_SIZE, layout:str=FreeSoundLayout.flat, catalogue:"str|SoundCatalogue|None"=None, results_manifest:str|None=None, download_manifest:str|None=None) -> None:
+		if max_concurrency < 1:
+			raise ValueError("max_concurrency must be at least 1")
+		self._user_id = user_id # private
+		self._api_key = api_key # private
+		self._access_token = "" # private
+		self._refresh_token = "" # private
+		self._token_file_path = token_file_path # private
+		self._max_concurrency = max_concurrency # private
+		self._session:"aiohttp.ClientSession|None" = None # private
+		self._semaphore:asyncio.Semaphore|None = None # private
+
+		self._username = "" # read-only
+		self._page_size = 15 # read-only
+		self._results_page:dict[str,Any] = {} # read-only
+		self._results_list:dict[str,Any] = {'results':[], 'timestamp':datetime.now().isoformat(), 'count':0} # read-only
+
+		self._download_count = 0 # read-only
+		self._download_list:dict[str,Any] = {'downloaded-files':[], 'timestamp':datetime.now().isoformat(), 'count':0} # read-only
+		self._download_folder = download_folder if download_folder else "./" # read-write
+		self._chunk_size = chunk_size # read-write
+		self._layout = FreeSoundLayout.validate(layout) # read-write
+		self._pending_paths:set[str] = set() # private
+		self._catalogue = SoundCatalogue(catalogue) if isinstance(catalogue, str) else catalogue # read-only
+		self._results_manifest = JsonlManifest(results_manifest) if results_manifest is not None else None # private
+		self._download_manifest = JsonlManifest(download_manifest) if download_manifest is not None else None # private
+
+	async def connect(self) -> None:
+		"""open the connection pool and load the user's access token
+
+		It is called automatically when the client is used as an `async with` context manager
+
+		Raises:
+			AuthorizationError: if no access token file is found or the token can not be refreshed
+		"""
+		_ensure_aiohttp()
+		self._semaphore = asyncio.Semaphore(self._max_concurrency)
+		self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self._max_concurrency))
+		try:
+			with open(self._token_file_path,"r") as file:
+				token_data = json.load(file)
+		except FileNotFoundError:
+			await self.close()
+			raise AuthorizationError(f"No access token file found at {self._token_file_path}. Authorize once with a FreeSoundClient")
+		self._update_access_data(token_data)
+		try:
+			await self._get_my_infos()
+		except AuthorizationError:
+			print('Refreshing Access Token')
+			token_data = await self._request(async_refresh_access_token(self._user_id, self._api_key, self._refresh_token, session=self._session))
+			self._update_access_data(token_data)
+			with open(self._token_file_path, "w") as file:
+				json.dump(token_data, file)
+			await self._get_my_infos()
+		print(f"AsyncFreeSound Client {self._username} Initialized")
+		separator()
+
+	async def close(self) -> None:
+		"""close every open connection"""
+		if self._session is not None:
+			await self._session.close()
+			self._session = None
+
+	async def __aenter__(self) -> "AsyncFreeSoundClient":
+		await self.connect()
+		return self
+
+	async def __aexit__(self, *args:Any) -> None:
+		await self.close()
+
+	"""
+	API
+	---
+	"""
+	async def search(self, query:str,filter:str='',fields:str='',descriptors:str='',sort_by:str='score',page_size:int=15, normalized:int=0) -> dict[str,Any]:
+		"""wrapper around the [`async_search()`][freesound.freesound_async.async_search] function
+
+		Args:
+			query (str): a string of space-separated word to search into the [Freesound Database](https://www.freesound.org)
+			filter (str, optional): a string of valid filter:value string (see: [`FreeSoundFilters`][freesound.freesound_filters.FreeSoundFilters] for help)
+			fields (str, optional): a coma-separated string of valid `fields` (see: [`FreeSoundFields`][freesound.freesound_fields.FreeSoundFields] for help)
+			descriptors (str, optional): a coma-separated string of valid `descriptors` (see: [`FreeSoundDescriptors`][freesound.freesound_descriptors.FreeSoundDescriptors] for help). This attribute must be used in combination with the field `analysis`
+			sort_by (str, optional): a string defining how the search results should be organised (see: [`FreeSoundFilters`][freesound.freesound_filters.FreeSoundSort] for help)
+			page_size (int, optional): the maximum count of items that should be returned by the search result
+			normalized (int, optional): whether the sound `descriptors` values should be normalized or not
+
+		Returns:
+			a json object representing the Response from the freesound database <https://freesound.org/docs/api/resources_apiv2.html#response>
+		"""
+		if page_size > 150: # see documentation https://freesound.org/docs/api/resources_apiv2.html#response-sound-list
+			warning(f"Page size {page_size} too big. Setting it to 150")
+		print(f"Searching for {query}")
+		self._page_size = min(page_size,150)
+		search_data = await self._request(async_search(query, self._access_token,fields,filter,descriptors,sort_by,self._page_size,normalized, session=self._session))
+		self._results_page = search_data
+		await self._update_result_list(search_data)
+		if search_data["count"] == 0:
+			print("No results found")
+		else:
+			print(f"Found {search_data['count']} results")
+		return search_data
+
+	async def get_track_info(self, track_id:int|str, fields:str|None=None,descriptors:str|None=None) -> FreeSoundSoundInstance:
+		"""wrapper around the [`async_get_track_info()`][freesound.freesound_async.async_get_track_info] function
+
+		Args:
+			track_id (int | str): the `id` of the sound
+			fields (str | None, optional): a coma-separated string of valid `fields`
+			descriptors (str | None, optional): a coma-separated string of valid `descriptors`. This attribute must be used in combination with the field `analysis`
+
+		Returns:
+			an instance of a sound with default or specified `fields`
+		"""
+		track_info = await self._request(async_get_track_info(str(track_id),self._access_token,fields,descriptors, session=self._session))
+		return FreeSoundSoundInstance(track_info)
+
+	async def get_next_page(self, url:str) -> dict[str,Any]:
+		"""wrapper around the [`async_get_next_page()`][freesound.freesound_async.async_get_next_page] function
+
+		Args:
+			url (str): a url retrieved from a previous 'search' request
+
+		Returns:
+			a json object representing the Response from the freesound database <https://freesound.org/docs/api/resources_apiv2.html#response>
+		"""
+		page = await self._request(async_get_next_page(url, self._access_token, session=self._session))
+		self._results_page = page
+		await self._update_result_list(page)
+		return page
+
+	async def download_track(self, url:str, filename:str, outfolder:str|None=None, skip:bool=False, filesize:int|None=None, md5:str|None=None) -> bool:
+		"""wrapper around the [`async_download_track()`][freesound.freesound_async.async_download_track] function
+
+		Args:
+			url (str): the download link for a specific sound
+			filename (str): the name of the file to download
+			outfolder (str | None, optional): the folder where the file should be downloaded
+			skip (bool, optional): skip the file if it already exists, otherwise it is overwritten
+			filesize (int | None, optional): the expected size in bytes of the file, used to validate the download
+			md5 (str | None, optional): the expected md5 checksum of the file, used to validate the download
+
+		Returns:
+			bool: `True` if the file has been downloaded, `False` otherwise
+		"""
+		folder = outfolder if outfolder is not None else self._download_folder
+		os.makedirs(folder, exist_ok=True)
+		out_file = os.path.join(folder, filename.replace('/', '-'))
+		if out_file in self._pending_paths or (skip and os.path.exists(out_file)):
+			warning(f"The File {out_file} already exists... Skipping")
+			return False
+		print(f"Downloading {filename}")
+		self._pending_paths.add(out_file)
+		try:
+			await self._request(async_download_track(url, self._access_token, out_file, self._chunk_size, filesize, md5, session=self._session))
+		finally:
+			self._pending_paths.discard(out_file)
+		return True
+
+	async def download_results(self, output_folder:str|None=None, files_count:int|None=None) -> None:
+		"""download `files_count` audio files into `output_folder`
+
+		The files of each page are downloaded concurrently. A file that fails to download is reported and skipped,
+		while an `AuthorizationError` cancels the other downloads and is raised.
+		The files are arranged in sub-folders according to the [`layout`][freesound.freesound_async.AsyncFreeSoundClient.layout] of the client.
+
+		Args:
+			output_folder (str | None, optional): The name of the output folder.
+			files_count (int | None, optional): how many files should be downloaded. By default all the results of the last search
+		"""
+		if output_folder is not None:
+			self._download_folder = output_folder
+		max_value = self._results_page['count']
+		self._download_count = max_value if files_count is None else min(files_count, max_value)
+		if self._download_count == 0:
+			print("Nothing to Download")
+			return
+		print(f"Downloading {self._download_count} files of {max_value}")
+		separator()
+		downloaded_count = 0
+		while downloaded_count < self._download_count:
+			pending:list[dict[str,Any]] = list(self._results_page['results'])
+			while pending and downloaded_count < self._download_count:
+				batch = pending[:self._download_count - downloaded_count]
+				pending = pending[len(batch):]
+				outcomes = await self._gather_downloads(batch)
+				downloaded:list[tuple[dict[str,Any],str]] = []
+				for sound, path in zip(batch, outcomes):
+					if path is not None:
+						downloaded_count += 1
+						self._update_download_list(sound, downloaded_count, path)
+						downloaded.append((sound, path))
+				await self._record_downloads(downloaded)
+				info(f"Downloaded Files: {downloaded_count} of {self._download_count}")
+			if downloaded_count < self._download_count:
+				if self._results_page['next'] is None:
+					break
+				await self.get_next_page(self._results_page['next'])
+		info("Done Downloading")
+
+	async def _gather_downloads(self, batch:list[dict[str,Any]]) -> list[str|None]:
+		# the failures of single files are reported by `_download_result`, anything it raises (an `AuthorizationError`)
+		# concerns every request: the other downloads are cancelled instead of hitting the API with the same error
+		tasks = [asyncio.ensure_future(self._download_result(sound)) for sound in batch]
+		try:
+			return await asyncio.gather(*tasks)
+		except BaseException:
+			for task in tasks:
+				task.cancel()
+			await asyncio.gather(*tasks, return_exceptions=True)
+			raise
+
+	async def _download_result(self, sound:dict[str,Any]) -> str|None:
+		# returns the path of the downloaded file relative to the download folder
+		try:
+			parsed_sound = FreeSoundSoundInstance(sound)
+			relative_path = FreeSoundLayout.relative_path(self._layout, parsed_sound)
+			folder, filename = os.path.split(os.path.join(self._download_folder, relative_path))
+			downloaded = await self.download_track(parsed_sound.ensure_value('download'), filename, folder, skip=True, filesize=parsed_sound.filesize, md5=parsed_sound.md5)
+			return relative_path if downloaded else None
+		except (FreesoundError, DataError, FieldError, aiohttp.ClientError, OSError) as e:
+			error(f"Could not download {sound.get('name', sound.get('id'))}: {e}")
+			return None
+
+	async def _get_my_infos(self) -> dict[str,Any]:
+		print("Getting Client Info")
+		user_data = await self._request(async_get_my_infos(self._access_token, session=self._session))
+		self._username = user_data['username']
+		return user_data
+
+	async def _request(self, coroutine:Any) -> Any:
+		if self._semaphore is None or self._session is None:
+			coroutine.close()
+			raise FreesoundError("The AsyncFreeSoundClient is not connected. Use 'async with' or call connect() first")
+		try:
+			async with self._semaphore:
+				return await coroutine
+		finally:
+			# a request cancelled while waiting for a free slot never started its coroutine
+			coroutine.close()
+
+	def _update_access_data(self, access_data:dict[str,Any]) -> None:
+		access_token: str | None = access_data.get('access_token')
+		refresh_token: str | None = access_data.get('refresh_token')
+		if access_token is None or refresh_token is None:
+			raise AuthorizationError("The access data provided is not valid")
+		self._access_token = access_token
+		self._refresh_token = refresh_token
+
+	async def _update_result_list(self, list:dict[str,Any]):
+		self._results_list['count'] += len(list['results'])
+		self._results_list['timestamp'] = datetime.now().isoformat()
+		self._results_list['results'].extend(list['results'])
+		# the catalogue and the manifest write to disk: they must not block the event loop
+		if self._catalogue is not None:
+			await asyncio.to_thread(self._catalogue.upsert, list['results'])
+		if self._results_manifest is not None:
+			await asyncio.to_thread(self._results_manifest.extend, list['results'])
+
+	def _update_download_list(self, sound_obj:dict[str,Any], count:int, path:str|None=None):
+		self._download_list['count'] = count
+		self._download_list['timestamp'] = datetime.now().isoformat()
+		self._download_list['layout'] = self._layout
+		# the path is relative to the download folder
+		self._download_list['downloaded-files'].append(sound_obj if path is None else {**sound_obj, 'path':path})
+
+	async def _record_downloads(self, downloads:list[tuple[dict[str,Any],str]]):
+		# the files downloaded together are written to the manifest and the catalogue at once, outside the event loop
+		if not downloads:
+			return
+		if self._download_manifest is not None:
+			await asyncio.to_thread(self._download_manifest.extend, [{**sound, 'path':path} for sound, path in downloads])
+		if self._catalogue is not None:
+			await asyncio.to_thread(self._catalogue.set_paths, [(sound, os.path.join(self._download_folder, path)) for sound, path in downloads])
+
+	"""
+	PROPERTIES
+	----------
+	"""
+	@property # read-only
+	def username(self) -> str:
+		"""read-only
+
+		Returns:
+			the username associated with this `AsyncFreeSoundClient`
+		"""
+		return self._username
+
+	@property # read-only
+	def page_size(self) -> int:
+		"""read-only
+
+		Returns:
+			the maximum count of items returned by the last search
+		"""
+		return self._page_size
+
+	@property # read-only
+	def results_list(self) -> dict[str,Any]:
+		"""read-only
+
+		Returns:
+			a `json` object containing the responses of every search page fetched so far
+		"""
+		return self._results_list
+
+	@property # read-only
+	def download_count(self) -> int:
+		"""read-only
+
+		Returns:
+			how many files should be downloaded by the last [`download_results`][freesound.freesound_async.AsyncFreeSoundClient.download_results]
+		"""
+		return self._download_count
+
+	@property # read-only
+	def download_list(self) -> dict[str,Any]:
+		"""read-only
+
+		Returns:
+			a detailed list of the downloaded files in `json` format
+		"""
+		return self._download_list
+
+	@property
+	def download_folder(self) -> str:
+		"""
+		Returns:
+			the name of the folder where audio files should be downladed
+		"""
+		return self._download_folder
+
+	@download_folder.setter
+	def download_folder(self, path:str) -> None:
+		self._download_folder = path if path != "" else "./"
+
+	@property # read-only
+	def catalogue(self) -> SoundCatalogue|None:
+		"""read-only
+
+		Returns:
+			the [`SoundCatalogue`][freesound.freesound_catalogue.SoundCatalogue] of the client, `None` if it has none
+		"""
+		return self._catalogue
+
+	@property
+	def layout(self) -> str:
+		"""
+		Returns:
+			the [`FreeSoundLayout`][freesound.freesound_layout.FreeSoundLayout] of the download folder
+		"""
+		return self._layout
+
+	@layout.setter
+	def layout(self, layout:str) -> None:
+		self._layout = FreeSoundLayout.validate(layout)
+
+	def __repr__(self) -> str:
+		return f"<freesound.freesound_async.AsyncFreeSoundClient {self._username}>"
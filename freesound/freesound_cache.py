@@ -0,0 +1,219 @@
+"""
+The module contains the definitions of
+- CachedResponse
+- ResponseCache (the Base class of the response caches)
+- SQLiteCache
+
+Utility structures which store the responses of the GET requests made to <freesound.org>, so that identical
+`search` and `get_track_info` calls are answered locally without spending rate-limit budget.
+The cache used by the [`freesound_api`](api-fs-api.md) is set with [`configure_cache`][freesound.freesound_requests.configure_cache].
+
+Requests are identified by their method, url and parameters: the `Authorization` header is never part of the key.
+Downloads and requests about the authenticated user are never cached.
+
+Usage Example
+-------------
+>>> configure_cache(SQLiteCache("freesound_cache.sqlite", ttl=24 * 60 * 60))
+>>> search("piano", token) # network
+>>> search("piano", token) # cache
+"""
+from abc import ABC, abstractmethod
+from hashlib import sha256
+import json
+import os
+import sqlite3
+from threading import Lock
+from time import time
+from typing import Any
+
+from requests import Response # type:ignore
+from requests.structures import CaseInsensitiveDict # type:ignore
+from requests.utils import get_encoding_from_headers # type:ignore
+
+
+class CachedResponse:
+	"""The part of a `requests.Response` that is stored in a [`ResponseCache`][freesound.freesound_cache.ResponseCache]
+
+	Args:
+		url (str): the url of the response
+		status_code (int): the HTTP status code
+		headers (dict[str, str]): the HTTP headers
+		body (bytes): the content of the response
+		stored_at (float | None, optional): when the response was stored or last revalidated, by default now
+	"""
+	def __init__(self, url:str, status_code:int, headers:dict[str,str], body:bytes, stored_at:float|None=None) -> None:
+		self.url = url
+		self.status_code = status_code
+		self.headers = headers
+		self.body = body
+		self.stored_at = stored_at if stored_at is not None else time()
+
+	@classmethod
+	def from_response(cls, response:Response) -> "CachedResponse":
+		return cls(response.url, response.status_code, dict(response.headers), response.content)
+
+	@property
+	def etag(self) -> str|None:
+		return CaseInsensitiveDict(self.headers).get("ETag")
+
+	@property
+	def last_modified(self) -> str|None:
+		return CaseInsensitiveDict(self.headers).get("Last-Modified")
+
+	def to_response(self) -> Response:
+		"""
+		Returns:
+			a `requests.Response` equivalent to the one that was stored
+		"""
+		response = Response()
+		response.url = self.url
+		response.status_code = self.status_code
+		response.headers = CaseInsensitiveDict(self.headers)
+		response.encoding = get_encoding_from_headers(response.headers)
+		response._content = self.body
+		return response
+
+	def __repr__(self) -> str:
+		return f"<freesound.freesound_cache.CachedResponse {self.url}>"
+
+class ResponseCache(ABC):
+	"""The Base class of the response caches
+
+	Subclasses must implement `get`, `set`, `touch` and `clear`: a subclass missing any of them can not be instantiated
+
+	Args:
+		ttl (float, optional): how many seconds a stored response is used without asking the server
+	"""
+	def __init__(self, ttl:float=3600) -> None:
+		self.ttl = ttl
+
+	def key(self, method:str, url:str, params:dict[str,Any]) -> str:
+		"""
+		Args:
+			method (str): the HTTP method
+			url (str): the url of the request
+			params (dict[str, Any]): the query parameters of the request
+
+		Returns:
+			the key of the request inside the cache
+		"""
+		identity = json.dumps([method.upper(), url, sorted((str(k), str(v)) for k, v in params.items())])
+		return sha256(identity.encode()).hexdigest()
+
+	def is_fresh(self, entry:CachedResponse) -> bool:
+		"""
+		Returns:
+			`True` if `entry` is younger than `ttl` and can be used without revalidation
+		"""
+		return time() - entry.stored_at < self.ttl
+
+	@abstractmethod
+	def get(self, key:str) -> CachedResponse|None:
+		"""
+		Returns:
+			the response stored under `key`, `None` if there is none
+		"""
+
+	@abstractmethod
+	def set(self, key:str, entry:CachedResponse) -> None:
+		"""store `entry` under `key`"""
+
+	@abstractmethod
+	def touch(self, key:str) -> None:
+		"""mark the response stored under `key` as fresh after a successful revalidation"""
+
+	@abstractmethod
+	def clear(self) -> None:
+		"""remove every stored response"""
+
+class SQLiteCache(ResponseCache):
+	"""A [`ResponseCache`][freesound.freesound_cache.ResponseCache] stored in a SQLite database on disk
+
+	When the total size of the stored bodies grows over `max_size` the least recently used responses are removed.
+	Stale responses are revalidated with `If-None-Match`/`If-Modified-Since` when the server sent an `ETag` or a `Last-Modified` header.
+
+	Args:
+		path (str, optional): the path of the database file
+		ttl (float, optional): how many seconds a stored response is used without asking the server
+		max_size (int, optional): the maximum size in bytes of the stored bodies
+
+	Usage:
+		```py
+		>>> configure_cache(SQLiteCache("freesound_cache.sqlite", ttl=3600, max_size=200 * 1024 * 1024))
+		```
+	"""
+	def __init__(self, path:str="freesound_cache.sqlite", ttl:float=3600, max_size:int=100 * 1024 * 1024) -> None:
+		super().__init__(ttl)
+		self._path = path
+		self._max_size = max_size
+		self._lock = Lock()
+		folder = os.path.dirname(path)
+		if folder != "":
+			os.makedirs(folder, exist_ok=True)
+		self._connection = sqlite3.connect(path, check_same_thread=False)
+		with self._lock, self._connection:
+			self._connection.execute(
+				"CREATE TABLE IF NOT EXISTS responses ("
+				"key TEXT PRIMARY KEY, url TEXT, status INTEGER, headers TEXT, body BLOB, "
+				"stored_at REAL, accessed_at REAL, size INTEGER)"
+			)
+			self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+
+	def get(self, key:str) -> CachedResponse|None:
+		with self._lock, self._connection:
+			row = self._connection.execute(
+				"SELECT url, status, headers, body, stored_at FROM responses WHERE key = ?", (key,)
+			).fetchone()
+			if row is None:
+				return None
+			self._connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time(), key))
+		url, status, headers, body, stored_at = row
+		return CachedResponse(url, status, json.loads(headers), body, stored_at)
+
+	def set(self, key:str, entry:CachedResponse) -> None:
+		if len(entry.body) > self._max_size:
+			return
+		now = time()
+		with self._lock, self._connection:
+			self._connection.execute(
+				"INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+				(key, entry.url, entry.status_code, json.dumps(entry.headers), entry.body, entry.stored_at, now, len(entry.body)),
+			)
+			self._evict()
+
+	def touch(self, key:str) -> None:
+		now = time()
+		with self._lock, self._connection:
+			self._connection.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+
+	def clear(self) -> None:
+		with self._lock, self._connection:
+			self._connection.execute("DELETE FROM responses")
+
+	def close(self) -> None:
+		with self._lock:
+			self._connection.close()
+
+	@property
+	def size(self) -> int:
+		"""
+		Returns:
+			the total size in bytes of the stored bodies
+		"""
+		with self._lock:
+			return self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+	def _evict(self) -> None:
+		total:int = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+		if total <= self._max_size:
+			return
+		expired:list[str] = []
+		for key, size in self._connection.execute("SELECT key, size FROM responses ORDER BY accessed_at ASC"):
+			if total <= self._max_size:
+				break
+			expired.append(key)
+			total -= size
+		self._connection.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key in expired])
+
+	def __repr__(self) -> str:
+		return f"<freesound.freesound_cache.SQLiteCache {self._path}>"
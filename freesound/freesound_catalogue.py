@@ -0,0 +1,301 @@
+"""
+The module contains the definition of the SoundCatalogue
+
+A utility structure which keeps every sound seen by a [`FreeSoundClient`][freesound.freesound_client.FreeSoundClient]
+in a SQLite database on disk, so that millions of sounds can be stored and queried locally without loading them in memory.
+
+Each sound is stored once, by `id`: the fields of a new search result are merged with the ones already stored.
+The columns `md5`, `type`, `samplerate`, `duration`, `created`, `username` and `pack` are indexed,
+the `tags` are stored in a side table, and the `path` of the downloaded file is recorded by
+[`download_results`][freesound.freesound_client.FreeSoundClient.download_results].
+
+Usage Example
+-------------
+>>> c = FreeSoundClient(USER_ID, API_KEY, catalogue="sounds.sqlite")
+>>> c.search("piano", fields=Field.download, page_size=150)
+>>> c.get_all_pages()
+>>> for sound in c.catalogue.find(type="wav", tag="piano", duration=Filter.RANGE(1, 5)):
+...     print(sound.name)
+"""
+import json
+import os
+import sqlite3
+from threading import Lock
+from time import time
+from typing import Any, Iterable, Iterator
+
+from .freesound_errors import DataError
+from .freesound_filters import FreeSoundFilters
+from .freesound_local_filter import LocalFilter
+from .freesound_sound import FreeSoundSoundInstance
+
+# the columns of the `sounds` table which can be used by `find`, with the field they are read from
+INDEXED_COLUMNS = {'md5':'md5', 'type':'type', 'samplerate':'samplerate', 'duration':'duration', 'created':'created', 'username':'username', 'pack':'pack_name'}
+# the rows read from the database at once by `find`
+FETCH_SIZE = 1000
+# the most `?` parameters of a single statement, below the limit of old SQLite versions
+MAX_VARIABLES = 900
+
+class SoundCatalogue:
+	"""A persistent catalogue of sounds stored in the SQLite database at `path`
+
+	It can be shared by several threads.
+
+	Args:
+		path (str, optional): the path of the database file
+
+	Usage:
+		```py
+		>>> catalogue = SoundCatalogue("sounds.sqlite")
+		>>> catalogue.upsert(c.results_list['results'])
+		150
+		>>> catalogue.get(524545).name
+		'Piano12.wav'
+		```
+	"""
+	def __init__(self, path:str="freesound_catalogue.sqlite") -> None:
+		self._path = path
+		self._lock = Lock()
+		folder = os.path.dirname(path)
+		if folder != "":
+			os.makedirs(folder, exist_ok=True)
+		self._connection = sqlite3.connect(path, check_same_thread=False)
+		with self._lock, self._connection:
+			self._connection.execute("PRAGMA journal_mode=WAL")
+			# with WAL a crash can lose the last transactions but never corrupts the database
+			self._connection.execute("PRAGMA synchronous=NORMAL")
+			self._connection.execute(
+				"CREATE TABLE IF NOT EXISTS sounds ("
+				"id INTEGER PRIMARY KEY, md5 TEXT, type TEXT, samplerate INTEGER, duration REAL, created TEXT, "
+				"username TEXT, pack TEXT, path TEXT, data TEXT NOT NULL, updated_at REAL)"
+			)
+			self._connection.execute("CREATE TABLE IF NOT EXISTS tags (tag TEXT NOT NULL, sound_id INTEGER NOT NULL, PRIMARY KEY (tag, sound_id)) WITHOUT ROWID")
+			self._connection.execute("CREATE INDEX IF NOT EXISTS tags_sound_id ON tags (sound_id)")
+			for column in INDEXED_COLUMNS:
+				self._connection.execute(f"CREATE INDEX IF NOT EXISTS sounds_{column} ON sounds ({column})")
+
+	def upsert(self, sounds:Iterable[dict[str,Any]]) -> int:
+		"""store `sounds` or update the ones already in the catalogue
+
+		The fields of each sound are merged with the stored ones, and its tags are replaced when `tags` is one of its fields.
+
+		Args:
+			sounds (Iterable[dict[str, Any]]): search results, each with at least an `id` and a `name`
+
+		Returns:
+			the number of sounds written
+		"""
+		batch = [sound for sound in sounds if 'id' in sound]
+		if not batch:
+			return 0
+		with self._lock, self._connection:
+			self._write(batch)
+		return len(batch)
+
+	def set_path(self, sound:dict[str,Any], path:str) -> None:
+		"""store `sound` and the `path` of its downloaded file, in a single transaction"""
+		self.set_paths([(sound, path)])
+
+	def set_paths(self, downloads:Iterable[tuple[dict[str,Any],str]]) -> None:
+		"""like [`set_path`][freesound.freesound_catalogue.SoundCatalogue.set_path] for many sounds, in a single transaction
+
+		Args:
+			downloads (Iterable[tuple[dict[str, Any], str]]): each sound with the path of its downloaded file
+		"""
+		pairs = list(downloads)
+		if not pairs:
+			return
+		with self._lock, self._connection:
+			self._write([sound for sound, _ in pairs])
+			self._connection.executemany("UPDATE sounds SET path = ? WHERE id = ?", [(path, int(sound['id'])) for sound, path in pairs])
+
+	def get(self, sound_id:int) -> FreeSoundSoundInstance|None:
+		"""
+		Returns:
+			the sound with `sound_id`, `None` if it is not in the catalogue
+		"""
+		with self._lock:
+			row = self._connection.execute("SELECT data FROM sounds WHERE id = ?", (int(sound_id),)).fetchone()
+		return FreeSoundSoundInstance(json.loads(row[0])) if row is not None else None
+
+	def downloaded_path(self, sound_id:int) -> str|None:
+		"""
+		Returns:
+			the path of the downloaded file of the sound with `sound_id`, `None` if it has not been downloaded
+		"""
+		with self._lock:
+			row = self._connection.execute("SELECT path FROM sounds WHERE id = ?", (int(sound_id),)).fetchone()
+		return row[0] if row is not None else None
+
+	def find(self, filter:"str|FreeSoundFilters|LocalFilter|None"=None, tag:str|list[str]|None=None, downloaded:bool|None=None, order_by:str="id", limit:int|None=None, **columns:Any) -> Iterator[FreeSoundSoundInstance]:
+		"""lazily yield the sounds of the catalogue matching the conditions
+
+		The conditions on the indexed columns and on the tags are answered by the indexes of the database.
+		A `filter` is evaluated on the sounds they select (see: [`LocalFilter`][freesound.freesound_local_filter.LocalFilter]).
+
+		Args:
+			filter (str | FreeSoundFilters | LocalFilter | None, optional): a string of valid filter:value evaluated locally
+			tag (str | list[str] | None, optional): a tag, or a list of tags which must all be present
+			downloaded (bool | None, optional): only the sounds which have (`True`) or have not (`False`) been downloaded
+			order_by (str, optional): `id` or an indexed column, followed by `desc` for a decreasing order (`"created desc"`)
+			limit (int | None, optional): the maximum number of sounds
+			columns (Any): a value for any of `md5`, `type`, `samplerate`, `duration`, `created`, `username` and `pack`. A range is written with [`Filter.RANGE`][freesound.filter_types.Filter.RANGE], [`Filter.AT_LEAST`][freesound.filter_types.Filter.AT_LEAST] or [`Filter.UP_TO`][freesound.filter_types.Filter.UP_TO]
+
+		Raises:
+			DataError: if a column is not indexed
+
+		Usage:
+			```py
+			>>> sounds = catalogue.find(username="Jovica", samplerate=48000, created=Filter.AT_LEAST("2020-01-01T00:00:00"))
+			>>> [(sound.id, sound.name) for sound in sounds] # FreeSoundSoundInstance objects
+			[(524545, 'Piano12.wav'), ...]
+			```
+		"""
+		conditions:list[str] = []
+		parameters:list[Any] = []
+		for column, value in columns.items():
+			if column not in INDEXED_COLUMNS:
+				raise DataError(f"'{column}' is not an indexed column of the catalogue. Use one of {', '.join(INDEXED_COLUMNS)} or a filter")
+			self._add_condition(conditions, parameters, column, value)
+		for value in ([tag] if isinstance(tag, str) else tag or []):
+			conditions.append("id IN (SELECT sound_id FROM tags WHERE tag = ?)")
+			parameters.append(value.lower())
+		if downloaded is not None:
+			conditions.append("path IS NOT NULL" if downloaded else "path IS NULL")
+		order = order_by.split()
+		if order[0] not in ("id", *INDEXED_COLUMNS) or len(order) > 2 or (len(order) == 2 and order[1].lower() not in ("asc", "desc")):
+			raise DataError(f"Can not order the catalogue by '{order_by}'")
+		sql = "SELECT data FROM sounds"
+		if conditions:
+			sql += " WHERE " + " AND ".join(conditions)
+		sql += " ORDER BY " + " ".join(order)
+		predicate = None if filter is None else filter if isinstance(filter, LocalFilter) else LocalFilter(filter)
+		# without a filter the limit is applied by the database
+		if limit is not None and predicate is None:
+			sql += " LIMIT ?"
+			parameters.append(limit)
+		return self._select(sql, parameters, predicate, limit)
+
+	def count(self, **columns:Any) -> int:
+		"""
+		Args:
+			columns (Any): the same conditions on the indexed columns as [`find`][freesound.freesound_catalogue.SoundCatalogue.find]
+
+		Returns:
+			the number of sounds matching the conditions
+		"""
+		conditions:list[str] = []
+		parameters:list[Any] = []
+		for column, value in columns.items():
+			if column not in INDEXED_COLUMNS:
+				raise DataError(f"'{column}' is not an indexed column of the catalogue. Use one of {', '.join(INDEXED_COLUMNS)}")
+			self._add_condition(conditions, parameters, column, value)
+		sql = "SELECT COUNT(*) FROM sounds" + (" WHERE " + " AND ".join(conditions) if conditions else "")
+		with self._lock:
+			return self._connection.execute(sql, parameters).fetchone()[0]
+
+	def tags(self, sound_id:int) -> list[str]:
+		"""
+		Returns:
+			the tags of the sound with `sound_id`
+		"""
+		with self._lock:
+			return [row[0] for row in self._connection.execute("SELECT tag FROM tags WHERE sound_id = ? ORDER BY tag", (int(sound_id),))]
+
+	def close(self) -> None:
+		with self._lock:
+			self._connection.close()
+
+	def _write(self, batch:list[dict[str,Any]]) -> None:
+		# the caller holds the lock and the transaction
+		now = time()
+		stored = self._stored_data([int(sound['id']) for sound in batch])
+		rows:list[tuple[Any,...]] = []
+		tagged:list[int] = []
+		tags:list[tuple[str,int]] = []
+		for sound in batch:
+			sound_id = int(sound['id'])
+			data = {**stored.get(sound_id, {}), **sound}
+			stored[sound_id] = data
+			values = [data.get(field) for field in INDEXED_COLUMNS.values()]
+			# the dates are compared as text, always without the final Z
+			values[4] = str(values[4]).rstrip('Z') if values[4] is not None else None
+			rows.append((sound_id, *values, json.dumps(data), now))
+			if isinstance(sound.get('tags'), list):
+				tagged.append(sound_id)
+				tags.extend((str(tag).lower(), sound_id) for tag in sound['tags'])
+		self._connection.executemany(
+			"INSERT INTO sounds (id, md5, type, samplerate, duration, created, username, pack, data, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+			"ON CONFLICT (id) DO UPDATE SET md5 = excluded.md5, type = excluded.type, samplerate = excluded.samplerate, duration = excluded.duration, "
+			"created = excluded.created, username = excluded.username, pack = excluded.pack, data = excluded.data, updated_at = excluded.updated_at",
+			rows,
+		)
+		self._connection.executemany("DELETE FROM tags WHERE sound_id = ?", [(sound_id,) for sound_id in tagged])
+		self._connection.executemany("INSERT OR IGNORE INTO tags VALUES (?, ?)", tags)
+
+	def _stored_data(self, ids:list[int]) -> dict[int,dict[str,Any]]:
+		stored:dict[int,dict[str,Any]] = {}
+		for start in range(0, len(ids), MAX_VARIABLES):
+			chunk = ids[start:start + MAX_VARIABLES]
+			query = f"SELECT id, data FROM sounds WHERE id IN ({', '.join('?' * len(chunk))})"
+			for sound_id, data in self._connection.execute(query, chunk):
+				stored[sound_id] = json.loads(data)
+		return stored
+
+	def _select(self, sql:str, parameters:list[Any], predicate:LocalFilter|None, limit:int|None) -> Iterator[FreeSoundSoundInstance]:
+		# the rows are read in blocks, the lock is not held while the caller consumes them
+		with self._lock:
+			cursor = self._connection.execute(sql, parameters)
+		found = 0
+		try:
+			while limit is None or found < limit:
+				with self._lock:
+					rows = cursor.fetchmany(FETCH_SIZE)
+				if not rows:
+					break
+				for (data,) in rows:
+					sound = json.loads(data)
+					if predicate is not None and not predicate(sound):
+						continue
+					yield FreeSoundSoundInstance(sound)
+					found += 1
+					if limit is not None and found >= limit:
+						break
+		finally:
+			cursor.close()
+
+	@staticmethod
+	def _add_condition(conditions:list[str], parameters:list[Any], column:str, value:Any) -> None:
+		if isinstance(value, str) and value.startswith("^[") and value.endswith("]"):
+			# a Filter.RANGE, Filter.AT_LEAST or Filter.UP_TO
+			bounds = value[2:-1].split(" TO ")
+			if len(bounds) != 2:
+				raise DataError(f"Could not parse the range '{value}' of '{column}'")
+			for operator, bound in zip((">=", "<="), bounds):
+				bound = bound.strip()
+				if bound != "*":
+					conditions.append(f"{column} {operator} ?")
+					parameters.append(bound.rstrip("Z") if column == 'created' else bound if column in ('md5', 'type', 'username', 'pack') else float(bound))
+		elif isinstance(value, (list, tuple, set)):
+			conditions.append(f"{column} IN ({', '.join('?' * len(value))})")
+			parameters.extend(value)
+		else:
+			conditions.append(f"{column} = ?")
+			parameters.append(value)
+
+	@property
+	def path(self) -> str:
+		return self._path
+
+	def __len__(self) -> int:
+		with self._lock:
+			return self._connection.execute("SELECT COUNT(*) FROM sounds").fetchone()[0]
+
+	def __contains__(self, sound_id:object) -> bool:
+		if not isinstance(sound_id, int):
+			return False
+		with self._lock:
+			return self._connection.execute("SELECT 1 FROM sounds WHERE id = ?", (sound_id,)).fetchone() is not None
+
+	def __repr__(self) -> str:
+		return f"<freesound.freesound_catalogue.SoundCatalogue {self._path}>"
@@ -1,22 +1,41 @@
 """
 The module contains the definition of the FreeSoundClient, the core of the library	
 """
-from datetime import datetime
-from time import sleep
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+from math import ceil
+from queue import Full, Queue
+from threading import Event, Lock, Thread
 import traceback
-from typing import Any, NoReturn
+from typing import Any, Iterable, Iterator, NoReturn
 import json 
-from io import BytesIO
 import os
 import sys
-from requests import ReadTimeout, Response # type: ignore
+from urllib.parse import parse_qs, urlparse
+from requests import ReadTimeout, RequestException # type: ignore
 
 import freesound.freesound_api as freesound_api
-from .freesound_errors import FieldError, FreesoundError
-from .freesound_requests import AuthorizationError
+from .filter_types import Filter
+from .freesound_analysis import DescriptorMatrix, descriptor_matrix
+from .freesound_catalogue import SoundCatalogue
+from .freesound_crawl import FREESOUND_EPOCH, CrawlCheckpoint, DateShard
+from .freesound_errors import DataError, FieldError, FreesoundError
+from .freesound_fields import Field
+from .freesound_filters import FreeSoundFilters, FreeSoundSort
+from .freesound_index import DownloadIndex
+from .freesound_jsonl import JsonlManifest, SpilledResults, dump_json, read_jsonl
+from .freesound_layout import FreeSoundLayout
+from .freesound_local_filter import LocalFilter
+from .freesound_requests import AuthorizationError, configure_session, ensure_pool_size
+from .freesound_similarity import SimilarityIndex
 from .freesound_sound import FreeSoundSoundInstance
+from .freesound_store import ContentStore
+from .freesound_sync import SyncState
 from .formatting import headline, separator,ask, separator_red, warning,error,info,log,unpack_features
 
+# the longest `id:(a OR b OR ...)` filter sent in a single request, well below the url length limits of the server
+MAX_FILTER_LENGTH = 1500
 
 class FreeSoundClient:
 	"""The core class of the library
@@ -32,13 +51,23 @@ class FreeSoundClient:
 		api_key (str): the API key
 		download_folder (str | None, optional): the path where sound files should be downloaded.
 		token_file_path (str, optional): the Path to a `json` file containing the user's access token.
+		pool_size (int | None, optional): the maximum number of keep-alive connections to freesound.org. By default the shared session of [`freesound_requests`][freesound.freesound_requests.configure_session] is used, grown to fit the `workers` of the methods that download concurrently.
+		chunk_size (int, optional): the size in bytes of the chunks in which downloaded files are streamed to disk.
+		content_store (str | None, optional): the folder of a [`ContentStore`][freesound.freesound_store.ContentStore] where files with the same `md5` are stored once and hard-linked under each filename.
+		download_index (bool, optional): whether [`download_results`][freesound.freesound_client.FreeSoundClient.download_results] should keep a [`DownloadIndex`][freesound.freesound_index.DownloadIndex] of the downloaded sounds in the download folder.
+		layout (str, optional): how [`download_results`][freesound.freesound_client.FreeSoundClient.download_results] arranges the files inside the download folder, one of the [`FreeSoundLayout`][freesound.freesound_layout.FreeSoundLayout] values.
+		keep_results (bool, optional): whether the results of every page should be accumulated in the [`results_list`][freesound.freesound_client.FreeSoundClient.results_list]. When `False` only their `count` is kept, so that long crawls use a constant amount of memory.
+		spill_results (str | None, optional): the path of a JSON Lines file where the accumulated results are stored instead of memory (see [`SpilledResults`][freesound.freesound_jsonl.SpilledResults]).
+		catalogue (str | SoundCatalogue | None, optional): a [`SoundCatalogue`][freesound.freesound_catalogue.SoundCatalogue], or the path of its database, where every search result and every download is recorded.
+		results_manifest (str | None, optional): the path of a JSON Lines file where the results of every page are appended as soon as the page is received (see [`JsonlManifest`][freesound.freesound_jsonl.JsonlManifest]).
+		download_manifest (str | None, optional): the path of a JSON Lines file where every downloaded file is appended as soon as it is written.
 
 	Usage:
 		```
 		>>> c = FreesoundClient('<your-user-id>','<your-api-key>', 'sound_lib', 'access_token.json')
 		```
 	"""
-	def __init__(self, user_id:str, api_key:str, download_folder:str|None=None, token_file_path:str="access_token.json") -> None:
+	def __init__(self, user_id:str, api_key:str, download_folder:str|None=None, token_file_path:str="access_token.json", pool_size:int|None=None, chunk_size:int=freesound_api.DOWNLOAD_CHUNK_SIZE, content_store:str|None=None, download_index:bool=True, layout:str=FreeSoundLayout.flat, keep_results:bool=True, spill_results:str|None=None, catalogue:"str|SoundCatalogue|None"=None, results_manifest:str|None=None, download_manifest:str|None=None) -> None:
 		self._user_id = user_id # private
 		self._api_key = api_key # private
 		self._access_token = "" # private
@@ -47,11 +76,27 @@ class FreeSoundClient:
 		self._username = "" # read-only
 		self._page_size = 15 # read-only
 		self._results_page:dict[str,Any] = {} # read-only
-		self._results_list:dict[str,Any] = {'results':[], 'timestamp':datetime.now().isoformat(), 'count':0} # read-only
+		self._keep_results = keep_results # private
+		self._results_list:dict[str,Any] = {'results':SpilledResults(spill_results) if spill_results is not None else [], 'timestamp':datetime.now().isoformat(), 'count':0} # read-only
+		self._search_args:dict[str,Any]|None = None # read-only
+		self._page_url:str|None = None # private
+		self._catalogue = SoundCatalogue(catalogue) if isinstance(catalogue, str) else catalogue # read-only
+		self._results_manifest = JsonlManifest(results_manifest) if results_manifest is not None else None # private
+		self._download_manifest = JsonlManifest(download_manifest) if download_manifest is not None else None # private
 
 		self._download_count = 15 # read-only
 		self._download_list:dict[str,Any] = {'downloaded-files':[], 'timestamp':datetime.now().isoformat(), 'count':0} # read-only
 		self._download_folder = download_folder if download_folder else "./" # read-write
+		self._chunk_size = chunk_size # read-write
+		self._content_store = ContentStore(content_store) if content_store is not None else None # private
+		self._use_download_index = download_index # private
+		self._download_index:DownloadIndex|None = None # private
+		self._layout = FreeSoundLayout.validate(layout) # read-write
+		self._download_lock = Lock() # private
+		self._pending_paths:set[str] = set() # private
+
+		if pool_size is not None:
+			configure_session(pool_connections=pool_size, pool_maxsize=pool_size)
 
 		try:
 			token_data = self._load_token_from_file()
@@ -151,9 +196,11 @@ class FreeSoundClient:
 			warning(f"Page size {page_size} too big. Setting it to 150")
 		print(f"Searching for {query}")
 		self._page_size = min(page_size,150)
+		self._search_args = {'query':query, 'filter':filter, 'fields':fields, 'descriptors':descriptors, 'sort_by':sort_by, 'page_size':self._page_size, 'normalized':normalized}
 		try:
 			search_data = freesound_api.search(query, self._access_token,fields,filter,descriptors,sort_by,self._page_size,normalized)
 			self._results_page = search_data
+			self._page_url = None
 			self._update_result_list(search_data)
 			if search_data["count"] == 0:
 				print("No results found")
@@ -190,7 +237,63 @@ class FreeSoundClient:
 			self._handle_exception(e)
 		return audio_track
 
-	def download_track(self, url:str, filename:str, outfolder:str|None=None, skip:bool=False) -> bool:
+	def get_tracks_info(self, track_ids:Iterable[int|str], fields:str|None=None, descriptors:str|None=None, workers:int=4) -> dict[int,FreeSoundSoundInstance]:
+		"""get the infos of many sounds with as few requests as possible
+
+		The ids are packed into `id:(a OR b OR ...)` search filters (see [`Filter.OR`][freesound.filter_types.Filter.OR]).
+		Each batch holds at most 150 ids (the maximum `page_size`) and is kept short enough to fit in a url.
+		Batches are requested concurrently by a pool of `workers` threads.
+		The sounds are recorded in the `catalogue` and the `results_manifest` of the client, but not in the [`results_list`][freesound.freesound_client.FreeSoundClient.results_list].
+
+		Args:
+			track_ids (Iterable[int | str]): the `id` of the sounds
+			fields (str | None, optional): a coma-separated string of valid `fields` (see: [`FreeSoundFields`][freesound.freesound_fields.FreeSoundFields] for help)
+			descriptors (str | None, optional): a coma-separated string of valid `descriptors` (see: [`FreeSoundDescriptors`][freesound.freesound_descriptors.FreeSoundDescriptors] for help). This attribute must be used in combination with the field `analysis`
+			workers (int, optional): how many batches can be requested at the same time
+
+		Returns:
+			a `dict` of sound instances keyed by `id`. Sounds that could not be found are missing from it
+		"""
+		if workers < 1:
+			raise ValueError("The number of workers must be at least 1")
+		ids = list(dict.fromkeys(int(track_id) for track_id in track_ids))
+		batches = self._make_id_batches(ids)
+		print(f"Getting infos of {len(ids)} tracks in {len(batches)} requests")
+		tracks:dict[int,FreeSoundSoundInstance] = {}
+		ensure_pool_size(workers)
+		try:
+			with ThreadPoolExecutor(max_workers=workers) as executor:
+				for page in executor.map(lambda batch: self._search_ids(batch, fields, descriptors), batches):
+					self._record_results(page['results'])
+					for sound in page['results']:
+						tracks[sound['id']] = FreeSoundSoundInstance(sound)
+		except Exception as e:
+			self._handle_exception(e)
+		if len(tracks) < len(ids):
+			warning(f"{len(ids) - len(tracks)} tracks could not be found")
+		return tracks
+
+	def _make_id_batches(self, ids:list[int]) -> list[list[int]]:
+		batches:list[list[int]] = []
+		batch:list[int] = []
+		length = 0
+		for track_id in ids:
+			id_length = len(str(track_id)) + len(" OR ")
+			if batch and (len(batch) == 150 or length + id_length > MAX_FILTER_LENGTH):
+				batches.append(batch)
+				batch, length = [], 0
+			batch.append(track_id)
+			length += id_length
+		if batch:
+			batches.append(batch)
+		return batches
+
+	def _search_ids(self, ids:list[int], fields:str|None, descriptors:str|None) -> dict[str,Any]:
+		id_filter = Filter.OR(*ids) if len(ids) > 1 else ids[0]
+		filter = FreeSoundFilters(id=id_filter).aslist # type:ignore
+		return freesound_api.search('', self._access_token, fields, filter, descriptors, 'score', len(ids))
+
+	def download_track(self, url:str, filename:str, outfolder:str|None=None, skip:bool=False, filesize:int|None=None, md5:str|None=None) -> bool:
 		"""a wrapper around the [`download_track()`][freesound.freesound_api.download_track] function 
 
 		Downloads a track given a valid download `url` retrieved from the [Freesound Database](https://www.freesound.org)
@@ -202,6 +305,8 @@ class FreeSoundClient:
 			filename (str): the name of the file to download
 			outfolder (str): the folder where the file should be downloaded
 			skip (bool, optional): deafult value to skip a file if it already exists.
+			filesize (int | None, optional): the expected size in bytes of the file, used to validate the download.
+			md5 (str | None, optional): the expected md5 checksum of the file, used to validate the download.
 		
 		Returns:
 			bool: `True` if the file has been downloaded, `False` otherwise 
@@ -212,17 +317,24 @@ class FreeSoundClient:
 		
 		out_file = self._check_for_path(filename.replace('/', '-'),self._download_folder,skip)
 		if  out_file is None:
-			sleep(0.1) # avoid throttling
 			return False
 		else:
 			try:
-				file_response: Response = freesound_api.download_track(url, self._access_token)
-				binary_data = BytesIO(file_response.content)
-				self._write_audio_file(binary_data, out_file)
+				self._fetch_track(url, out_file, filesize, md5)
 				return True
 			except Exception as e:
 				self._handle_exception(e)
 
+	def _fetch_track(self, url:str, out_file:str, filesize:int|None, md5:str|None) -> int:
+		if self._content_store is not None and md5 is not None and self._content_store.contains(md5):
+			info(f"{out_file} is already in the content store")
+			self._content_store.link(md5, out_file)
+			return os.path.getsize(out_file)
+		size = freesound_api.download_track(url, self._access_token, out_file, self._chunk_size, filesize, md5)
+		if self._content_store is not None and md5 is not None:
+			self._content_store.add(out_file, md5)
+		return size
+
 	def get_next_page(self, url:str) -> dict[str,Any]:
 		"""a wrapper around the [`get_next_page()`][freesound.freesound_api.get_next_page] function 
 
@@ -237,11 +349,289 @@ class FreeSoundClient:
 		try:
 			page = freesound_api.get_next_page(url, self._access_token)
 			self._results_page = page
+			self._page_url = url
 			self._update_result_list(page)
 		except Exception as e:
 			self._handle_exception(e)
 		return page
 	
+	def get_all_pages(self, workers:int=4, max_pages:int|None=None) -> dict[str,Any]:
+		"""fetch the remaining pages of the last [`search`][freesound.freesound_client.FreeSoundClient.search] concurrently
+
+		The number of pages is known from the `count` of the first response, so the missing pages are requested
+		at the same time by a pool of `workers` threads and then appended to the
+		[`results_list`][freesound.freesound_client.FreeSoundClient.results_list] in order.
+
+		Args:
+			workers (int, optional): how many pages can be requested at the same time
+			max_pages (int | None, optional): the maximum number of pages to fetch. By default all the remaining pages are fetched
+
+		Returns:
+			the updated [`results_list`][freesound.freesound_client.FreeSoundClient.results_list]
+		"""
+		if workers < 1:
+			raise ValueError("The number of workers must be at least 1")
+		next_url:str|None = self._results_page.get('next')
+		if next_url is None:
+			print("There are no more pages to fetch")
+			return self._results_list
+		params = parse_qs(urlparse(next_url).query)
+		first_page = int(params.get('page', ['2'])[0])
+		page_size = int(params.get('page_size', [str(self._page_size)])[0])
+		last_page = ceil(self._results_page['count'] / page_size)
+		if max_pages is not None:
+			last_page = min(last_page, first_page + max_pages - 1)
+		urls = [freesound_api.page_url(next_url, page) for page in range(first_page, last_page + 1)]
+		print(f"Getting pages {first_page} to {last_page}")
+		separator()
+		ensure_pool_size(workers)
+		try:
+			with ThreadPoolExecutor(max_workers=workers) as executor:
+				# Executor.map() returns the pages in order even if they complete out of order
+				for page in executor.map(lambda url: freesound_api.get_next_page(url, self._access_token), urls):
+					self._results_page = page
+					self._update_result_list(page)
+		except Exception as e:
+			self._handle_exception(e)
+		return self._results_list
+
+	def iter_search(self, query:str,filter:str='',fields:str='',descriptors:str='',sort_by:str='score',page_size:int=150, normalized:int=0, limit:int|None=None) -> Iterator[FreeSoundSoundInstance]:
+		"""lazily iterate over the results of a search across pages
+
+		Pages are requested only when the previous one has been consumed and they are not stored in
+		[`results_list`][freesound.freesound_client.FreeSoundClient.results_list], so memory stays flat however many results there are.
+		They are still recorded in the `catalogue` and the `results_manifest` of the client.
+
+		Args:
+			query (str): a string of space-separated word to search into the [Freesound Database](https://www.freesound.org)
+			filter (str, optional): a string of valid filter:value string (see: [`FreeSoundFilters`][freesound.freesound_filters.FreeSoundFilters] for help)
+			fields (str, optional): a coma-separated string of valid `fields` (see: [`FreeSoundFields`][freesound.freesound_fields.FreeSoundFields] for help)
+			descriptors (str, optional): a coma-separated string of valid `descriptors` (see: [`FreeSoundDescriptors`][freesound.freesound_descriptors.FreeSoundDescriptors] for help). This attribute must be used in combination with the field `analysis`
+			sort_by (str, optional): a string defining how the search results should be organised (see: [`FreeSoundFilters`][freesound.freesound_filters.FreeSoundSort] for help)
+			page_size (int, optional): how many results are requested at a time (max 150)
+			normalized (int, optional): whether the sound `descriptors` values should be normalized or not
+			limit (int | None, optional): the maximum number of results to yield. By default all the results are yielded
+
+		Yields:
+			a [`FreeSoundSoundInstance`][freesound.freesound_sound.FreeSoundSoundInstance] for each result
+
+		Usage:
+			```
+			>>> for sound in c.iter_search("piano", fields=Field.download, limit=1000):
+			...     print(sound.name)
+			```
+		"""
+		if page_size > 150: # see documentation https://freesound.org/docs/api/resources_apiv2.html#response-sound-list
+			warning(f"Page size {page_size} too big. Setting it to 150")
+		page_size = min(page_size,150)
+		try:
+			page = freesound_api.search(query, self._access_token,fields,filter,descriptors,sort_by,page_size,normalized)
+		except Exception as e:
+			self._handle_exception(e)
+		yielded = 0
+		while True:
+			self._record_results(page['results'])
+			for sound in page['results']:
+				if limit is not None and yielded >= limit:
+					return
+				yield FreeSoundSoundInstance(sound)
+				yielded += 1
+			if page['next'] is None or (limit is not None and yielded >= limit):
+				return
+			try:
+				page = freesound_api.get_next_page(page['next'], self._access_token)
+			except Exception as e:
+				self._handle_exception(e)
+
+	def plan_date_shards(self, query:str, filter:str='', target:int=5000, start:datetime|None=None, end:datetime|None=None, workers:int=4) -> list[DateShard]:
+		"""split a query into ranges of the `created` date which hold at most `target` results each
+
+		The date range is halved until each half is small enough. Only the first half of a split is counted,
+		the size of the second one is the difference with the whole. The halves of each round are counted concurrently by a pool of `workers` threads.
+
+		Args:
+			query (str): a string of space-separated word to search into the [Freesound Database](https://www.freesound.org)
+			filter (str, optional): a string of valid filter:value string (see: [`FreeSoundFilters`][freesound.freesound_filters.FreeSoundFilters] for help)
+			target (int, optional): the maximum number of results of a shard
+			start (datetime | None, optional): the oldest `created` date to consider, by default the first sounds of freesound.org
+			end (datetime | None, optional): the newest `created` date to consider, by default now
+			workers (int, optional): how many requests can be made at the same time
+
+		Returns:
+			the non-empty [`DateShard`][freesound.freesound_crawl.DateShard] of the query, from the oldest to the newest
+		"""
+		if workers < 1:
+			raise ValueError("The number of workers must be at least 1")
+		if target < 1:
+			raise ValueError("The target size of a shard must be at least 1")
+		whole = DateShard(start if start is not None else FREESOUND_EPOCH, end if end is not None else datetime.now(timezone.utc))
+		planned:list[DateShard] = []
+		try:
+			whole.count = self._count_results(query, whole.apply(filter))
+			print(f"Splitting {whole.count} results in shards of at most {target}")
+			pending = [whole] if whole.count > target and whole.can_split() else []
+			if not pending and whole.count > 0:
+				planned.append(whole)
+			ensure_pool_size(workers)
+			with ThreadPoolExecutor(max_workers=workers) as executor:
+				while pending:
+					splits = [shard.split() for shard in pending]
+					counts = executor.map(lambda halves: self._count_results(query, halves[0].apply(filter)), splits)
+					next_pending:list[DateShard] = []
+					for parent, (first, second), count in zip(pending, splits, counts):
+						first.count = count
+						# the halves share their middle instant: a sound created then is counted twice at most
+						second.count = max(0, (parent.count or 0) - count)
+						for shard in (first, second):
+							if shard.count == 0:
+								continue
+							if shard.count <= target:
+								planned.append(shard)
+							elif shard.can_split():
+								next_pending.append(shard)
+							else:
+								warning(f"{shard.count} sounds were created within a second: the shard can not be split")
+								planned.append(shard)
+					pending = next_pending
+		except Exception as e:
+			self._handle_exception(e)
+		planned.sort(key=lambda shard: shard.start)
+		info(f"{len(planned)} shards planned")
+		return planned
+
+	def sharded_search(self, query:str, filter:str='', fields:str='', descriptors:str='', target:int=5000, start:datetime|None=None, end:datetime|None=None, workers:int=4, normalized:int=0) -> dict[str,Any]:
+		"""collect all the results of a query too large to be crawled by following the `next` links
+
+		The query is split by [`plan_date_shards`][freesound.freesound_client.FreeSoundClient.plan_date_shards],
+		the shards are crawled concurrently by a pool of `workers` threads and their results are merged, without duplicates,
+		into a single page of the [`results_list`][freesound.freesound_client.FreeSoundClient.results_list] which can be
+		downloaded with [`download_results`][freesound.freesound_client.FreeSoundClient.download_results].
+
+		Args:
+			query (str): a string of space-separated word to search into the [Freesound Database](https://www.freesound.org)
+			filter (str, optional): a string of valid filter:value string (see: [`FreeSoundFilters`][freesound.freesound_filters.FreeSoundFilters] for help)
+			fields (str, optional): a coma-separated string of valid `fields` (see: [`FreeSoundFields`][freesound.freesound_fields.FreeSoundFields] for help)
+			descriptors (str, optional): a coma-separated string of valid `descriptors` (see: [`FreeSoundDescriptors`][freesound.freesound_descriptors.FreeSoundDescriptors] for help). This attribute must be used in combination with the field `analysis`
+			target (int, optional): the maximum number of results of a shard
+			start (datetime | None, optional): the oldest `created` date to consider, by default the first sounds of freesound.org
+			end (datetime | None, optional): the newest `created` date to consider, by default now
+			workers (int, optional): how many requests can be made at the same time
+			normalized (int, optional): whether the sound `descriptors` values should be normalized or not
+
+		Returns:
+			the merged results, from the oldest to the newest sound
+
+		Usage:
+			```py
+			>>> c.sharded_search("field-recording", filter=FreeSoundFilters(type="wav", samplerate=48000).aslist, fields=Field.download)
+			>>> c.download_results("field_recordings", workers=8)
+			```
+		"""
+		shards = self.plan_date_shards(query, filter, target, start, end, workers)
+		crawl = partial(self._crawl_shard, query=query, filter=filter, fields=fields, descriptors=descriptors, normalized=normalized)
+		results:dict[int,dict[str,Any]] = {}
+		ensure_pool_size(workers)
+		try:
+			with ThreadPoolExecutor(max_workers=workers) as executor:
+				for shard, shard_results in zip(shards, executor.map(crawl, shards)):
+					info(f"{len(shard_results)} results between {shard.start} and {shard.end}")
+					for sound in shard_results:
+						results.setdefault(sound['id'], sound)
+		except Exception as e:
+			self._handle_exception(e)
+		merged:dict[str,Any] = {'count':len(results), 'next':None, 'previous':None, 'results':list(results.values())}
+		# the merged page can not be repeated with a single search
+		self._search_args = None
+		self._page_url = None
+		self._results_page = merged
+		self._update_result_list(merged)
+		print(f"Found {merged['count']} results")
+		return merged
+
+	def _count_results(self, query:str, filter:str) -> int:
+		return freesound_api.search(query, self._access_token, None, filter, None, 'score', 1)['count']
+
+	def _crawl_shard(self, shard:DateShard, query:str, filter:str, fields:str, descriptors:str, normalized:int) -> list[dict[str,Any]]:
+		page = freesound_api.search(query, self._access_token, fields, shard.apply(filter), descriptors, FreeSoundSort.created_asc, 150, normalized)
+		results:list[dict[str,Any]] = list(page['results'])
+		while page['next'] is not None:
+			page = freesound_api.get_next_page(page['next'], self._access_token)
+			results.extend(page['results'])
+		return results
+
+	def sync(self, query:str, filter:str='', fields:str='', descriptors:str='', state:SyncState|str=".freesound_sync.json", output_folder:str|None=None, workers:int=1, page_size:int=150, normalized:int=0) -> dict[str,Any]:
+		"""fetch, and optionally download, only the sounds of a query created since its last `sync`
+
+		The [`SyncState`][freesound.freesound_sync.SyncState] keeps the `created` date of the newest sound of each query.
+		The query is restricted to `created:[<mark> TO *]` and sorted by [`created_desc`][freesound.freesound_filters.FreeSoundSort],
+		and the pages are followed only until the sounds already seen are reached.
+		The new sounds become the current page of results, so they can also be downloaded later with
+		[`download_results`][freesound.freesound_client.FreeSoundClient.download_results].
+
+		The first `sync` of a query fetches all of its results.
+
+		Args:
+			query (str): a string of space-separated word to search into the [Freesound Database](https://www.freesound.org)
+			filter (str, optional): a string of valid filter:value string (see: [`FreeSoundFilters`][freesound.freesound_filters.FreeSoundFilters] for help)
+			fields (str, optional): a coma-separated string of valid `fields` (see: [`FreeSoundFields`][freesound.freesound_fields.FreeSoundFields] for help). `created` is always added
+			descriptors (str, optional): a coma-separated string of valid `descriptors` (see: [`FreeSoundDescriptors`][freesound.freesound_descriptors.FreeSoundDescriptors] for help). This attribute must be used in combination with the field `analysis`
+			state (SyncState | str, optional): the state of the synchronized queries or the path of its file
+			output_folder (str | None, optional): where the new sounds should be downloaded. By default they are not downloaded
+			workers (int, optional): how many files can be downloaded at the same time
+			page_size (int, optional): the maximum count of items of each page
+			normalized (int, optional): whether the sound `descriptors` values should be normalized or not
+
+		Returns:
+			a page containing all the new sounds, from the newest to the oldest
+
+		Usage:
+			```py
+			>>> c.sync("rain", fields=Field.download, state="rain_sync.json", output_folder="rain_lib", workers=8)
+			```
+		"""
+		if isinstance(state, str):
+			state = SyncState(state)
+		if Field.created not in fields.split(','):
+			fields = f"{fields},{Field.created}" if fields != '' else Field.created
+		page_size = min(page_size,150)
+		mark = state.mark(query, filter)
+		known:set[int] = set()
+		sync_filter = filter
+		if mark is not None:
+			known = set(mark['ids'])
+			since = FreeSoundFilters(created=Filter.AT_LEAST(mark['created'] + 'Z')).aslist
+			sync_filter = f"{filter} {since}" if filter != '' else since
+			print(f"Searching for {query} created since {mark['created']}")
+		else:
+			print(f"Searching for {query}")
+		new_sounds:list[dict[str,Any]] = []
+		try:
+			page = freesound_api.search(query, self._access_token, fields, sync_filter, descriptors, FreeSoundSort.created_desc, page_size, normalized)
+			while True:
+				# the sounds seen by the last sync are the oldest of the results: no page after them is needed
+				reached = False
+				for sound in page['results']:
+					if sound['id'] in known:
+						reached = True
+					else:
+						new_sounds.append(sound)
+				if reached or page['next'] is None:
+					break
+				page = freesound_api.get_next_page(page['next'], self._access_token)
+		except Exception as e:
+			self._handle_exception(e)
+		delta:dict[str,Any] = {'count':len(new_sounds), 'next':None, 'previous':None, 'results':new_sounds}
+		self._search_args = None
+		self._page_url = None
+		self._results_page = delta
+		self._update_result_list(delta)
+		info(f"Found {len(new_sounds)} new sounds")
+		if output_folder is not None and len(new_sounds) > 0:
+			self.download_results(output_folder, len(new_sounds), workers)
+		# the mark moves only once the new sounds have been handled
+		state.update(query, filter, new_sounds)
+		return delta
+
 	def _get_my_infos(self) -> dict[str, Any]:
 		print("Getting Client Info")
 		user_data = freesound_api.get_my_infos(self._access_token)
@@ -277,11 +667,32 @@ class FreeSoundClient:
 	def results_list(self) -> dict[str,Any]:
 		"""read-only
 
+		When the client spills its results, `results_list['results']` is a [`SpilledResults`][freesound.freesound_jsonl.SpilledResults]
+		which reads them back from disk while being iterated.
+
 		Returns:
 			a `json` object containing the response of a [`search`][freesound.freesound_client.FreeSoundClient.search] request.
 		"""
 		return self._results_list
+
+	@property # read-only
+	def search_args(self) -> dict[str,Any]|None:
+		"""read-only
+
+		Returns:
+			the arguments of the last [`search`][freesound.freesound_client.FreeSoundClient.search], `None` if no search has been made
+		"""
+		return self._search_args
 	
+	@property # read-only
+	def catalogue(self) -> SoundCatalogue|None:
+		"""read-only
+
+		Returns:
+			the [`SoundCatalogue`][freesound.freesound_catalogue.SoundCatalogue] of the client, `None` if it has none
+		"""
+		return self._catalogue
+
 	@property # read-only
 	def download_count(self) -> int:
 		"""read-only
@@ -320,55 +731,311 @@ class FreeSoundClient:
 			path += "/"
 		self._download_folder = path
 
+	@property
+	def layout(self) -> str:
+		"""
+		Returns:
+			the [`FreeSoundLayout`][freesound.freesound_layout.FreeSoundLayout] of the download folder
+		"""
+		return self._layout
+
+	@layout.setter
+	def layout(self,layout:str) -> None:
+		"""set the [`FreeSoundLayout`][freesound.freesound_layout.FreeSoundLayout] of the download folder
+
+		Args:
+			layout (str): one of the `FreeSoundLayout` values
+		"""
+		self._layout = FreeSoundLayout.validate(layout)
+
+	@property
+	def chunk_size(self) -> int:
+		"""
+		Returns:
+			the size in bytes of the chunks in which downloaded files are written to disk
+		"""
+		return self._chunk_size
+
+	@chunk_size.setter
+	def chunk_size(self,size:int) -> None:
+		"""
+		Args:
+		 	size (int): the size in bytes of the chunks in which downloaded files are written to disk
+		"""
+		if size <= 0:
+			raise ValueError("The chunk size must be a positive number of bytes")
+		self._chunk_size = size
+
 	"""
 	UTILITIES
 	---------
 	"""	
 
-	def download_results(self,output_folder:str|None=None,files_count:int|None=None) -> None:
+	def download_results(self,output_folder:str|None=None,files_count:int|None=None,workers:int=1,prefetch:int=1,checkpoint:CrawlCheckpoint|None=None) -> None:
 		"""download `files_count` audio files into `output_folder_path`
 
-		This function takes care of pagination automatically
+		This function takes care of pagination automatically: while the files of a page are downloading,
+		the next `prefetch` pages are requested in the background so that the downloads never wait for a page.
+		When `workers` is greater than 1 the files of each page are downloaded concurrently by a pool of threads:
+		a file that fails to download is reported and skipped without stopping the others,
+		and the [`download_list`][freesound.freesound_client.FreeSoundClient.download_list] keeps the order of the search results.
+		Unless the client was created with `download_index=False`, the sounds already downloaded into the folder are
+		skipped by `id` according to its [`DownloadIndex`][freesound.freesound_index.DownloadIndex].
+		The files are arranged in sub-folders according to the [`layout`][freesound.freesound_client.FreeSoundClient.layout] of the client.
+		With a `checkpoint` the progress is saved while downloading, and an interrupted run can be continued with
+		[`resume`][freesound.freesound_client.FreeSoundClient.resume].
 
 		Args:
 			output_folder (str | None, optional): The name of the output folder.
 			files_count (int | None, optional): how many files should be downloaded. 
+			workers (int, optional): how many files can be downloaded at the same time.
+			prefetch (int, optional): how many pages can be fetched ahead of the downloads. `0` fetches each page only when the previous one is done.
+			checkpoint (CrawlCheckpoint | None, optional): where the progress of the download should be saved.
 		"""
+		if workers < 1:
+			raise ValueError("The number of workers must be at least 1")
+		if prefetch < 0:
+			raise ValueError("The number of prefetched pages can not be negative")
 		self._set_download_count(files_count)
 		if self._download_count == 0:
 			print("Nothing to Download")
 		else:			
 			print(f"Downloading {self._download_count} files of {self._results_page['count']}")
 			separator()
+			if output_folder is not None:
+				self._download_folder = self._set_folder(output_folder)
+			if self._use_download_index:
+				os.makedirs(self._download_folder, exist_ok=True)
+				self._download_index = DownloadIndex(self._download_folder)
+			# every worker and the thread prefetching the pages hold a connection at the same time
+			ensure_pool_size(workers + (1 if prefetch > 0 else 0))
+			executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+			download = partial(self._download_result, isolate_errors=executor is not None)
+			pages = self._iter_pages(prefetch)
 			downloaded_count = 0
-			while downloaded_count < self._download_count:
-				for sound in self._results_page['results']:
-					if downloaded_count < self._download_count:
-						try:
-							parsed_sound = FreeSoundSoundInstance(sound)
-						except Exception as e:
-							self._handle_exception(e)
-						try:
-							if self.download_track(parsed_sound.ensure_value('download'),parsed_sound.name,output_folder,skip=True):
+			if checkpoint is not None:
+				if self._search_args is None:
+					raise DataError("A checkpoint can only be saved for the results of a search")
+				downloaded_count = checkpoint.downloaded
+				checkpoint.start(self._search_args, self._download_folder, self._download_count, self._layout)
+			try:
+				for page in pages:
+					pending:list[dict[str,Any]] = list(page['results'])
+					if checkpoint is not None:
+						# `_iter_pages` keeps the url of the page it hands out in `_page_url`
+						checkpoint.enter_page(self._page_url)
+						if self._download_index is not None:
+							# the files a killed run wrote without saving them in the checkpoint
+							recovered = set(checkpoint.reconcile([sound['id'] for sound in pending], self._download_index))
+							for sound in pending:
+								if sound['id'] in recovered:
+									downloaded_count+=1
+									self._update_download_list(sound, downloaded_count, self._download_index.get(sound['id'])['path'])
+						pending = [sound for sound in pending if sound['id'] not in checkpoint.completed]
+					while pending and downloaded_count < self._download_count:
+						batch = pending[:self._download_count - downloaded_count]
+						pending = pending[len(batch):]
+						# both map() and Executor.map() yield the outcomes lazily and in the order of the batch
+						outcomes = executor.map(download, batch) if executor is not None else map(download, batch)
+						for sound, path in zip(batch, outcomes):
+							if path is not None:
 								downloaded_count+=1
-								self._update_download_list(sound, downloaded_count)
+								self._update_download_list(sound, downloaded_count, path)
+								if checkpoint is not None:
+									checkpoint.complete(sound['id'])
 								info(f"Downloaded Files: {downloaded_count} of {self._download_count}")
 								separator()
-							else:
-								pass
-						except Exception as e:
-							self._handle_exception(e)
-					else:
-						break
-				if downloaded_count < self._download_count:
-					if not self._set_next_page():
+					if downloaded_count >= self._download_count:
 						break
+				if checkpoint is not None:
+					checkpoint.finish()
+			except Exception as e:
+				self._handle_exception(e)
+			finally:
+				pages.close()
+				if executor is not None:
+					executor.shutdown(cancel_futures=True)
+				if checkpoint is not None:
+					checkpoint.save()
 			info("Done Downloading")
 
+	def resume(self, checkpoint:CrawlCheckpoint|str, workers:int=1, prefetch:int=1) -> None:
+		"""continue a [`download_results`][freesound.freesound_client.FreeSoundClient.download_results] run from its [`CrawlCheckpoint`][freesound.freesound_crawl.CrawlCheckpoint]
+
+		The search is repeated from the page that was being downloaded when the run stopped,
+		the sounds of that page which were already downloaded are skipped and the checkpoint keeps being updated.
+
+		Args:
+			checkpoint (CrawlCheckpoint | str): a checkpoint or the path of a checkpoint file
+			workers (int, optional): how many files can be downloaded at the same time.
+			prefetch (int, optional): how many pages can be fetched ahead of the downloads.
+
+		Usage:
+			```py
+			>>> c.resume("piano_crawl.json", workers=8)
+			```
+		"""
+		if isinstance(checkpoint, str):
+			try:
+				checkpoint = CrawlCheckpoint.load(checkpoint)
+			except (OSError, ValueError, KeyError) as e:
+				error(f"Could not load the checkpoint {checkpoint}: {e}")
+				self.logout()
+		if checkpoint.finished:
+			info(f"The crawl saved in {checkpoint.path} is already finished")
+			return
+		if checkpoint.search_args is None or checkpoint.output_folder is None or checkpoint.files_count is None:
+			error(f"The checkpoint {checkpoint.path} does not contain a crawl")
+			self.logout()
+		info(f"Resuming the crawl saved in {checkpoint.path}: {checkpoint.downloaded} of {checkpoint.files_count} files downloaded")
+		if checkpoint.layout is not None:
+			self._layout = FreeSoundLayout.validate(checkpoint.layout)
+		if checkpoint.page_url is None:
+			self.search(**checkpoint.search_args)
+		else:
+			self._search_args = dict(checkpoint.search_args)
+			self._page_size = checkpoint.search_args['page_size']
+			self.get_next_page(checkpoint.page_url)
+		self.download_results(checkpoint.output_folder, checkpoint.files_count, workers, prefetch, checkpoint)
+
+	def _iter_pages(self, prefetch:int) -> Iterator[dict[str,Any]]:
+		# yields the current page and then the following ones, fetched `prefetch` pages ahead by a producer thread
+		if prefetch == 0:
+			yield self._results_page
+			while self._set_next_page():
+				yield self._results_page
+			return
+		pages:Queue[dict[str,Any]|Exception|None] = Queue(maxsize=prefetch)
+		stop = Event()
+		# the producer starts before the first page is handed out, so the next pages are fetched while its files download
+		producer = Thread(target=self._prefetch_pages, args=(self._results_page['next'], pages, stop), daemon=True)
+		producer.start()
+		try:
+			yield self._results_page
+			while True:
+				page = pages.get()
+				if page is None:
+					return
+				if isinstance(page, Exception):
+					raise page
+				print("Getting next page")
+				separator()
+				# like `get_next_page`: the url of the current page is the `next` of the previous one
+				self._page_url = self._results_page['next']
+				self._results_page = page
+				self._update_result_list(page)
+				yield page
+		finally:
+			stop.set()
+
+	def _prefetch_pages(self, url:str|None, pages:"Queue[dict[str,Any]|Exception|None]", stop:Event) -> None:
+		item:dict[str,Any]|Exception|None = None
+		try:
+			while url is not None and not stop.is_set():
+				page = freesound_api.get_next_page(url, self._access_token)
+				if not self._put_page(pages, page, stop):
+					return
+				url = page['next']
+		except Exception as e:
+			item = e
+		self._put_page(pages, item, stop)
+
+	def _put_page(self, pages:"Queue[dict[str,Any]|Exception|None]", page:dict[str,Any]|Exception|None, stop:Event) -> bool:
+		# the queue is bounded: wait for the downloads to consume a page unless they are over
+		while not stop.is_set():
+			try:
+				pages.put(page, timeout=0.1)
+				return True
+			except Full:
+				continue
+		return False
+
+	def _download_result(self, sound:dict[str,Any], isolate_errors:bool=False) -> str|None:
+		try:
+			return self._download_sound(sound)
+		except (FreesoundError, DataError, FieldError, RequestException, OSError) as e:
+			if not isolate_errors:
+				self._handle_exception(e)
+			error(f"Could not download {sound.get('name', sound.get('id'))}: {e}")
+			return None
+
+	def _download_sound(self, sound:dict[str,Any]) -> str|None:
+		# returns the path of the downloaded file relative to the download folder
+		parsed_sound = FreeSoundSoundInstance(sound)
+		relative_path = FreeSoundLayout.relative_path(self._layout, parsed_sound)
+		print(f"Downloading {relative_path}")
+		index = self._download_index
+		if index is not None:
+			# the path comes back reserved
+			out_file = self._indexed_path(index, parsed_sound, relative_path)
+			if out_file is None:
+				return None
+		else:
+			with self._download_lock:
+				out_file = self._check_for_path(relative_path,self._download_folder,skip=True)
+				if out_file is None:
+					return None
+				# two sounds with the same name must not be written at the same time
+				if out_file in self._pending_paths:
+					warning(f"The File {out_file} is already being downloaded...")
+					return None
+				self._pending_paths.add(out_file)
+		relative_path = os.path.relpath(out_file, self._download_folder)
+		try:
+			os.makedirs(os.path.dirname(out_file), exist_ok=True)
+			size = self._fetch_track(parsed_sound.ensure_value('download'), out_file, parsed_sound.filesize, parsed_sound.md5)
+			if index is not None:
+				index.add(parsed_sound.ensure_value('id'), relative_path, size, parsed_sound.md5)
+		finally:
+			with self._download_lock:
+				self._pending_paths.discard(out_file)
+		return relative_path
+
+	def _indexed_path(self, index:DownloadIndex, sound:FreeSoundSoundInstance, relative_path:str) -> str|None:
+		# skip decisions come from the index: the file system is only checked for sounds about to be downloaded.
+		# Only the reservation of the returned path in `_pending_paths` happens under the lock
+		if sound.id in index:
+			warning(f"{relative_path} has already been downloaded... Skipping")
+			separator()
+			return None
+		folder, filename = os.path.split(relative_path)
+		# a different sound with the same name is downloaded as `<id>_<name>`
+		for candidate in (relative_path, os.path.join(folder, f"{sound.id}_{filename}")):
+			if index.owner(candidate) is not None:
+				continue
+			out_file = os.path.join(self._download_folder, candidate)
+			if os.path.exists(out_file):
+				# a file downloaded before the index existed is adopted only if it is this sound,
+				# any other file keeps its name and the sound is downloaded under the next candidate
+				size = os.path.getsize(out_file)
+				if self._is_same_file(out_file, size, sound):
+					warning(f"The File {out_file} already exists... Skipping")
+					separator()
+					index.add(sound.ensure_value('id'), candidate, size, sound.md5)
+					return None
+				continue
+			with self._download_lock:
+				if out_file in self._pending_paths:
+					continue
+				self._pending_paths.add(out_file)
+			return out_file
+		error(f"Could not download {relative_path}: the name is taken by other sounds")
+		return None
+
+	def _is_same_file(self, path:str, size:int, sound:FreeSoundSoundInstance) -> bool:
+		# without a `filesize` or an `md5` in the results nothing proves that the file is this sound
+		if sound.filesize is not None and size != sound.filesize:
+			return False
+		if sound.md5 is not None:
+			return freesound_api._part_digest(path, size).hexdigest() == str(sound.md5).lower()
+		return sound.filesize is not None
+
 	def write_download_list(self,filename:str="downloads.json", folder:str|None=None) -> None:
 		"""save a detailed list of the downloaded files in a `json` file
 
-		If `folder` is not provided the client will prompt the user for this information
+		Each file carries its `path` relative to the download folder, according to the [`layout`][freesound.freesound_client.FreeSoundClient.layout] of the client.
+		If `folder` is not provided the client will prompt the user for this information.
+		A `filename` ending with `.jsonl` is written as JSON Lines, one compact line per file.
 
 		Args:
 			filename (str, optional): the name of the file to save
@@ -382,7 +1049,8 @@ class FreeSoundClient:
 	def write_results_list(self,filename:str='results_list.json', folder:str|None=None) -> None:
 		"""save a simplified list of the [`search`][freesound.freesound_client.FreeSoundClient.search] response in a `json` file
 
-		If `folder` is not provided the client will prompt the user for this information
+		If `folder` is not provided the client will prompt the user for this information.
+		A `filename` ending with `.jsonl` is written as JSON Lines, one compact line per sound, which [`load_results_list`][freesound.freesound_client.FreeSoundClient.load_results_list] reads back as a stream.
 
 		Args:
 			filename (str, optional): the file of the files where the list should be saved
@@ -393,10 +1061,19 @@ class FreeSoundClient:
 	def load_results_list(self, json_file:str):
 		"""load a json file produced from [`write_results_list`][freesound.freesound_client.FreeSoundClient.write_results_list]
 
+		A `.jsonl` file (written by `write_results_list` or by the `results_manifest` of a client) is read one line at a time:
+		when the client spills its results they are copied to its spill file without being held in memory.
+
 		Args:
 			json_file (str): a relative or an absolute path to a json file
 		"""
 		if os.path.exists(json_file):
+			if json_file.endswith(".jsonl"):
+				try:
+					self._load_jsonl(json_file)
+				except Exception as e:
+					self._handle_exception(e)
+				return
 			with open(json_file) as data_file:
 				try:
 					data = json.load(data_file)
@@ -407,11 +1084,29 @@ class FreeSoundClient:
 			error(f"File {json_file} not found")
 			self.logout()
 
+	def _load_jsonl(self, json_file:str):
+		results = self._results_list['results']
+		if isinstance(results, SpilledResults):
+			if os.path.abspath(results.path) == os.path.abspath(json_file):
+				raise DataError(f"{json_file} is the spill file of the client: it can not be loaded into itself")
+			results.clear()
+		else:
+			results = []
+		results.extend(read_jsonl(json_file))
+		timestamp = datetime.fromtimestamp(os.path.getmtime(json_file)).isoformat()
+		self._results_list = {'results':results, 'timestamp':timestamp, 'count':len(results)}
+
 	def _validate_data(self,data:dict[str,Any]):
 		if 'results' not in data or 'count' not in data or 'timestamp' not in data:
 			error(f"The json file you are trying to load is corrupted")
 			self.logout()
 		else:
+			results = self._results_list['results']
+			if isinstance(results, SpilledResults):
+				# a spilling client keeps its results on disk, whatever it loads
+				results.clear()
+				results.extend(data['results'])
+				data = {**data, 'results':results}
 			self._results_list = data
 
 	def dump_results(self, data:dict[str,Any]|None=None):
@@ -423,7 +1118,7 @@ class FreeSoundClient:
 		if data is None:
 			data = self._results_list
 		for key, values in data.items():
-			if isinstance(values, list):
+			if isinstance(values, (list, SpilledResults)):
 				for value in values: # type:ignore
 					separator()
 					for x,y in value.items(): # type:ignore
@@ -435,6 +1130,73 @@ class FreeSoundClient:
 				log(str(key),values)
 			print('')
 
+	def descriptor_matrix(self, descriptors:list[str]|str|None=None) -> DescriptorMatrix:
+		"""collect the `analysis` of the [`results_list`][freesound.freesound_client.FreeSoundClient.results_list] in a `numpy` matrix
+
+		It requires the optional dependency `numpy`. See [`descriptor_matrix`][freesound.freesound_analysis.descriptor_matrix] for the layout of the columns.
+
+		Args:
+			descriptors (list[str] | str | None, optional): the descriptors to collect (see: [`FreeSoundDescriptors`][freesound.freesound_descriptors.FreeSoundDescriptors] for help). By default the descriptors of the last search
+
+		Returns:
+			a [`DescriptorMatrix`][freesound.freesound_analysis.DescriptorMatrix] with a row for each sound with an `analysis`
+
+		Usage:
+			```py
+			>>> c.search("piano", fields=Field.analysis, descriptors=FreeSoundDescriptors([Descriptor.lowlevel_mfcc]).aslist)
+			>>> c.descriptor_matrix().values.shape
+			(15, 13)
+			```
+		"""
+		if descriptors is None:
+			descriptors = self._search_args['descriptors'] if self._search_args is not None else ''
+		if len(descriptors) == 0:
+			raise DataError("No descriptors to collect: pass them to descriptor_matrix or to search")
+		return descriptor_matrix(self._results_list['results'], descriptors)
+
+	def similarity_index(self, descriptors:list[str]|str|None=None, metric:str="cosine", clusters:int|None=None, probes:int=8) -> SimilarityIndex:
+		"""build a local nearest-neighbour index over the `analysis` of the [`results_list`][freesound.freesound_client.FreeSoundClient.results_list]
+
+		Unlike the `similar_sounds` field, queries are answered without any request to freesound.org. It requires the optional dependency `numpy`.
+
+		Args:
+			descriptors (list[str] | str | None, optional): the descriptors compared (see: [`FreeSoundDescriptors`][freesound.freesound_descriptors.FreeSoundDescriptors] for help). By default the descriptors of the last search
+			metric (str, optional): `"cosine"` or `"l2"`
+			clusters (int | None, optional): the number of clusters of an approximate index. By default every query is compared with all the sounds
+			probes (int, optional): how many clusters are searched by each query of an approximate index
+
+		Returns:
+			a [`SimilarityIndex`][freesound.freesound_similarity.SimilarityIndex]
+
+		Usage:
+			```py
+			>>> index = c.similarity_index(Descriptor.lowlevel_mfcc)
+			>>> index.similar_to(524545, k=5)
+			```
+		"""
+		return SimilarityIndex(self.descriptor_matrix(descriptors), self._results_list['results'], metric, clusters, probes)
+
+	def filter_results(self, filter:"str|FreeSoundFilters|LocalFilter") -> list[dict[str,Any]]:
+		"""select the sounds of the [`results_list`][freesound.freesound_client.FreeSoundClient.results_list] matching a filter, without any request to freesound.org
+
+		The results must contain the fields used by the filter (see: [`LocalFilter`][freesound.freesound_local_filter.LocalFilter]).
+
+		Args:
+			filter (str | FreeSoundFilters | LocalFilter): a string of valid filter:value, or a filter already compiled
+
+		Returns:
+			the matching results, in their order
+
+		Usage:
+			```py
+			>>> c.search("piano", fields="id,name,type,duration,tags", page_size=150)
+			>>> c.get_all_pages()
+			>>> short_wavs = c.filter_results(FreeSoundFilters(type="wav", duration=Filter.UP_TO(2)))
+			```
+		"""
+		predicate = filter if isinstance(filter, LocalFilter) else LocalFilter(filter)
+		return list(predicate.select(self._results_list['results']))
+
 	def _prompt_downloads(self,downloadable:int)-> int:
 		if downloadable == 0:
 			warning("There is nothing to download")
@@ -470,12 +1232,28 @@ class FreeSoundClient:
 	def _update_result_list(self, list:dict[str,Any]):
 		self._results_list['count'] += len(list['results'])
 		self._results_list['timestamp'] = datetime.now().isoformat()
-		self._results_list['results'].extend(list['results'])
-
-	def _update_download_list(self, sound_obj:dict[str,Any], count:int):
-		self._download_list['count'] = count
-		self._download_list['timestamp'] = datetime.now().isoformat()
-		self._download_list['downloaded-files'].append(sound_obj)
+		if self._keep_results:
+			self._results_list['results'].extend(list['results'])
+		self._record_results(list['results'])
+
+	def _record_results(self, results:list[dict[str,Any]]):
+		# every result the client receives goes to its catalogue and manifest, even when it is not kept in `results_list`
+		if self._catalogue is not None:
+			self._catalogue.upsert(results)
+		if self._results_manifest is not None:
+			self._results_manifest.extend(results)
+
+	def _update_download_list(self, sound_obj:dict[str,Any], count:int, path:str|None=None):
+		with self._download_lock:
+			self._download_list['count'] = count
+			self._download_list['timestamp'] = datetime.now().isoformat()
+			self._download_list['layout'] = self._layout
+			# the path is relative to the download folder
+			self._download_list['downloaded-files'].append(sound_obj if path is None else {**sound_obj, 'path':path})
+			if self._download_manifest is not None:
+				self._download_manifest.append(sound_obj if path is None else {**sound_obj, 'path':path})
+		if self._catalogue is not None and path is not None:
+			self._catalogue.set_path(sound_obj, os.path.join(self._download_folder, path))
 
 	def _set_download_count(self,count:int|None):
 		max_value = self._results_page['count']
@@ -500,6 +1278,7 @@ class FreeSoundClient:
 		
 	def _check_for_path(self,filename:str,folder:str,skip:bool) -> str|None:
 		output_path = os.path.join(folder,filename)
+		folder = os.path.dirname(output_path)
 		while os.path.exists(output_path):
 			warning(f"The File {output_path} already exists...")
 			if  skip:
@@ -513,14 +1292,9 @@ class FreeSoundClient:
 					break
 				else:
 					output_path = os.path.join(folder,new_filename)
-		if not os.path.exists(folder):
-			os.mkdir(folder)
+		os.makedirs(folder, exist_ok=True)
 		return output_path
 
-	def _write_audio_file(self, data:BytesIO, output_path:str) -> None:
-		with open(output_path,"wb") as file:
-			file.write(data.read())
-
 	def _write_json(self,data:dict[Any,Any], filename:str, folder:str|None):
 		timestamp = datetime.fromisoformat(self._results_list['timestamp']).strftime("%y%m%dT%H%M")
 		filename = timestamp+"_"+filename
@@ -530,8 +1304,13 @@ class FreeSoundClient:
 		if output_path is not None:
 			if ".json" not in output_path:
 				filename += ".json"
-			with open(output_path, "w") as outfile:
-				json.dump(data, outfile, indent=4)
+			if output_path.endswith(".jsonl"):
+				records = data['results'] if 'results' in data else data['downloaded-files']
+				open(output_path, "w").close()
+				JsonlManifest(output_path).extend(records)
+			else:
+				with open(output_path, "w") as outfile:
+					dump_json(data, outfile, indent=4)
 			info(f"File: {output_path} written!")
 		else:
 			print("No file written")
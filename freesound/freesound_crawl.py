@@ -0,0 +1,247 @@
+"""
+The module contains the definitions of
+- CrawlCheckpoint
+- DateShard
+
+2 utility structures for long crawls of the [Freesound Database](https://www.freesound.org).
+
+The `CrawlCheckpoint` stores the progress of a long [`download_results`][freesound.freesound_client.FreeSoundClient.download_results] run
+in a small `json` file, so that a crawl killed halfway can be continued with [`resume`][freesound.freesound_client.FreeSoundClient.resume]
+instead of starting over.
+
+The checkpoint contains the arguments of the [`search`][freesound.freesound_client.FreeSoundClient.search], the url of the page
+being downloaded, the `id` of the sounds of that page which are already downloaded and how many files have been downloaded so far.
+The file is replaced atomically, so it is never left half written.
+
+Usage Example
+-------------
+>>> c = FreeSoundClient(USER_ID, API_KEY)
+>>> c.search("piano", fields=Field.download, page_size=150)
+>>> c.download_results("sound_lib", 100000, workers=8, checkpoint=CrawlCheckpoint("piano_crawl.json"))
+... # the process is killed
+>>> c = FreeSoundClient(USER_ID, API_KEY)
+>>> c.resume("piano_crawl.json", workers=8)
+
+A `DateShard` is a range of the `created` date of the sounds. Following the `next` links of a very large query gets slower
+page after page, so [`sharded_search`][freesound.freesound_client.FreeSoundClient.sharded_search] splits the query into
+date ranges small enough to be crawled quickly, and crawls them in parallel.
+
+>>> c.sharded_search("field-recording", filter=FreeSoundFilters(type="wav", samplerate=48000).aslist, target=5000)
+"""
+from datetime import datetime, timedelta, timezone
+import json
+import os
+from time import monotonic
+from typing import Any, Iterable
+
+from .filter_types import Filter
+from .freesound_filters import FreeSoundFilters
+from .freesound_index import DownloadIndex
+
+# the format of the dates in the filters of freesound.org (Solr)
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+# no sound on freesound.org is older than this date
+FREESOUND_EPOCH = datetime(2005, 1, 1)
+
+
+class CrawlCheckpoint:
+	"""The state of a crawl job, saved in the `json` file at `path`
+
+	The state is saved at every new page and, by default, after every download. A positive `interval` saves less often within a page.
+	The downloads a kill keeps out of the checkpoint (those of the last `interval` seconds, or of other workers) are
+	recovered from the [`DownloadIndex`][freesound.freesound_index.DownloadIndex] of the folder by [`reconcile`][freesound.freesound_crawl.CrawlCheckpoint.reconcile].
+
+	Args:
+		path (str): the path of the checkpoint file
+		interval (float, optional): the minimum number of seconds between two saves within the same page, `0` to save after every download
+
+	Usage:
+		```py
+		>>> checkpoint = CrawlCheckpoint.load("piano_crawl.json")
+		>>> checkpoint.downloaded
+		4200
+		```
+	"""
+	def __init__(self, path:str, interval:float=0.0) -> None:
+		self._path = path
+		self._interval = interval
+		self._saved_at = 0.0
+		self.search_args:dict[str,Any]|None = None
+		self.output_folder:str|None = None
+		self.files_count:int|None = None
+		self.layout:str|None = None
+		self.page_url:str|None = None
+		self.page_started:str|None = None
+		self.completed:set[int] = set()
+		self.downloaded = 0
+		self.finished = False
+
+	@classmethod
+	def load(cls, path:str, interval:float=0.0) -> "CrawlCheckpoint":
+		"""read the checkpoint saved at `path`
+
+		Raises:
+			FileNotFoundError: if there is no checkpoint at `path`
+
+		Returns:
+			the `CrawlCheckpoint`
+		"""
+		with open(path, "r") as file:
+			data = json.load(file)
+		checkpoint = cls(path, interval)
+		checkpoint.search_args = data['search']
+		checkpoint.output_folder = data['output_folder']
+		checkpoint.files_count = data['files_count']
+		checkpoint.layout = data.get('layout')
+		checkpoint.page_url = data['page_url']
+		checkpoint.page_started = data.get('page_started')
+		checkpoint.completed = set(data['completed'])
+		checkpoint.downloaded = data['downloaded']
+		checkpoint.finished = data['finished']
+		return checkpoint
+
+	def start(self, search_args:dict[str,Any], output_folder:str, files_count:int, layout:str) -> None:
+		"""record the parameters of the crawl"""
+		self.search_args = search_args
+		self.output_folder = output_folder
+		self.files_count = files_count
+		self.layout = layout
+		self.save()
+
+	def enter_page(self, url:str|None) -> None:
+		"""record that the page fetched from `url` is being downloaded. `None` is the first page of the search
+
+		The `id` of the sounds of the previous page are forgotten: the crawl will never go back to it
+		"""
+		if url != self.page_url or self.page_started is None:
+			self.page_started = datetime.now().isoformat()
+		if url != self.page_url:
+			self.page_url = url
+			self.completed.clear()
+		self.save()
+
+	def reconcile(self, sound_ids:Iterable[int], index:DownloadIndex) -> list[int]:
+		"""record the sounds of the current page that the `index` received after the page was entered, but the checkpoint did not
+
+		Args:
+			sound_ids (Iterable[int]): the `id` of the sounds of the current page
+			index (DownloadIndex): the index of the download folder
+
+		Returns:
+			the `id` of the sounds recorded, which count as downloaded
+		"""
+		if self.page_started is None:
+			return []
+		recovered:list[int] = []
+		for sound_id in sound_ids:
+			record = index.get(sound_id)
+			# the timestamps of the index and of the checkpoint are both local ISO dates
+			if int(sound_id) not in self.completed and record is not None and record['timestamp'] > self.page_started:
+				self.completed.add(int(sound_id))
+				self.downloaded += 1
+				recovered.append(int(sound_id))
+		if recovered:
+			self.save()
+		return recovered
+
+	def complete(self, sound_id:int) -> None:
+		"""record that the sound with `sound_id` has been downloaded"""
+		self.completed.add(int(sound_id))
+		self.downloaded += 1
+		if monotonic() - self._saved_at >= self._interval:
+			self.save()
+
+	def finish(self) -> None:
+		"""record that the crawl is over"""
+		self.finished = True
+		self.save()
+
+	def save(self) -> None:
+		data:dict[str,Any] = {
+			'search':self.search_args,
+			'output_folder':self.output_folder,
+			'files_count':self.files_count,
+			'layout':self.layout,
+			'page_url':self.page_url,
+			'page_started':self.page_started,
+			'completed':sorted(self.completed),
+			'downloaded':self.downloaded,
+			'finished':self.finished,
+			'timestamp':datetime.now().isoformat(),
+		}
+		folder = os.path.dirname(self._path)
+		if folder != "":
+			os.makedirs(folder, exist_ok=True)
+		temporary = self._path + ".tmp"
+		with open(temporary, "w") as file:
+			json.dump(data, file, indent=4)
+		os.replace(temporary, self._path)
+		self._saved_at = monotonic()
+
+	@property
+	def path(self) -> str:
+		return self._path
+
+	def __repr__(self) -> str:
+		return f"<freesound.freesound_crawl.CrawlCheckpoint {self._path} ({self.downloaded} downloaded)>"
+
+class DateShard:
+	"""The sounds of a query created between `start` and `end`, both included
+
+	Dates are handled in UTC with a precision of one second: a shard one second long can not be split further.
+
+	Args:
+		start (datetime): the oldest `created` date of the shard
+		end (datetime): the newest `created` date of the shard
+		count (int | None, optional): how many sounds of the query fall in the shard, if known
+
+	Usage:
+		```py
+		>>> DateShard(datetime(2010, 1, 1), datetime(2011, 1, 1)).filter
+		'created:[2010-01-01T00:00:00Z TO 2011-01-01T00:00:00Z]'
+		```
+	"""
+	def __init__(self, start:datetime, end:datetime, count:int|None=None) -> None:
+		self.start = self._to_utc(start)
+		self.end = self._to_utc(end)
+		if self.end < self.start:
+			raise ValueError("The end of a DateShard can not come before its start")
+		self.count = count
+
+	@property
+	def filter(self) -> str:
+		"""
+		Returns:
+			the `created` filter of the shard
+		"""
+		return FreeSoundFilters(created=Filter.RANGE(self.start.strftime(DATE_FORMAT), self.end.strftime(DATE_FORMAT))).aslist
+
+	def apply(self, filter:str='') -> str:
+		"""
+		Args:
+			filter (str, optional): a string of valid filter:value (see: [`FreeSoundFilters`][freesound.freesound_filters.FreeSoundFilters])
+
+		Returns:
+			`filter` restricted to the dates of the shard
+		"""
+		return f"{filter} {self.filter}" if filter != '' else self.filter
+
+	def can_split(self) -> bool:
+		return self.end - self.start >= timedelta(seconds=2)
+
+	def split(self) -> tuple["DateShard","DateShard"]:
+		"""
+		Returns:
+			the two halves of the shard. They share the middle instant, so a sound created exactly then belongs to both
+		"""
+		middle = self.start + (self.end - self.start) / 2
+		return DateShard(self.start, middle), DateShard(middle, self.end)
+
+	@staticmethod
+	def _to_utc(date:datetime) -> datetime:
+		if date.tzinfo is not None:
+			date = date.astimezone(timezone.utc).replace(tzinfo=None)
+		return date.replace(microsecond=0)
+
+	def __repr__(self) -> str:
+		return f"<freesound.freesound_crawl.DateShard {self.start.strftime(DATE_FORMAT)} - {self.end.strftime(DATE_FORMAT)} ({self.count} sounds)>"
@@ -11,5 +11,9 @@ class FieldError(Exception):
 		super().__init__(message)
 
 class FreesoundError(Exception):
+	def __init__(self,message:str) -> None:
+		super().__init__(message)
+
+class ThrottlingError(FreesoundError):
 	def __init__(self,message:str) -> None:
 		super().__init__(message)
\ No newline at end of file
@@ -32,6 +32,8 @@ from .freesound_list_maker import ListMaker
 
 class Field():
 	"""Field is a class that provides hints for valid `fields` to query the [`freesound.org`](https://www.freesound.org) database"""
+	__slots__ = ()
+
 	id = "id"
 	name = "name"
 	url = "url"
@@ -68,6 +70,7 @@ class Field():
 	pack_name = "pack_name"
 	ac_analysis = "ac_analysis"
 	is_explicit = "is_explicit"
+	md5 = "md5"
 
 	def _set_file_name(self,name:str) :
 		file_name = name.strip().replace(" ","-")
@@ -77,10 +80,13 @@ class Field():
 	def all(cls) -> str:
 		fields:list[str] = []
 		for attr_name, attr_value in cls.__dict__.items():
-			if not isinstance(attr_value, classmethod) and not attr_name.startswith("__") and not callable(attr_value):
+			# only the `str` attributes are fields: a subclass may define properties or other values
+			if isinstance(attr_value, str) and not attr_name.startswith("__"):
 				fields.append(attr_value)
 		return ','.join(fields)
 
+# the names of all the fields, computed once: use it instead of splitting `Field.all()` again
+FIELD_NAMES:frozenset[str] = frozenset(Field.all().split(","))
 	
 # class Field(FieldsBase):
 # 	"""A class whose attributes are valid `fields` to query the [`freesound.org`](https://www.freesound.org) database"""
@@ -0,0 +1,105 @@
+"""
+The module contains the definition of the DownloadIndex
+
+A utility structure which records every sound downloaded into a folder, keyed by its `id`, in an append-only
+JSON Lines file next to the files (`.freesound_index.jsonl`). A record left half written by a crash is dropped when the index is loaded.
+It is loaded once per run and lets the [`FreeSoundClient`][freesound.freesound_client.FreeSoundClient] decide which sounds to skip
+without probing the file system for each of them, and without confusing two different sounds with the same name.
+
+Each record contains the `id`, the `path` relative to the folder, the `size` and `md5` of the file and the `timestamp` of the download.
+"""
+from datetime import datetime
+import os
+from threading import Lock
+from typing import Any
+
+from .freesound_jsonl import append_jsonl, read_jsonl, repair_jsonl
+
+
+class DownloadIndex:
+	"""The index of the sounds downloaded into `folder`
+
+	Args:
+		folder (str): the download folder
+
+	Usage:
+		```py
+		>>> index = DownloadIndex("sound_lib")
+		>>> 524545 in index
+		True
+		>>> index.get(524545)
+		{'id': 524545, 'path': 'Piano12.mp3', 'size': 51234, 'md5': None, 'timestamp': '2024-03-01T20:42:00'}
+		```
+	"""
+	FILENAME = ".freesound_index.jsonl"
+
+	def __init__(self, folder:str) -> None:
+		self._folder = folder
+		self._path = os.path.join(folder, self.FILENAME)
+		self._records:dict[int,dict[str,Any]] = {}
+		self._owners:dict[str,int] = {}
+		self._lock = Lock()
+		if os.path.exists(self._path):
+			# a record half written by a crash would corrupt the next one appended
+			repair_jsonl(self._path)
+			for record in read_jsonl(self._path):
+				self._store(record)
+
+	def add(self, sound_id:int, path:str, size:int|None=None, md5:str|None=None) -> dict[str,Any]:
+		"""record a downloaded sound
+
+		Args:
+			sound_id (int): the `id` of the sound
+			path (str): the path of the file relative to the folder of the index
+			size (int | None, optional): the size in bytes of the file
+			md5 (str | None, optional): the md5 checksum of the file
+
+		Returns:
+			the new record
+		"""
+		record:dict[str,Any] = {'id':int(sound_id), 'path':path, 'size':size, 'md5':md5, 'timestamp':datetime.now().isoformat()}
+		with self._lock:
+			os.makedirs(self._folder, exist_ok=True)
+			append_jsonl(self._path, [record])
+			self._store(record)
+		return record
+
+	def get(self, sound_id:int) -> dict[str,Any]|None:
+		"""
+		Returns:
+			the record of the sound with `sound_id`, `None` if it has not been downloaded
+		"""
+		return self._records.get(int(sound_id))
+
+	def owner(self, path:str) -> int|None:
+		"""
+		Args:
+			path (str): a path relative to the folder of the index
+
+		Returns:
+			the `id` of the sound downloaded at `path`, `None` if no sound has been downloaded there
+		"""
+		return self._owners.get(path)
+
+	def _store(self, record:dict[str,Any]) -> None:
+		previous = self._records.get(record['id'])
+		if previous is not None and self._owners.get(previous['path']) == record['id']:
+			del self._owners[previous['path']]
+		self._records[record['id']] = record
+		self._owners[record['path']] = record['id']
+
+	@property
+	def path(self) -> str:
+		return self._path
+
+	def __contains__(self, sound_id:object) -> bool:
+		try:
+			return int(sound_id) in self._records # type:ignore
+		except (TypeError, ValueError):
+			return False
+
+	def __len__(self) -> int:
+		return len(self._records)
+
+	def __repr__(self) -> str:
+		return f"<freesound.freesound_index.DownloadIndex {self._path} ({len(self._records)} sounds)>"
@@ -0,0 +1,224 @@
+"""
+The module contains utility functions to read and write JSON Lines files and the definitions of
+- SpilledResults
+- JsonlManifest
+
+A JSON Lines file stores one compact `json` object per line: records can be appended one at a time
+and read back one at a time, without loading the whole file in memory.
+
+`SpilledResults` is a list-like sequence of search results kept in such a file instead of in memory
+(see the `spill_results` option of the [`FreeSoundClient`][freesound.freesound_client.FreeSoundClient]).
+
+A `JsonlManifest` is an append-only record of results or downloads which survives the process
+(see the `results_manifest` and `download_manifest` options of the `FreeSoundClient`).
+
+Details at:
+-----------
+<https://jsonlines.org/>
+"""
+import json
+import os
+from typing import Any, Iterable, Iterator, TextIO
+
+from .formatting import warning
+
+
+def append_jsonl(path:str, records:Iterable[dict[str,Any]]) -> int:
+	"""append `records` at the end of the JSON Lines file at `path`, creating it if needed
+
+	Args:
+		path (str): the path of the file
+		records (Iterable[dict[str, Any]]): the records to write
+
+	Returns:
+		how many records have been written
+	"""
+	count = 0
+	with open(path, "a", encoding="utf-8") as file:
+		for record in records:
+			file.write(json.dumps(record, separators=(",", ":")) + "\n")
+			count += 1
+		file.flush()
+	return count
+
+def read_jsonl(path:str) -> Iterator[dict[str,Any]]:
+	"""lazily read the records of the JSON Lines file at `path`
+
+	A line which is not valid `json` (for example a line half written during a crash) is reported and skipped
+
+	Args:
+		path (str): the path of the file
+
+	Yields:
+		one record for each valid line of the file
+	"""
+	with open(path, "r", encoding="utf-8") as file:
+		for number, line in enumerate(file, start=1):
+			line = line.strip()
+			if line == "":
+				continue
+			try:
+				yield json.loads(line)
+			except json.JSONDecodeError:
+				warning(f"Skipping the corrupted line {number} of {path}")
+
+def repair_jsonl(path:str) -> None:
+	"""remove the bytes after the last complete line of the JSON Lines file at `path`
+
+	A crash while appending can leave a half written last line: the next record appended would be glued to it.
+	Nothing happens if the file does not exist or ends with a new line.
+
+	Args:
+		path (str): the path of the file
+	"""
+	if not os.path.exists(path):
+		return
+	with open(path, "rb+") as file:
+		size = file.seek(0, os.SEEK_END)
+		if size == 0:
+			return
+		file.seek(size - 1)
+		if file.read(1) == b"\n":
+			return
+		end = size
+		while end > 0:
+			start = max(0, end - 65536)
+			file.seek(start)
+			block = file.read(end - start)
+			newline = block.rfind(b"\n")
+			if newline != -1:
+				file.truncate(start + newline + 1)
+				return
+			end = start
+		file.truncate(0)
+
+def dump_json(data:dict[str,Any], file:TextIO, indent:int=4) -> None:
+	"""like `json.dump`, but the [`SpilledResults`][freesound.freesound_jsonl.SpilledResults] values of `data` are written one record at a time
+
+	Args:
+		data (dict[str, Any]): the object to write
+		file (TextIO): an open text file
+		indent (int, optional): the indentation of the keys of `data`
+	"""
+	if not any(isinstance(value, SpilledResults) for value in data.values()):
+		json.dump(data, file, indent=indent)
+		return
+	padding = " " * indent
+	file.write("{")
+	for position, (key, value) in enumerate(data.items()):
+		file.write(("," if position > 0 else "") + "\n" + padding + json.dumps(key) + ": ")
+		if isinstance(value, SpilledResults):
+			file.write("[")
+			for count, record in enumerate(value):
+				file.write(("," if count > 0 else "") + "\n" + padding * 2 + json.dumps(record))
+			file.write("\n" + padding + "]")
+		else:
+			file.write(json.dumps(value))
+	file.write("\n}")
+
+class SpilledResults:
+	"""A list of search results stored in the JSON Lines file at `path`
+
+	Results can only be added at the end. Iterating reads them back from the file one at a time,
+	so the memory used does not depend on how many results there are. The file is emptied when the object is created.
+
+	Args:
+		path (str): the path of the file
+
+	Usage:
+		```py
+		>>> results = SpilledResults("results.jsonl")
+		>>> results.extend(page['results'])
+		>>> len(results)
+		150
+		>>> for sound in results:
+		...     print(sound['name'])
+		```
+	"""
+	def __init__(self, path:str) -> None:
+		self._path = path
+		self._count = 0
+		folder = os.path.dirname(path)
+		if folder != "":
+			os.makedirs(folder, exist_ok=True)
+		open(path, "w").close()
+
+	def append(self, record:dict[str,Any]) -> None:
+		self.extend([record])
+
+	def extend(self, records:Iterable[dict[str,Any]]) -> None:
+		self._count += append_jsonl(self._path, records)
+
+	def clear(self) -> None:
+		open(self._path, "w").close()
+		self._count = 0
+
+	@property
+	def path(self) -> str:
+		return self._path
+
+	def __iter__(self) -> Iterator[dict[str,Any]]:
+		return read_jsonl(self._path)
+
+	def __len__(self) -> int:
+		return self._count
+
+	def __repr__(self) -> str:
+		return f"<freesound.freesound_jsonl.SpilledResults {self._path} ({self._count} results)>"
+
+class JsonlManifest:
+	"""An append-only JSON Lines file at `path`, which keeps the records of previous runs
+
+	Every call of `extend` writes and flushes its records, so a crash loses at most the record being written.
+	A line left half written by a crash is removed when the manifest is opened again.
+
+	Args:
+		path (str): the path of the file
+
+	Usage:
+		```py
+		>>> manifest = JsonlManifest("downloads.jsonl")
+		>>> manifest.append({'id': 524545, 'name': 'Piano12.wav', 'path': 'Piano12.wav'})
+		>>> [record['id'] for record in manifest]
+		[..., 524545]
+		```
+	"""
+	def __init__(self, path:str) -> None:
+		self._path = path
+		self._written = 0
+		folder = os.path.dirname(path)
+		if folder != "":
+			os.makedirs(folder, exist_ok=True)
+		repair_jsonl(path)
+
+	def append(self, record:dict[str,Any]) -> None:
+		self.extend([record])
+
+	def extend(self, records:Iterable[dict[str,Any]]) -> int:
+		"""
+		Returns:
+			how many records have been written
+		"""
+		count = append_jsonl(self._path, records)
+		self._written += count
+		return count
+
+	@property
+	def path(self) -> str:
+		return self._path
+
+	@property
+	def written(self) -> int:
+		"""
+		Returns:
+			how many records have been written since the manifest was opened
+		"""
+		return self._written
+
+	def __iter__(self) -> Iterator[dict[str,Any]]:
+		if not os.path.exists(self._path):
+			return iter(())
+		return read_jsonl(self._path)
+
+	def __repr__(self) -> str:
+		return f"<freesound.freesound_jsonl.JsonlManifest {self._path}>"
@@ -0,0 +1,96 @@
+"""
+The module contains the definition of the FreeSoundLayout
+
+A utility structure which decides where each downloaded sound is placed inside the download folder.
+With hundreds of thousands of files in a single folder, listings, `os.path.exists` checks and backups become slow:
+the layouts spread the files over many smaller sub-folders.
+
+- `flat`: every file in the download folder (`Piano12.wav`)
+- `id_prefix`: sharded by the leading digits of the `id` (`52/45/524545_Piano12.wav`)
+- `pack_name`: grouped by the pack of the sound (`Piano-Notes/Piano12.wav`)
+- `username`: grouped by the author of the sound (`Jaz_the_MAN_2/Piano12.wav`)
+
+The `pack_name` and `username` layouts need the corresponding [`Field`][freesound.freesound_fields.Field] in the search results,
+sounds without it are placed in the `no-pack` and `no-user` folders.
+
+Usage Example
+-------------
+>>> c = FreeSoundClient(USER_ID, API_KEY, "sound_lib", layout=FreeSoundLayout.id_prefix)
+>>> FreeSoundLayout.relative_path(FreeSoundLayout.id_prefix, FreeSoundSoundInstance({'id': 524545, 'name': 'Piano12', 'type': 'wav'}))
+'52/45/524545_Piano12.wav'
+"""
+import os
+
+from .freesound_errors import DataError
+from .freesound_sound import FreeSoundSoundInstance
+
+
+class FreeSoundLayout:
+	"""A Utility Class that lists the valid layouts of a download folder and computes the path of each sound inside it
+	Useful for linting
+
+	Usage:
+		```py
+		>>> c = FreeSoundClient(USER_ID, API_KEY, "sound_lib", layout=FreeSoundLayout.pack_name)
+		```
+	"""
+	flat = "flat"
+	id_prefix = "id_prefix"
+	pack_name = "pack_name"
+	username = "username"
+
+	# the id_prefix layout uses SHARD_LEVELS folders of SHARD_WIDTH digits
+	SHARD_LEVELS = 2
+	SHARD_WIDTH = 2
+
+	@classmethod
+	def all(cls) -> list[str]:
+		return [cls.flat, cls.id_prefix, cls.pack_name, cls.username]
+
+	@classmethod
+	def validate(cls, layout:str) -> str:
+		"""
+		Raises:
+			DataError: if `layout` is not a valid layout
+
+		Returns:
+			the `layout` itself
+		"""
+		if layout not in cls.all():
+			raise DataError(f"'{layout}' is not a valid layout. Use one of {', '.join(cls.all())}")
+		return layout
+
+	@classmethod
+	def relative_path(cls, layout:str, sound:FreeSoundSoundInstance, filename:str|None=None) -> str:
+		"""
+		Args:
+			layout (str): one of the layouts of `FreeSoundLayout`
+			sound (FreeSoundSoundInstance): the sound to place
+			filename (str | None, optional): the name of the file. By default the `name` of the sound
+
+		Returns:
+			the path of the file relative to the download folder
+		"""
+		if filename is None:
+			filename = sound.name
+		filename = filename.replace('/', '-')
+		if layout == cls.flat:
+			return filename
+		if layout == cls.id_prefix:
+			digits = str(sound.id).zfill(cls.SHARD_LEVELS * cls.SHARD_WIDTH)
+			shards = [digits[level * cls.SHARD_WIDTH:(level + 1) * cls.SHARD_WIDTH] for level in range(cls.SHARD_LEVELS)]
+			return os.path.join(*shards, f"{sound.id}_{filename}")
+		if layout == cls.pack_name:
+			return os.path.join(cls._folder_name(sound.pack_name, "no-pack"), filename)
+		if layout == cls.username:
+			return os.path.join(cls._folder_name(sound.username, "no-user"), filename)
+		raise DataError(f"'{layout}' is not a valid layout. Use one of {', '.join(cls.all())}")
+
+	@classmethod
+	def _folder_name(cls, value:str|None, default:str) -> str:
+		if value is None:
+			return default
+		folder = str(value).strip().replace(" ", "-").replace('/', '-').replace('\\', '-')
+		if folder in ("", ".", ".."):
+			return default
+		return folder
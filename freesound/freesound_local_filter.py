@@ -0,0 +1,233 @@
+"""
+The module contains the definition of the LocalFilter
+
+A utility structure which compiles the `filter` strings of [`FreeSoundFilters`][freesound.freesound_filters.FreeSoundFilters]
+(and of the [`Filter`][freesound.filter_types.Filter] helpers) into predicates evaluated locally on search results,
+so that a large harvested list can be sliced again and again without new requests.
+
+The filter is parsed once. Terms separated by spaces must all match, as on freesound.org:
+- `type:wav`: equality, case insensitive. A missing field never matches
+- `type:(wav OR aiff)`, `tag:(nature AND soundscape)`: any or all of the values
+- `duration:[3 TO 5]`, `duration:[3 TO *]`, `created:[* TO 2020-01-01T00:00:00Z]`: ranges, both ends included
+- `tag:piano`: one of the `tags` of the sound
+- `description:piano`, `description:"grand piano"`: a word or a phrase of the text
+- `ac_loudness:[-30 TO -10]`: a value inside the `ac_analysis` of the sound
+
+Some filters have a different name in the results: `tag` is read from `tags`, `original_filename` from `name`,
+`pack` from `pack_name`, `is_geotagged` from `geotag` and the `ac_*` filters from `ac_analysis`.
+The results must contain the fields the filter needs: a sound without them does not match.
+
+Usage Example
+-------------
+>>> wav_loops = LocalFilter(FreeSoundFilters(type=Filter.OR("wav", "aiff"), duration=Filter.RANGE(1, 4), tag="loop"))
+>>> [sound['name'] for sound in wav_loops.select(c.results_list['results'])]
+"""
+from datetime import datetime, timezone
+import re
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+try:
+	import numpy
+except ImportError:
+	numpy = None # type:ignore
+
+from .freesound_errors import DataError
+from .freesound_filters import FreeSoundFilters
+
+# the filters that are read from a differently named field of the results
+FIELD_ALIASES = {'tag':'tags', 'original_filename':'name', 'pack':'pack_name', 'pack_tokenized':'pack_name'}
+# the filters matched word by word, like the tokenized text fields of the server
+TEXT_FIELDS = frozenset({'description', 'original_filename', 'pack_tokenized'})
+NUMERIC_FIELDS = frozenset({
+	'id', 'duration', 'bitdepth', 'bitrate', 'samplerate', 'filesize', 'channels', 'num_downloads', 'avg_rating', 'num_comments',
+	'ac_loudness', 'ac_dynamical_range', 'ac_temporal_centroid', 'ac_log_attack_time', 'ac_tonality_confidence', 'ac_tempo',
+	'ac_tempo_confidence', 'ac_note_midi', 'ac_note_frequency', 'ac_note_confidence', 'ac_brightness', 'ac_depth', 'ac_hardness',
+	'ac_roughness', 'ac_boominess', 'ac_warmth', 'ac_sharpness',
+})
+
+_TERM = re.compile(r'(\w+):(\[[^\]]*\]|\([^)]*\)|"[^"]*"|\S+)')
+_WORD = re.compile(r"\w+")
+
+Matcher = Callable[[Any], bool]
+
+class LocalFilter:
+	"""A `filter` string compiled into a predicate on search results
+
+	Args:
+		filter (str | FreeSoundFilters): a string of valid filter:value (see: [`FreeSoundFilters`][freesound.freesound_filters.FreeSoundFilters])
+
+	Raises:
+		DataError: if the filter can not be parsed
+
+	Usage:
+		```py
+		>>> long_wavs = LocalFilter("type:wav duration:[10 TO *]")
+		>>> long_wavs({'id': 1, 'name': 'rain', 'type': 'wav', 'duration': 12.5})
+		True
+		```
+	"""
+	def __init__(self, filter:"str|FreeSoundFilters") -> None:
+		self._filter = filter.aslist if isinstance(filter, FreeSoundFilters) else filter
+		self._terms:list[tuple[str,Callable[[dict[str,Any]],Any],Matcher,tuple[float,float]|None]] = []
+		position = 0
+		for match in _TERM.finditer(self._filter):
+			if self._filter[position:match.start()].strip() != "":
+				raise DataError(f"Could not parse the filter '{self._filter}' near '{self._filter[position:match.start()].strip()}'")
+			position = match.end()
+			name, value = match.group(1), match.group(2)
+			self._terms.append((name, _accessor(name), *_compile_value(name, value)))
+		if self._filter[position:].strip() != "":
+			raise DataError(f"Could not parse the filter '{self._filter}' near '{self._filter[position:].strip()}'")
+
+	def __call__(self, sound:dict[str,Any]) -> bool:
+		"""
+		Returns:
+			`True` if `sound` matches every term of the filter
+		"""
+		for _, accessor, matcher, _ in self._terms:
+			if not matcher(accessor(sound)):
+				return False
+		return True
+
+	def select(self, results:Iterable[dict[str,Any]]) -> Iterator[dict[str,Any]]:
+		"""lazily yield the results that match the filter
+
+		Args:
+			results (Iterable[dict[str, Any]]): the search results, for example `FreeSoundClient.results_list['results']`
+		"""
+		return (sound for sound in results if self(sound))
+
+	def mask(self, results:Sequence[dict[str,Any]]) -> "numpy.ndarray|list[bool]":
+		"""evaluate the filter on all the results at once
+
+		With `numpy` the numeric ranges are compared on whole columns first, then the other terms are evaluated only on the results still selected.
+
+		Args:
+			results (Sequence[dict[str, Any]]): the search results
+
+		Returns:
+			a boolean for each result, as a `numpy` array if `numpy` is installed
+		"""
+		if numpy is None:
+			return [self(sound) for sound in results]
+		selected = numpy.ones(len(results), dtype=bool)
+		for _, accessor, _, bounds in self._terms:
+			if bounds is not None:
+				values = numpy.fromiter((_to_number(accessor(sound)) for sound in results), dtype=numpy.float64, count=len(results))
+				with numpy.errstate(invalid="ignore"):
+					selected &= (values >= bounds[0]) & (values <= bounds[1])
+		for _, accessor, matcher, bounds in self._terms:
+			if bounds is None:
+				rows = numpy.flatnonzero(selected)
+				selected[rows] = numpy.fromiter((matcher(accessor(results[row])) for row in rows), dtype=bool, count=len(rows))
+		return selected
+
+	@property
+	def filter(self) -> str:
+		return self._filter
+
+	@property
+	def fields(self) -> list[str]:
+		"""
+		Returns:
+			the filters used by the expression
+		"""
+		return [name for name, _, _, _ in self._terms]
+
+	def __repr__(self) -> str:
+		return f"<freesound.freesound_local_filter.LocalFilter {self._filter}>"
+
+def _accessor(name:str) -> Callable[[dict[str,Any]],Any]:
+	if name.startswith("ac_"):
+		return lambda sound: (sound.get('ac_analysis') or {}).get(name)
+	if name == 'is_geotagged':
+		return lambda sound: sound.get('geotag') is not None if 'geotag' in sound else None
+	field = FIELD_ALIASES.get(name, name)
+	return lambda sound: sound.get(field)
+
+def _compile_value(name:str, value:str) -> tuple[Matcher,tuple[float,float]|None]:
+	# returns the matcher of the term and, for numeric ranges, their bounds for the vectorized evaluation
+	if value.startswith("[") and value.endswith("]"):
+		parts = value[1:-1].split(" TO ")
+		if len(parts) != 2:
+			raise DataError(f"Could not parse the range '{value}' of '{name}'")
+		low, high = parts[0].strip(), parts[1].strip()
+		if name == 'created':
+			return _date_range(_date(low, datetime.min), _date(high, datetime.max)), None
+		bounds = (_number(low, float("-inf")), _number(high, float("inf")))
+		return (lambda actual: _in_range(actual, bounds)), bounds
+	if value.startswith("(") and value.endswith(")"):
+		inner = value[1:-1]
+		operator = " AND " if " AND " in inner else " OR "
+		matchers = [_compile_scalar(name, item.strip()) for item in inner.split(operator)]
+		if operator == " AND ":
+			return (lambda actual: all(matcher(actual) for matcher in matchers)), None
+		return (lambda actual: any(matcher(actual) for matcher in matchers)), None
+	return _compile_scalar(name, value), None
+
+def _compile_scalar(name:str, value:str) -> Matcher:
+	phrase = value[1:-1] if len(value) > 1 and value.startswith('"') and value.endswith('"') else value
+	if name in NUMERIC_FIELDS:
+		number = _number(phrase, float("nan"))
+		return lambda actual: _to_number(actual) == number
+	if name == 'tag':
+		tag = phrase.lower()
+		return lambda actual: isinstance(actual, list) and any(str(item).lower() == tag for item in actual)
+	if name in TEXT_FIELDS:
+		words = [word.lower() for word in _WORD.findall(phrase)]
+		return lambda actual: actual is not None and _contains_words(str(actual), words)
+	if phrase.lower() in ("true", "false"):
+		expected = phrase.lower() == "true"
+		return lambda actual: isinstance(actual, bool) and actual == expected
+	text = phrase.lower()
+	return lambda actual: actual is not None and str(actual).lower() == text
+
+def _contains_words(text:str, words:list[str]) -> bool:
+	# the words of a phrase must follow each other
+	tokens = [token.lower() for token in _WORD.findall(text)]
+	size = len(words)
+	return size > 0 and any(tokens[start:start + size] == words for start in range(len(tokens) - size + 1))
+
+def _in_range(actual:Any, bounds:tuple[float,float]) -> bool:
+	number = _to_number(actual)
+	return bounds[0] <= number <= bounds[1]
+
+def _date_range(low:datetime, high:datetime) -> Matcher:
+	def matcher(actual:Any) -> bool:
+		if actual is None:
+			return False
+		try:
+			created = _date(str(actual), None)
+		except DataError:
+			return False
+		return created is not None and low <= created <= high
+	return matcher
+
+def _to_number(value:Any) -> float:
+	if isinstance(value, bool) or value is None:
+		return float("nan")
+	try:
+		return float(value)
+	except (TypeError, ValueError):
+		return float("nan")
+
+def _number(text:str, wildcard:float) -> float:
+	if text == "*":
+		return wildcard
+	try:
+		return float(text)
+	except ValueError:
+		raise DataError(f"'{text}' is not a number")
+
+def _date(text:str, wildcard:datetime|None) -> datetime|None:
+	if text == "*":
+		return wildcard
+	if text.upper() == "NOW":
+		return datetime.now(timezone.utc).replace(tzinfo=None)
+	try:
+		date = datetime.fromisoformat(text.rstrip("Z"))
+	except ValueError:
+		raise DataError(f"'{text}' is not a date")
+	if date.tzinfo is not None:
+		date = date.astimezone(timezone.utc).replace(tzinfo=None)
+	return date
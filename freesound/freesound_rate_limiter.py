@@ -0,0 +1,130 @@
+"""
+The module contains the definitions of
+- TokenBucket
+- RateLimiter
+
+2 utility structures which keep the requests made to <freesound.org> under the limits of the API.
+A single `RateLimiter` is shared by all the functions of the [`freesound_api`](api-fs-api.md) (see [`configure_rate_limit`][freesound.freesound_requests.configure_rate_limit])
+
+Details at:
+-----------
+<https://freesound.org/docs/api/overview.html#throttling>
+
+Usage Example
+-------------
+>>> limiter = RateLimiter(per_minute=60, per_day=2000)
+>>> limiter.acquire() # blocks until a request can be made
+"""
+import asyncio
+from threading import Lock
+from time import monotonic, sleep
+
+# see https://freesound.org/docs/api/overview.html#throttling
+REQUESTS_PER_MINUTE = 60
+REQUESTS_PER_DAY = 2000
+
+class TokenBucket:
+	"""A bucket that holds up to `capacity` tokens and is refilled continuously with `capacity` tokens every `period` seconds
+
+	It is not thread-safe on its own: the [`RateLimiter`][freesound.freesound_rate_limiter.RateLimiter] guards its buckets with a lock
+
+	Args:
+		capacity (int): the maximum number of tokens in the bucket
+		period (float): how many seconds it takes to refill an empty bucket
+	"""
+	def __init__(self, capacity:int, period:float) -> None:
+		if capacity <= 0 or period <= 0:
+			raise ValueError("A TokenBucket needs a positive capacity and period")
+		self._capacity = capacity
+		self._rate = capacity / period
+		self._tokens = float(capacity)
+		self._updated = monotonic()
+
+	def refill(self, now:float) -> None:
+		self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+		self._updated = now
+
+	def wait_time(self) -> float:
+		"""
+		Returns:
+			how many seconds should pass before a token is available
+		"""
+		if self._tokens >= 1:
+			return 0.0
+		return (1 - self._tokens) / self._rate
+
+	def consume(self) -> None:
+		self._tokens -= 1
+
+	def drain(self) -> None:
+		self._tokens = 0.0
+
+	@property
+	def capacity(self) -> int:
+		return self._capacity
+
+	def __repr__(self) -> str:
+		return f"<freesound.freesound_rate_limiter.TokenBucket {self._tokens:.1f}/{self._capacity}>"
+
+class RateLimiter:
+	"""A thread-safe rate limiter made of a per-minute and a per-day [`TokenBucket`][freesound.freesound_rate_limiter.TokenBucket]
+
+	A request can be made only when both buckets have a token left. The default values are the limits of a standard API key.
+
+	Args:
+		per_minute (int | None, optional): how many requests can be made every minute. `None` disables the limit
+		per_day (int | None, optional): how many requests can be made every day. `None` disables the limit
+
+	Usage:
+		```py
+		>>> limiter = RateLimiter(per_minute=60, per_day=2000)
+		>>> limiter.acquire()
+		```
+	"""
+	def __init__(self, per_minute:int|None=REQUESTS_PER_MINUTE, per_day:int|None=REQUESTS_PER_DAY) -> None:
+		self._minute_bucket = TokenBucket(per_minute, 60) if per_minute is not None else None
+		self._day_bucket = TokenBucket(per_day, 24 * 60 * 60) if per_day is not None else None
+		self._buckets = [bucket for bucket in (self._minute_bucket, self._day_bucket) if bucket is not None]
+		self._lock = Lock()
+
+	def reserve(self) -> float:
+		"""try to take a token from every bucket without blocking
+
+		Returns:
+			`0` if the request can be made right away, otherwise how many seconds the caller should wait before trying again
+		"""
+		with self._lock:
+			now = monotonic()
+			wait = 0.0
+			for bucket in self._buckets:
+				bucket.refill(now)
+				wait = max(wait, bucket.wait_time())
+			if wait == 0:
+				for bucket in self._buckets:
+					bucket.consume()
+			return wait
+
+	def acquire(self) -> None:
+		"""block the calling thread until a request can be made"""
+		while True:
+			wait = self.reserve()
+			if wait == 0:
+				return
+			sleep(wait)
+
+	async def acquire_async(self) -> None:
+		"""wait on the running event loop until a request can be made"""
+		while True:
+			wait = self.reserve()
+			if wait == 0:
+				return
+			await asyncio.sleep(wait)
+
+	def penalize(self) -> None:
+		"""empty the per-minute bucket after the server answered `429 Too Many Requests`"""
+		with self._lock:
+			if self._minute_bucket is not None:
+				self._minute_bucket.drain()
+
+	def __repr__(self) -> str:
+		return f"<freesound.freesound_rate_limiter.RateLimiter {self._buckets}>"
@@ -1,5 +1,169 @@
-from requests import JSONDecodeError, Response, get, post, exceptions # type:ignore
-from .freesound_errors import AuthorizationError, FreesoundError
+from threading import RLock
+from time import sleep
+from typing import Any
+from requests import JSONDecodeError, Response, Session, exceptions # type:ignore
+from requests.adapters import HTTPAdapter # type:ignore
+from .freesound_cache import CachedResponse, ResponseCache
+from .freesound_errors import AuthorizationError, DataError, FreesoundError, ThrottlingError
+from .freesound_rate_limiter import REQUESTS_PER_DAY, REQUESTS_PER_MINUTE, RateLimiter
+from .freesound_retry import RetryPolicy
+
+_session:Session|None = None
+_session_lock = RLock()
+_rate_limiter:RateLimiter|None = RateLimiter()
+_retry_policy = RetryPolicy()
+_cache:ResponseCache|None = None
+_session_settings:dict[str,Any] = {}
+
+def configure_session(pool_connections:int=4, pool_maxsize:int=10, keep_alive:bool=True, pool_block:bool=False) -> Session:
+	"""Create the HTTP session shared by every request made to <freesound.org>
+
+	All the functions of the [`freesound_api`](api-fs-api.md) and the [`FreeSoundClient`][freesound.freesound_client.FreeSoundClient]
+	go through the same `requests.Session` so that TCP and TLS connections are reused across search pages, sound infos and downloads.
+	Calling this function replaces (and closes) the current session.
+
+	Each thread making a request at the same time holds a connection: when more threads than `pool_maxsize` share the session
+	the connections in excess are discarded after use ("Connection pool is full") instead of being kept alive.
+	The methods of the [`FreeSoundClient`][freesound.freesound_client.FreeSoundClient] that take `workers` grow the pool
+	to fit them with [`ensure_pool_size`][freesound.freesound_requests.ensure_pool_size].
+
+	Args:
+		pool_connections (int, optional): how many per-host connection pools should be cached
+		pool_maxsize (int, optional): the maximum number of connections kept open for each host
+		keep_alive (bool, optional): whether connections should be kept open between requests
+		pool_block (bool, optional): if `True` a request waits for a free connection instead of opening one more than `pool_maxsize`
+
+	Returns:
+		the new `requests.Session`
+	"""
+	global _session
+	session = Session()
+	adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+	session.mount("https://", adapter)
+	session.mount("http://", adapter)
+	if not keep_alive:
+		session.headers["Connection"] = "close"
+	with _session_lock:
+		old_session = _session
+		_session = session
+		_session_settings.update(pool_connections=pool_connections, pool_maxsize=pool_maxsize, keep_alive=keep_alive, pool_block=pool_block)
+	if old_session is not None:
+		old_session.close()
+	return session
+
+def ensure_pool_size(size:int) -> Session:
+	"""make sure the shared session keeps at least `size` connections open for each host
+
+	The session is replaced, with the other settings unchanged, only when its pool is smaller than `size`.
+
+	Args:
+		size (int): how many threads can make a request at the same time
+
+	Returns:
+		the shared `requests.Session`
+	"""
+	with _session_lock:
+		session = get_session()
+		if _session_settings['pool_maxsize'] < size:
+			session = configure_session(**{**_session_settings, 'pool_maxsize':size})
+	return session
+
+def get_session() -> Session:
+	"""get the shared `requests.Session`, creating it with the default settings if needed
+
+	Returns:
+		the `requests.Session` used by [`make_get_request`][freesound.freesound_requests.make_get_request] and [`make_post_request`][freesound.freesound_requests.make_post_request]
+	"""
+	if _session is None:
+		with _session_lock:
+			if _session is None:
+				configure_session()
+	return _session # type:ignore
+
+def close_session() -> None:
+	"""close every open connection of the shared session"""
+	global _session
+	with _session_lock:
+		old_session = _session
+		_session = None
+	if old_session is not None:
+		old_session.close()
+
+def configure_rate_limit(per_minute:int|None=REQUESTS_PER_MINUTE, per_day:int|None=REQUESTS_PER_DAY) -> RateLimiter|None:
+	"""Set the limits of the [`RateLimiter`][freesound.freesound_rate_limiter.RateLimiter] shared by every request made to <freesound.org>
+
+	The default values are the limits of a standard API key, see <https://freesound.org/docs/api/overview.html#throttling>.
+	Passing `None` for both limits disables rate limiting.
+
+	Args:
+		per_minute (int | None, optional): how many requests can be made every minute
+		per_day (int | None, optional): how many requests can be made every day
+
+	Returns:
+		the new `RateLimiter` or `None` if rate limiting has been disabled
+	"""
+	global _rate_limiter
+	if per_minute is None and per_day is None:
+		_rate_limiter = None
+	else:
+		_rate_limiter = RateLimiter(per_minute, per_day)
+	return _rate_limiter
+
+def get_rate_limiter() -> RateLimiter|None:
+	"""
+	Returns:
+		the `RateLimiter` every request goes through, `None` if rate limiting is disabled
+	"""
+	return _rate_limiter
+
+def configure_retry(policy:RetryPolicy|None=None) -> RetryPolicy:
+	"""Set the [`RetryPolicy`][freesound.freesound_retry.RetryPolicy] shared by every request made to <freesound.org>
+
+	Connection errors, timeouts and the status codes listed in the policy are retried with exponential backoff,
+	honouring the `Retry-After` header sent by the server. Passing `None` disables retries.
+
+	Args:
+		policy (RetryPolicy | None, optional): the policy to apply
+
+	Returns:
+		the `RetryPolicy` in use
+	"""
+	global _retry_policy
+	_retry_policy = policy if policy is not None else RetryPolicy(max_attempts=1)
+	return _retry_policy
+
+def get_retry_policy() -> RetryPolicy:
+	"""
+	Returns:
+		the `RetryPolicy` every request goes through
+	"""
+	return _retry_policy
+
+def configure_cache(cache:ResponseCache|None) -> ResponseCache|None:
+	"""Set the [`ResponseCache`][freesound.freesound_cache.ResponseCache] used by every GET request made to <freesound.org>
+
+	Downloads and the requests about the authenticated user are never cached. Passing `None` disables caching.
+
+	Args:
+		cache (ResponseCache | None): the cache to use, for example a [`SQLiteCache`][freesound.freesound_cache.SQLiteCache]
+
+	Returns:
+		the `ResponseCache` in use
+	"""
+	global _cache
+	_cache = cache
+	return _cache
+
+def get_cache() -> ResponseCache|None:
+	"""
+	Returns:
+		the `ResponseCache` in use, `None` if caching is disabled
+	"""
+	return _cache
+
+def _throttle() -> None:
+	if _rate_limiter is not None:
+		_rate_limiter.acquire()
 
 def handle_response(res:Response) -> None:
 		print(res.url)
@@ -7,48 +171,111 @@ def handle_response(res:Response) -> None:
 		try:
 			res.raise_for_status()
 		except:
-			err_code = res.status_code
-			url = res.url
-			if err_code == 400:
-				# TODO write tests for error 400
+			details:str|None = None
+			if res.status_code == 400:
 				try:
 					details = res.json()['detail']
-					raise FreesoundError(f"There was an error with your request. Read the details carefully\n{details}")
 				except JSONDecodeError:
-					raise FreesoundError(f"The request at {url} is either missing parameters or there is an error with the API")
-					# raise FreesoundError(e)
-			elif err_code == 401:
-				raise AuthorizationError("The crediantials you provided are invalid.")
-			elif err_code == 403:
-				raise FreesoundError(f"Visiting {url} should be done via 'https'")
-			elif err_code == 404:
-				raise FreesoundError(f"{url} not found. There are is nothing to retrieve at {url}")
-			elif err_code == 405:
-				raise FreesoundError(f"The method {res.request.method} is not allowed in this page")
-			elif err_code == 409:
-				# TODO check response for more information
-				raise FreesoundError(f"The request is valid but it can not be processed because: {res}")
-			elif err_code == 429:
-				raise FreesoundError("Too many requests. Read https://freesound.org/docs/api/overview.html#throttling for more information")
-			else:
-				raise FreesoundError("Server error: contact the Freesound mailing list")
-
-def make_get_request(url:str, header:dict[str,str] = {},params:dict[str,str]={}) -> Response:
-	try:
-		response:Response = get(url, headers=header, params=params, timeout=5)
-		handle_response(response)
-		return response
-	except exceptions.ConnectionError:
-		print("There are problems connecting to freesound.org")
-		exit(0)
-	except exceptions.ReadTimeout:
-		print("Connection to Freesound.org timed out after 5 seconds")
-		exit(0)
+					pass
+			raise_for_status(res.status_code, res.url, str(res.request.method), details)
+
+def raise_for_status(err_code:int, url:str, method:str, details:str|None=None) -> None:
+		"""raise the exception matching an HTTP error status returned by <freesound.org>
+
+		It is shared by the blocking and the asynchronous requests
+
+		Args:
+			err_code (int): the HTTP status code of the response
+			url (str): the url of the request
+			method (str): the HTTP method of the request
+			details (str | None, optional): the `detail` field of the body of a `400` response
+		"""
+		if err_code < 400:
+			return
+		if err_code == 400:
+			# TODO write tests for error 400
+			if details is not None:
+				raise FreesoundError(f"There was an error with your request. Read the details carefully\n{details}")
+			raise FreesoundError(f"The request at {url} is either missing parameters or there is an error with the API")
+		elif err_code == 401:
+			raise AuthorizationError("The crediantials you provided are invalid.")
+		elif err_code == 403:
+			raise FreesoundError(f"Visiting {url} should be done via 'https'")
+		elif err_code == 404:
+			raise FreesoundError(f"{url} not found. There are is nothing to retrieve at {url}")
+		elif err_code == 405:
+			raise FreesoundError(f"The method {method} is not allowed in this page")
+		elif err_code == 409:
+			# TODO check response for more information
+			raise FreesoundError(f"The request is valid but it can not be processed because: <Response [{err_code}]>")
+		elif err_code == 416:
+			raise DataError(f"The range requested from {url} can not be satisfied")
+		elif err_code == 429:
+			if _rate_limiter is not None:
+				_rate_limiter.penalize()
+			raise ThrottlingError("Too many requests. Read https://freesound.org/docs/api/overview.html#throttling for more information")
+		else:
+			raise FreesoundError("Server error: contact the Freesound mailing list")
+
+def make_get_request(url:str, header:dict[str,str] = {},params:dict[str,str]={}, stream:bool=False, cache:bool=True) -> Response:
+	if _cache is None or stream or not cache:
+		return _send_request("GET", url, headers=header, params=params, stream=stream)
+	return _cached_get_request(_cache, url, header, params)
 
 def make_post_request(url:str, data:dict[str,str]) -> Response:
-	try:
-		response:Response = post(url,data, timeout=5)
-		handle_response(response)
+	return _send_request("POST", url, data=data)
+
+def _cached_get_request(cache:ResponseCache, url:str, header:dict[str,str], params:dict[str,str]) -> Response:
+	key = cache.key("GET", url, params)
+	entry = cache.get(key)
+	if entry is not None and cache.is_fresh(entry):
+		return entry.to_response()
+	headers = dict(header)
+	if entry is not None:
+		# ask the server whether the stale response is still valid
+		if entry.etag is not None:
+			headers["If-None-Match"] = entry.etag
+		if entry.last_modified is not None:
+			headers["If-Modified-Since"] = entry.last_modified
+	response = _send_request("GET", url, headers=headers, params=params)
+	if response.status_code == 304 and entry is not None:
+		cache.touch(key)
+		return entry.to_response()
+	if response.status_code == 200:
+		cache.set(key, CachedResponse.from_response(response))
+	return response
+
+def _send_request(method:str, url:str, **kwargs:Any) -> Response:
+	# transient errors are retried following the shared RetryPolicy, everything else goes to handle_response
+	attempt = 0
+	while True:
+		attempt += 1
+		try:
+			_throttle()
+			response:Response = get_session().request(method, url, timeout=5, **kwargs)
+		except (exceptions.ConnectionError, exceptions.Timeout) as e:
+			if not _retry_policy.should_retry(attempt):
+				if isinstance(e, exceptions.Timeout):
+					raise FreesoundError(f"Connection to Freesound.org timed out {attempt} times")
+				raise FreesoundError(f"There are problems connecting to freesound.org: {e}")
+			_wait_before_retry(attempt, f"Connection error ({type(e).__name__})")
+			continue
+		if _retry_policy.should_retry(attempt, response.status_code):
+			if response.status_code == 429 and _rate_limiter is not None:
+				_rate_limiter.penalize()
+			retry_after = response.headers.get("Retry-After")
+			response.close()
+			_wait_before_retry(attempt, f"Response {response.status_code} from {url}", retry_after)
+			continue
+		try:
+			handle_response(response)
+		except Exception:
+			# a streamed response holds its connection until it is closed
+			response.close()
+			raise
 		return response
-	except ConnectionError:
-		exit(0)
\ No newline at end of file
+
+def _wait_before_retry(attempt:int, reason:str, retry_after:str|None=None) -> None:
+	wait = _retry_policy.delay(attempt, retry_after)
+	print(f"{reason}. Retrying in {wait:.1f} seconds (attempt {attempt + 1} of {_retry_policy.max_attempts})")
+	sleep(wait)
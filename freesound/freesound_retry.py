@@ -0,0 +1,104 @@
+"""
+The module contains the definition of the RetryPolicy
+
+A utility structure which decides whether and when a failed request to <freesound.org> should be repeated.
+A single `RetryPolicy` is shared by all the functions of the [`freesound_api`](api-fs-api.md) (see [`configure_retry`][freesound.freesound_requests.configure_retry])
+
+Details at:
+-----------
+<https://freesound.org/docs/api/overview.html#errors>
+
+Usage Example
+-------------
+>>> policy = RetryPolicy(max_attempts=8, backoff_factor=1)
+>>> policy.delay(3, retry_after="10")
+10.0
+"""
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import random
+
+from .freesound_errors import ThrottlingError
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+class RetryPolicy:
+	"""Exponential backoff with jitter for transient errors
+
+	The n-th retry waits a random time between 0 and `backoff_factor * 2 ** (n - 1)` seconds (never more than `max_backoff`).
+	When the server sends a `Retry-After` header its value is used instead, in full: the request is never repeated earlier than the server asked.
+	A `Retry-After` longer than `max_backoff` (for example when the daily quota is exhausted) ends the retries with a `ThrottlingError`.
+
+	Args:
+		max_attempts (int, optional): how many times a request is sent before giving up, `1` means no retries
+		backoff_factor (float, optional): the base delay in seconds of the exponential backoff
+		max_backoff (float, optional): the maximum delay in seconds between two attempts
+		jitter (bool, optional): whether the delay should be randomized to avoid many clients retrying at the same time
+		retry_statuses (frozenset[int], optional): the HTTP status codes that should be retried
+
+	Usage:
+		```py
+		>>> configure_retry(RetryPolicy(max_attempts=10, max_backoff=120))
+		```
+	"""
+	def __init__(self, max_attempts:int=5, backoff_factor:float=0.5, max_backoff:float=60.0, jitter:bool=True, retry_statuses:frozenset[int]=RETRY_STATUSES) -> None:
+		if max_attempts < 1:
+			raise ValueError("A RetryPolicy needs at least 1 attempt")
+		self.max_attempts = max_attempts
+		self.backoff_factor = backoff_factor
+		self.max_backoff = max_backoff
+		self.jitter = jitter
+		self.retry_statuses = retry_statuses
+
+	def should_retry(self, attempt:int, status_code:int|None=None) -> bool:
+		"""
+		Args:
+			attempt (int): how many times the request has been sent so far
+			status_code (int | None, optional): the status code of the response, `None` if the connection failed
+
+		Returns:
+			`True` if the request should be sent again
+		"""
+		if attempt >= self.max_attempts:
+			return False
+		return status_code is None or status_code in self.retry_statuses
+
+	def delay(self, attempt:int, retry_after:str|None=None) -> float:
+		"""
+		Args:
+			attempt (int): how many times the request has been sent so far
+			retry_after (str | None, optional): the value of the `Retry-After` header of the response
+
+		Raises:
+			ThrottlingError: if the server asks to wait longer than `max_backoff`
+
+		Returns:
+			how many seconds to wait before the next attempt
+		"""
+		if retry_after is not None:
+			server_delay = self._parse_retry_after(retry_after)
+			if server_delay is not None:
+				if server_delay > self.max_backoff:
+					raise ThrottlingError(f"freesound.org asked to wait {server_delay:.0f} seconds before retrying, longer than the maximum backoff of {self.max_backoff:.0f} seconds. Read https://freesound.org/docs/api/overview.html#throttling for more information")
+				return server_delay
+		backoff = min(self.max_backoff, self.backoff_factor * 2 ** (attempt - 1))
+		if self.jitter:
+			backoff = random.uniform(0, backoff)
+		return backoff
+
+	def _parse_retry_after(self, retry_after:str) -> float|None:
+		# Retry-After is either a number of seconds or an HTTP date
+		try:
+			return max(0.0, float(retry_after))
+		except ValueError:
+			pass
+		try:
+			retry_date = parsedate_to_datetime(retry_after)
+		except (TypeError, ValueError):
+			return None
+		if retry_date.tzinfo is None:
+			retry_date = retry_date.replace(tzinfo=timezone.utc)
+		return max(0.0, (retry_date - datetime.now(timezone.utc)).total_seconds())
+
+	def __repr__(self) -> str:
+		return f"<freesound.freesound_retry.RetryPolicy max_attempts={self.max_attempts}>"
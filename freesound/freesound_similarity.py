@@ -0,0 +1,225 @@
+"""
+The module contains the definition of the SimilarityIndex
+
+A utility structure which finds the sounds most similar to a sound, or to a vector of descriptors, among the results
+already collected in a [`DescriptorMatrix`][freesound.freesound_analysis.DescriptorMatrix], without any request to <freesound.org>.
+
+It requires the optional dependency `numpy`
+```
+pip install numpy
+```
+
+By default every query compares the vector with all the sounds at once (an exact, vectorized search).
+For large catalogues the sounds can be grouped in `clusters` with k-means: a query then compares the vector only
+with the sounds of the `probes` clusters closest to it, which is much faster but may miss some neighbours.
+
+Usage Example
+-------------
+>>> c.search("piano", fields=Field.analysis, descriptors=Descriptor.lowlevel_mfcc, page_size=150)
+>>> c.get_all_pages()
+>>> index = c.similarity_index()
+>>> for sound, distance in index.similar_to(524545, k=5):
+...     print(sound.name, distance)
+"""
+from typing import Any, Iterable, Sequence
+import warnings
+
+try:
+	import numpy
+except ImportError:
+	numpy = None # type:ignore
+
+from .freesound_analysis import DescriptorMatrix, _ensure_numpy
+from .freesound_sound import FreeSoundSoundInstance
+
+# the rows compared with the centroids at once while clustering, to bound the memory used
+ASSIGN_CHUNK_SIZE = 65536
+# the sounds of `similar_to_many` compared with the whole index at once
+QUERY_CHUNK_SIZE = 256
+
+class SimilarityIndex:
+	"""A nearest-neighbour index over the rows of a [`DescriptorMatrix`][freesound.freesound_analysis.DescriptorMatrix]
+
+	Each column is standardized (zero mean and unit variance) so that descriptors with large values do not dominate the others,
+	and missing values are replaced by the mean of their column.
+
+	Args:
+		matrix (DescriptorMatrix): the descriptors of the sounds
+		sounds (Iterable[dict[str, Any]]): the search results the matrix was built from, used to return the neighbours as sound instances
+		metric (str, optional): `"cosine"` or `"l2"`. Cosine results are sorted by decreasing similarity, L2 results by increasing distance
+		clusters (int | None, optional): the number of k-means clusters of an approximate index. By default the index is exact
+		probes (int, optional): how many clusters are searched by each query of an approximate index
+		iterations (int, optional): the number of k-means iterations
+		seed (int, optional): the seed of the k-means initialization
+
+	Usage:
+		```py
+		>>> index = SimilarityIndex(c.descriptor_matrix(), c.results_list['results'], metric="l2", clusters=256)
+		>>> index.query(vector, k=10)
+		```
+	"""
+	METRICS = ("cosine", "l2")
+
+	def __init__(self, matrix:DescriptorMatrix, sounds:Iterable[dict[str,Any]], metric:str="cosine", clusters:int|None=None, probes:int=8, iterations:int=10, seed:int=0) -> None:
+		_ensure_numpy()
+		if metric not in self.METRICS:
+			raise ValueError(f"'{metric}' is not a valid metric. Use one of {', '.join(self.METRICS)}")
+		if clusters is not None and clusters < 1:
+			raise ValueError("The number of clusters must be at least 1")
+		self._metric = metric
+		self._ids = numpy.asarray(matrix.ids, dtype=numpy.int64)
+		self._index = matrix.index
+		self._sounds = {int(sound['id']):sound for sound in sounds if int(sound['id']) in matrix.index}
+		values = matrix.values
+		with warnings.catch_warnings():
+			# a column without any value has no mean
+			warnings.simplefilter("ignore", RuntimeWarning)
+			self._mean = numpy.nan_to_num(numpy.nanmean(values, axis=0)) if len(values) > 0 else numpy.zeros(values.shape[1], dtype=numpy.float32)
+			std = numpy.nan_to_num(numpy.nanstd(values, axis=0)) if len(values) > 0 else numpy.ones(values.shape[1], dtype=numpy.float32)
+		self._scale = numpy.where(std > 0, std, 1).astype(numpy.float32)
+		self._vectors = self._prepare(values)
+		self._norms = numpy.einsum("ij,ij->i", self._vectors, self._vectors)
+		self._probes = probes
+		self._centroids:"numpy.ndarray|None" = None
+		self._members:list["numpy.ndarray"] = []
+		if clusters is not None and len(self._vectors) > 0:
+			self._build_clusters(min(clusters, len(self._vectors)), iterations, seed)
+
+	def query(self, vector:"Sequence[float]|numpy.ndarray", k:int=10) -> list[tuple[FreeSoundSoundInstance,float]]:
+		"""find the `k` sounds closest to a vector of descriptors
+
+		Args:
+			vector (Sequence[float] | numpy.ndarray): the values of the columns of the matrix, `nan` for the missing ones
+			k (int, optional): the number of neighbours
+
+		Returns:
+			the neighbours and their similarity (cosine) or distance (l2)
+		"""
+		query = self._prepare(numpy.asarray(vector, dtype=numpy.float32).reshape(1, -1))[0]
+		return self._search(query, k, exclude=None)
+
+	def similar_to(self, sound_id:int, k:int=10) -> list[tuple[FreeSoundSoundInstance,float]]:
+		"""find the `k` sounds closest to a sound of the index, the sound itself excluded
+
+		Args:
+			sound_id (int): the `id` of a sound of the index
+			k (int, optional): the number of neighbours
+
+		Raises:
+			KeyError: if the sound is not in the index
+
+		Returns:
+			the neighbours and their similarity (cosine) or distance (l2)
+		"""
+		row = self._index[int(sound_id)]
+		return self._search(self._vectors[row], k, exclude=row)
+
+	def similar_to_many(self, sound_ids:Iterable[int], k:int=10) -> dict[int,list[tuple[FreeSoundSoundInstance,float]]]:
+		"""like [`similar_to`][freesound.freesound_similarity.SimilarityIndex.similar_to] for many sounds
+
+		An exact index compares a block of sounds with the whole index in a single matrix product.
+
+		Returns:
+			the neighbours of each sound, keyed by `id`
+		"""
+		ids = [int(sound_id) for sound_id in sound_ids]
+		if self._centroids is not None:
+			return {sound_id:self.similar_to(sound_id, k) for sound_id in ids}
+		neighbours:dict[int,list[tuple[FreeSoundSoundInstance,float]]] = {}
+		k = min(k, len(self._vectors) - 1)
+		for start in range(0, len(ids), QUERY_CHUNK_SIZE):
+			chunk = ids[start:start + QUERY_CHUNK_SIZE]
+			rows = numpy.asarray([self._index[sound_id] for sound_id in chunk], dtype=numpy.int64)
+			scores = self._scores(self._vectors[rows], None)
+			# a sound is not similar to itself
+			scores[numpy.arange(len(rows)), rows] = numpy.inf
+			for sound_id, row_scores in zip(chunk, scores):
+				neighbours[sound_id] = self._best(row_scores, None, k)
+		return neighbours
+
+	def _prepare(self, values:"numpy.ndarray") -> "numpy.ndarray":
+		vectors = (values - self._mean) / self._scale
+		vectors = numpy.nan_to_num(vectors, nan=0.0).astype(numpy.float32)
+		if self._metric == "cosine":
+			norms = numpy.linalg.norm(vectors, axis=1, keepdims=True)
+			vectors /= numpy.where(norms > 0, norms, 1)
+		return vectors
+
+	def _search(self, query:"numpy.ndarray", k:int, exclude:int|None) -> list[tuple[FreeSoundSoundInstance,float]]:
+		if self._centroids is None:
+			scores = self._scores(query.reshape(1, -1), None)[0]
+			if exclude is not None:
+				scores[exclude] = numpy.inf
+			return self._best(scores, None, min(k, len(scores) - (exclude is not None)))
+		distances = numpy.einsum("ij,ij->i", self._centroids, self._centroids) - 2 * self._centroids @ query
+		nearest = numpy.argsort(distances)[:self._probes]
+		rows = numpy.concatenate([self._members[cluster] for cluster in nearest])
+		if exclude is not None:
+			rows = rows[rows != exclude]
+		return self._best(self._scores(query.reshape(1, -1), rows)[0], rows, min(k, len(rows)))
+
+	def _scores(self, queries:"numpy.ndarray", rows:"numpy.ndarray|None") -> "numpy.ndarray":
+		# lower is closer for both metrics. `rows` are the candidates, `None` for all the sounds
+		vectors = self._vectors if rows is None else self._vectors[rows]
+		norms = self._norms if rows is None else self._norms[rows]
+		products = queries @ vectors.T
+		if self._metric == "cosine":
+			# the vectors have unit length: the dot product is the cosine similarity
+			return -products
+		return norms[None, :] - 2 * products + numpy.einsum("ij,ij->i", queries, queries)[:, None]
+
+	def _best(self, scores:"numpy.ndarray", rows:"numpy.ndarray|None", k:int) -> list[tuple[FreeSoundSoundInstance,float]]:
+		if k < 1:
+			return []
+		best = numpy.argpartition(scores, k - 1)[:k]
+		best = best[numpy.argsort(scores[best])]
+		neighbours:list[tuple[FreeSoundSoundInstance,float]] = []
+		for position in best:
+			sound_id = int(self._ids[position if rows is None else rows[position]])
+			score = float(-scores[position]) if self._metric == "cosine" else float(numpy.sqrt(max(scores[position], 0)))
+			neighbours.append((FreeSoundSoundInstance(self._sounds[sound_id]), score))
+		return neighbours
+
+	def _build_clusters(self, clusters:int, iterations:int, seed:int) -> None:
+		# k-means on the prepared vectors: for cosine they have unit length, so euclidean clusters follow the angles
+		generator = numpy.random.default_rng(seed)
+		centroids = self._vectors[generator.choice(len(self._vectors), clusters, replace=False)].copy()
+		assignment = numpy.zeros(len(self._vectors), dtype=numpy.int64)
+		for _ in range(max(1, iterations)):
+			assignment = self._assign(centroids)
+			sums = numpy.zeros_like(centroids)
+			numpy.add.at(sums, assignment, self._vectors)
+			counts = numpy.bincount(assignment, minlength=clusters)
+			filled = counts > 0
+			centroids[filled] = sums[filled] / counts[filled, None]
+		assignment = self._assign(centroids)
+		self._centroids = centroids
+		order = numpy.argsort(assignment, kind="stable")
+		bounds = numpy.searchsorted(assignment[order], numpy.arange(clusters + 1))
+		self._members = [order[bounds[cluster]:bounds[cluster + 1]] for cluster in range(clusters)]
+
+	def _assign(self, centroids:"numpy.ndarray") -> "numpy.ndarray":
+		centroid_norms = numpy.einsum("ij,ij->i", centroids, centroids)
+		assignment = numpy.empty(len(self._vectors), dtype=numpy.int64)
+		for start in range(0, len(self._vectors), ASSIGN_CHUNK_SIZE):
+			chunk = self._vectors[start:start + ASSIGN_CHUNK_SIZE]
+			assignment[start:start + len(chunk)] = numpy.argmin(centroid_norms - 2 * chunk @ centroids.T, axis=1)
+		return assignment
+
+	@property
+	def metric(self) -> str:
+		return self._metric
+
+	@property
+	def approximate(self) -> bool:
+		return self._centroids is not None
+
+	def __len__(self) -> int:
+		return len(self._ids)
+
+	def __contains__(self, sound_id:object) -> bool:
+		return sound_id in self._index
+
+	def __repr__(self) -> str:
+		kind = f"{len(self._members)} clusters" if self._centroids is not None else "exact"
+		return f"<freesound.freesound_similarity.SimilarityIndex {len(self._ids)} sounds, {self._metric}, {kind}>"
@@ -22,12 +22,15 @@ id,name,filesize
 from typing import Any
 
 from .freesound_errors import DataError, FieldError
-from .freesound_fields import Field
+from .freesound_fields import FIELD_NAMES, Field
 
 class FreeSoundSoundInstance(Field):
 	"""A Utility class the stores the details of a SoundInstance request from the [`freesound.org`](https://www.freesound.org) database. 
 		Notice that the name of the input SoundInstance will be manipulated automatically by calling `self._set_file_name`. A name such as `Piano12 B Flat`
 		will be automatically transformed in `Piano12-B-Flat.mp3`
+
+		The input dictionary is not copied: every [`Field`][freesound.freesound_fields.Field] is a property which reads it,
+		and a field that was not requested is `None`. Assigning a field copies the dictionary first, so the search results are never modified.
 	
 		for more information visit: <https://freesound.org/docs/api/resources_apiv2.html#sound-instance>
 
@@ -45,27 +48,19 @@ class FreeSoundSoundInstance(Field):
 			Piano12.mp3
 			```
 	"""
+	__slots__ = ('_track_data', '_name', '_copied')
+
 	def __init__(self, track_data:dict[str,Any]) -> None:
-		valid_attributes = Field.all().split(",")
 		if 'id' not in track_data or 'name' not in track_data:
 			raise AttributeError("No 'id' or 'name' provided")
-		count = 0
-		for field,value in track_data.items():
-			if field not in valid_attributes:
+		for field in track_data:
+			if field not in FIELD_NAMES:
 				raise DataError(f"Could not create a FreeSoundTrack '{field}' is not a valid field")
-			if field == 'name':
-				value = self._set_file_name(str(value))
-			if field == 'type':
-				self._set_file_ext(str(value))
-			setattr(self,field,value)
-			valid_attributes.remove(field)
-			count += 1
-
-		# set everything else to None
-		for attribute in valid_attributes:
-			setattr(self,attribute,None)
-		
 		self._track_data = track_data
+		self._copied = False
+		self._name = self._set_file_name(str(track_data['name']))
+		if track_data.get('type') is not None:
+			self._set_file_ext(str(track_data['type']))
 		
 	def ensure_value(self,field:str)-> str:
 		"""a utility function which ensure the presence of a field inside the input dictionary
@@ -92,15 +87,38 @@ class FreeSoundSoundInstance(Field):
 		if  value is None:
 			raise FieldError(f"Attribute '{field}' not found! Please include the '{field}' keyword in your 'fields' search list and retry")
 		return value
+
+	@classmethod
+	def all(cls) -> str:
+		"""
+		Returns:
+			the comma-separated names of all the fields, like [`Field.all`][freesound.freesound_fields.Field.all]
+		"""
+		return Field.all()
+
+	@property
+	def name(self) -> str: # type:ignore
+		"""the name of the sound as a file name, with its extension"""
+		return self._name
+
+	@name.setter
+	def name(self, value:str) -> None:
+		self._name = value
 	
 	@property
 	def track_data(self) -> dict[str, Any]:
 		return self._track_data
 	
+	def _set_field(self, field:str, value:Any) -> None:
+		# copy on the first write: the dictionary usually belongs to `FreeSoundClient.results_list`
+		if not self._copied:
+			self._track_data = dict(self._track_data)
+			self._copied = True
+		self._track_data[field] = value
+
 	def _set_file_ext(self,ext:str) -> None:
-		if ext not in self.name:
-			self.name += "."+ext
-		# self.name = file_name
+		if ext not in self._name:
+			self._name += "."+ext
 			
 	def as_dict(self) -> dict[str, Any]:
 		"""a function to generate a dictionary out of `self`
@@ -108,16 +126,23 @@ class FreeSoundSoundInstance(Field):
 		Returns:
 			dict[str, Any]: the same `dict` that you would get from one element of `FreeSoundClient.results_list['results']`
 		"""
-		attr_list:dict[str,Any] = {}
-		attributes = Field.all().split(',')
-		for key in attributes:
-			value = getattr(self,key)
-			if value is not None:
-				attr_list[key] = value
+		attr_list:dict[str,Any] = {key:value for key,value in self._track_data.items() if value is not None}
+		attr_list['name'] = self._name
 		return attr_list
 		
 	def __repr__(self) -> str:
 		return f"<freesound.freesound_track.FreeSoundTrack {self.name}>"
+
+def _field_property(field:str) -> property:
+	return property(
+		lambda self: self._track_data.get(field),
+		lambda self, value: self._set_field(field, value),
+		doc=f"the `{field}` of the sound, `None` if it was not requested",
+	)
+
+# one property for each field: they replace the class attributes of `Field`
+for _field in FIELD_NAMES - {'name'}:
+	setattr(FreeSoundSoundInstance, _field, _field_property(_field))
 	
 if __name__ == "__main__":
 	t = FreeSoundSoundInstance({'id': 524545, 'name': 'Piano12 B Flat', 'tags': ['note', 'synthesizer', 'Piano'], 'type': 'mp3', 'download': 'https://freesound.org/apiv2/sounds/524545/download/'})
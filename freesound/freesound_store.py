@@ -0,0 +1,90 @@
+"""
+The module contains the definition of the ContentStore
+
+A utility structure which stores every downloaded file once, under its md5 checksum, and hard-links it
+under each filename it is requested with. Overlapping downloads of the same sounds then cost neither bandwidth nor disk.
+
+Usage Example
+-------------
+>>> c = FreeSoundClient(USER_ID, API_KEY, content_store="sound_store")
+>>> c.search("piano", fields=FreeSoundFields([Field.download, Field.md5]).aslist)
+>>> c.download_results("sound_lib", 100)
+
+The layout of the store is `<folder>/<first 2 characters of the md5>/<md5>`
+"""
+import os
+import shutil
+from uuid import uuid4
+
+
+class ContentStore:
+	"""A content-addressed folder of audio files
+
+	Files are hard-linked when the store and the destination are on the same file system, otherwise they are copied.
+
+	Args:
+		folder (str): the root folder of the store
+	"""
+	def __init__(self, folder:str) -> None:
+		self._folder = folder
+		os.makedirs(folder, exist_ok=True)
+
+	def path_for(self, md5:str) -> str:
+		"""
+		Args:
+			md5 (str): the md5 checksum of a file
+
+		Returns:
+			the path of the file inside the store
+		"""
+		md5 = md5.lower()
+		return os.path.join(self._folder, md5[:2], md5)
+
+	def contains(self, md5:str) -> bool:
+		return os.path.exists(self.path_for(md5))
+
+	def add(self, path:str, md5:str) -> None:
+		"""store the file at `path` under `md5`, if the store does not already contain it
+
+		Args:
+			path (str): the path of a downloaded file whose checksum is `md5`
+			md5 (str): the md5 checksum of the file
+		"""
+		store_path = self.path_for(md5)
+		if os.path.exists(store_path):
+			return
+		os.makedirs(os.path.dirname(store_path), exist_ok=True)
+		self._link_or_copy(path, store_path)
+
+	def link(self, md5:str, path:str) -> None:
+		"""make the file stored under `md5` available at `path`
+
+		Args:
+			md5 (str): the md5 checksum of a file in the store
+			path (str): where the file should appear. An existing file is replaced
+		"""
+		self._link_or_copy(self.path_for(md5), path)
+
+	def _link_or_copy(self, source:str, destination:str) -> None:
+		# link to a temporary name first so that `destination` is replaced atomically.
+		# The name is unique: several workers may link the same md5 at the same time
+		if os.path.exists(destination) and os.path.samefile(source, destination):
+			return
+		temporary = f"{destination}.{uuid4().hex}.link"
+		try:
+			try:
+				os.link(source, temporary)
+			except OSError:
+				shutil.copy2(source, temporary)
+			os.replace(temporary, destination)
+		finally:
+			# rename() does nothing when both names are links to the same file, which another worker may have just made
+			if os.path.exists(temporary):
+				os.remove(temporary)
+
+	@property
+	def folder(self) -> str:
+		return self._folder
+
+	def __repr__(self) -> str:
+		return f"<freesound.freesound_store.ContentStore {self._folder}>"
@@ -0,0 +1,92 @@
+"""
+The module contains the definition of the SyncState
+
+A utility structure which remembers, for each query, the newest sound seen by the last
+[`sync`][freesound.freesound_client.FreeSoundClient.sync]: its `created` date (the high-water mark) and the `id` of the sounds created at that instant.
+The next `sync` of the same query asks the server only for the sounds created since then.
+
+The marks are stored in a small `json` file, replaced atomically at every update.
+
+Usage Example
+-------------
+>>> c = FreeSoundClient(USER_ID, API_KEY)
+>>> c.sync("rain", fields=Field.download, state="rain_sync.json", output_folder="rain_lib")
+"""
+from datetime import datetime
+import json
+import os
+from typing import Any, Iterable
+
+
+class SyncState:
+	"""The high-water marks of the synchronized queries, stored in the `json` file at `path`
+
+	Args:
+		path (str, optional): the path of the state file
+
+	Usage:
+		```py
+		>>> state = SyncState("rain_sync.json")
+		>>> state.mark("rain")
+		{'created': '2024-03-01T20:42:00.123', 'ids': [724545], 'timestamp': '2024-03-02T03:00:00'}
+		```
+	"""
+	def __init__(self, path:str=".freesound_sync.json") -> None:
+		self._path = path
+		self._marks:dict[str,dict[str,Any]] = {}
+		if os.path.exists(path):
+			with open(path, "r") as file:
+				self._marks = json.load(file)
+
+	@staticmethod
+	def key(query:str, filter:str='') -> str:
+		return json.dumps([query, filter])
+
+	def mark(self, query:str, filter:str='') -> dict[str,Any]|None:
+		"""
+		Returns:
+			the high-water mark of the query, `None` if it has never been synchronized
+		"""
+		return self._marks.get(self.key(query, filter))
+
+	def update(self, query:str, filter:str, sounds:Iterable[dict[str,Any]]) -> None:
+		"""move the high-water mark of the query to the newest of `sounds`
+
+		Args:
+			query (str): the query
+			filter (str): the filter of the query
+			sounds (Iterable[dict[str, Any]]): the new sounds. Each must contain the fields `id` and `created`
+		"""
+		mark = self.mark(query, filter)
+		created:str|None = mark['created'] if mark is not None else None
+		ids:set[int] = set(mark['ids']) if mark is not None else set()
+		for sound in sounds:
+			sound_created = str(sound['created']).rstrip('Z')
+			if created is None or sound_created > created:
+				created = sound_created
+				ids = {sound['id']}
+			elif sound_created == created:
+				ids.add(sound['id'])
+		if created is None:
+			return
+		self._marks[self.key(query, filter)] = {'created':created, 'ids':sorted(ids), 'timestamp':datetime.now().isoformat()}
+		self.save()
+
+	def save(self) -> None:
+		folder = os.path.dirname(self._path)
+		if folder != "":
+			os.makedirs(folder, exist_ok=True)
+		temporary = self._path + ".tmp"
+		with open(temporary, "w") as file:
+			json.dump(self._marks, file, indent=4)
+		os.replace(temporary, self._path)
+
+	@property
+	def path(self) -> str:
+		return self._path
+
+	def __len__(self) -> int:
+		return len(self._marks)
+
+	def __repr__(self) -> str:
+		return f"<freesound.freesound_sync.SyncState {self._path} ({len(self._marks)} queries)>"
@@ -0,0 +1,167 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+import time
+from typing import Any
+from urllib.parse import urlencode
+
+import pytest
+
+import freesound.freesound_api as freesound_api
+import freesound.freesound_requests as freesound_requests
+from freesound.freesound_client import FreeSoundClient
+from freesound.freesound_local_filter import LocalFilter
+
+
+def make_sounds(count:int) -> list[dict[str,Any]]:
+	return [
+		{'id':sound_id, 'name':f"s{sound_id}", 'type':'wav', 'download':f"https://freesound.org/apiv2/sounds/{sound_id}/download/",
+			'created':f"2020-{(sound_id % 12) + 1:02d}-{(sound_id % 28) + 1:02d}T{sound_id % 24:02d}:00:00"}
+		for sound_id in range(1, count + 1)
+	]
+
+class FakeApi:
+	"""answers the searches of `freesound_api` from a list of sounds, applying the filter locally"""
+	def __init__(self, sounds:list[dict[str,Any]]) -> None:
+		self.sounds = sounds
+		self.searches:list[dict[str,Any]] = []
+		self.pages:list[int] = []
+
+	def search(self, query:str, token:str, fields:str|None=None, filter:str|None=None, descriptors:str|None=None, sort_by:str='score', page_size:int=15, normalized:int=0, page:int|None=None) -> dict[str,Any]:
+		params = {'query':query, 'filter':filter or '', 'sort':sort_by, 'page_size':str(page_size), 'page':str(page or 1)}
+		self.searches.append(params)
+		return self._page(params)
+
+	def get_next_page(self, url:str, token:str) -> dict[str,Any]:
+		return self._page(freesound_api._next_page_params(url))
+
+	def _page(self, params:dict[str,str]) -> dict[str,Any]:
+		# the empty parameters are lost in the `next` urls
+		filter = params.get('filter', '')
+		sounds = list(LocalFilter(filter).select(self.sounds)) if filter != '' else list(self.sounds)
+		if params['sort'].startswith('created'):
+			sounds.sort(key=lambda sound: sound['created'], reverse=params['sort'].endswith('desc'))
+		page, page_size = int(params['page']), int(params['page_size'])
+		self.pages.append(page)
+		more = page * page_size < len(sounds)
+		return {
+			'count':len(sounds),
+			'next':f"{freesound_api.SEARCH_URL}?{urlencode({**params, 'page':page + 1})}" if more else None,
+			'previous':None,
+			'results':[dict(sound) for sound in sounds[(page - 1) * page_size:page * page_size]],
+		}
+
+@pytest.fixture
+def fake_api(monkeypatch):
+	def install(sounds:list[dict[str,Any]]|int) -> FakeApi:
+		api = FakeApi(make_sounds(sounds) if isinstance(sounds, int) else sounds)
+		monkeypatch.setattr(freesound_api, "search", api.search)
+		monkeypatch.setattr(freesound_api, "get_next_page", api.get_next_page)
+		return api
+	return install
+
+@pytest.fixture
+def make_client(monkeypatch, tmp_path):
+	"""a `FreeSoundClient` which never contacts freesound.org"""
+	monkeypatch.setattr(FreeSoundClient, "_load_token_from_file", lambda self: {'access_token':"token", 'refresh_token':"refresh"})
+	monkeypatch.setattr(FreeSoundClient, "_save_access_token", lambda self, data: None)
+	monkeypatch.setattr(freesound_api, "get_my_infos", lambda token: {'username':"tester"})
+	def make(**kwargs:Any) -> FreeSoundClient:
+		kwargs.setdefault('download_folder', str(tmp_path / "downloads"))
+		return FreeSoundClient("user", "key", **kwargs)
+	return make
+
+@pytest.fixture
+def fake_downloads(monkeypatch):
+	"""replaces `freesound_api.download_track`: each file contains the url it was downloaded from. Returns the urls, in order"""
+	urls:list[str] = []
+	def download_track(track_url:str, token:str, output_path:str, chunk_size:int=0, filesize:int|None=None, md5:str|None=None) -> int:
+		urls.append(track_url)
+		with open(output_path, "w") as file:
+			file.write(track_url)
+		return len(track_url)
+	monkeypatch.setattr(freesound_api, "download_track", download_track)
+	return urls
+
+class FileServer(ThreadingHTTPServer):
+	"""a local HTTP server for the downloads
+
+	`files` maps a path to its content. The server answers `Range` requests unless `ignore_range` is set,
+	`statuses` queues the error statuses of the next requests to a path and `delay` slows every answer down.
+	"""
+	daemon_threads = True
+
+	def __init__(self) -> None:
+		super().__init__(("127.0.0.1", 0), FileHandler)
+		self.files:dict[str,bytes] = {}
+		self.statuses:dict[str,list[int]] = {}
+		self.ignore_range = False
+		self.delay = 0.0
+		self.requests:list[tuple[str,str|None]] = []
+		self.active = 0
+		self.max_active = 0
+		self.lock = Lock()
+
+	def url(self, path:str) -> str:
+		return f"http://127.0.0.1:{self.server_address[1]}{path}"
+
+class FileHandler(BaseHTTPRequestHandler):
+	server:FileServer
+
+	def do_GET(self) -> None:
+		server = self.server
+		with server.lock:
+			server.requests.append((self.path, self.headers.get("Range")))
+			server.active += 1
+			server.max_active = max(server.max_active, server.active)
+			statuses = server.statuses.get(self.path)
+			status = statuses.pop(0) if statuses else None
+		try:
+			time.sleep(server.delay)
+			body = server.files.get(self.path)
+			if status is None and body is None:
+				status = 404
+			if status is not None:
+				self._send(status, b"error")
+				return
+			byte_range = self.headers.get("Range")
+			if byte_range is not None and not server.ignore_range:
+				start = int(byte_range.split("=")[1].rstrip("-"))
+				if start >= len(body):
+					self._send(416, b"")
+					return
+				self._send(206, body[start:], {"Content-Range":f"bytes {start}-{len(body) - 1}/{len(body)}"})
+				return
+			self._send(200, body)
+		finally:
+			with server.lock:
+				server.active -= 1
+
+	def _send(self, status:int, body:bytes, headers:dict[str,str]|None=None) -> None:
+		self.send_response(status)
+		for name, value in (headers or {}).items():
+			self.send_header(name, value)
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def log_message(self, format:str, *args:Any) -> None:
+		pass
+
+@pytest.fixture
+def file_server():
+	server = FileServer()
+	thread = Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+	thread.start()
+	yield server
+	server.shutdown()
+	server.server_close()
+
+@pytest.fixture
+def no_limits():
+	"""no rate limit and fast retries for the requests to the local servers"""
+	limiter, policy = freesound_requests.get_rate_limiter(), freesound_requests.get_retry_policy()
+	freesound_requests.configure_rate_limit(None, None)
+	freesound_requests.configure_retry(freesound_requests.RetryPolicy(max_attempts=3, backoff_factor=0.01, jitter=False))
+	yield
+	freesound_requests._rate_limiter = limiter
+	freesound_requests.configure_retry(policy)
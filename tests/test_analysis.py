@@ -0,0 +1,51 @@
+import math
+
+import pytest
+
+numpy = pytest.importorskip("numpy")
+
+from freesound.freesound_analysis import DescriptorMatrix, descriptor_matrix
+from freesound.freesound_errors import DataError
+
+
+def sound(sound_id:int, loudness:float|None=None, mfcc:list[float]|None=None) -> dict:
+	lowlevel:dict = {}
+	if loudness is not None:
+		lowlevel['average_loudness'] = loudness
+	if mfcc is not None:
+		lowlevel['mfcc'] = mfcc
+	return {'id':sound_id, 'name':f"s{sound_id}", 'analysis':{'lowlevel':lowlevel}}
+
+RESULTS = [sound(1, 0.5, [1, 2]), sound(2, None, [3, 4]), {'id':3, 'name':'no analysis'}, sound(4, 0.7)]
+
+def test_columns_and_missing_values():
+	matrix = descriptor_matrix(RESULTS, "lowlevel.average_loudness,lowlevel.mfcc")
+	assert matrix.ids == [1, 2, 4]
+	assert matrix.columns == ["lowlevel.average_loudness", "lowlevel.mfcc.0", "lowlevel.mfcc.1"]
+	assert matrix.values.dtype == numpy.float32
+	assert math.isnan(matrix.row(2)[0])
+	assert list(matrix.row(1)) == [0.5, 1, 2]
+	assert matrix.column("lowlevel.mfcc").shape == (3, 2)
+	assert 3 not in matrix
+
+def test_statistics_are_flattened_in_alphabetical_order():
+	results = [{'id':1, 'name':'a', 'analysis':{'lowlevel':{'centroid':{'var':2.0, 'mean':1.0}}}}]
+	matrix = descriptor_matrix(results, ["lowlevel.centroid"])
+	assert matrix.columns == ["lowlevel.centroid.mean", "lowlevel.centroid.var"]
+	assert list(matrix.row(1)) == [1.0, 2.0]
+
+def test_a_generator_is_read_once():
+	matrix = descriptor_matrix((result for result in RESULTS), ["lowlevel.mfcc"])
+	assert matrix.ids == [1, 2, 4]
+
+def test_repeated_sounds_have_a_single_row():
+	matrix = descriptor_matrix(RESULTS + RESULTS[:2], ["lowlevel.mfcc"])
+	assert matrix.ids == [1, 2, 4]
+	with pytest.raises(DataError):
+		DescriptorMatrix([1, 1], ["a"], numpy.zeros((2, 1), dtype=numpy.float32))
+
+def test_ragged_and_non_numeric_descriptors():
+	with pytest.raises(DataError):
+		descriptor_matrix([sound(1, mfcc=[1, 2]), sound(2, mfcc=[1, 2, 3])], ["lowlevel.mfcc"])
+	with pytest.raises(DataError):
+		descriptor_matrix([{'id':1, 'name':'a', 'analysis':{'tonal':{'key':'C'}}}], ["tonal.key"])
@@ -0,0 +1,107 @@
+import hashlib
+import os
+
+import pytest
+
+import freesound.freesound_api as freesound_api
+import freesound.freesound_requests as freesound_requests
+from freesound.freesound_errors import DataError, FreesoundError
+
+CONTENT = bytes(range(256)) * 40
+MD5 = hashlib.md5(CONTENT).hexdigest()
+
+@pytest.fixture
+def sound_url(file_server, no_limits):
+	file_server.files["/sound.wav"] = CONTENT
+	return file_server.url("/sound.wav")
+
+def download(url:str, output_path:str, **kwargs) -> int:
+	return freesound_api.download_track(url, "token", output_path, chunk_size=1000, **kwargs)
+
+def test_the_part_file_is_renamed_when_complete(sound_url, file_server, tmp_path):
+	output = str(tmp_path / "sound.wav")
+	assert download(sound_url, output, filesize=len(CONTENT)) == len(CONTENT)
+	assert open(output, "rb").read() == CONTENT
+	assert not os.path.exists(output + freesound_api.PART_SUFFIX)
+	assert file_server.requests == [("/sound.wav", None)]
+
+def test_a_part_file_is_resumed_with_a_range_request(sound_url, file_server, tmp_path):
+	output = str(tmp_path / "sound.wav")
+	with open(output + freesound_api.PART_SUFFIX, "wb") as part:
+		part.write(CONTENT[:3000])
+	download(sound_url, output, filesize=len(CONTENT))
+	assert open(output, "rb").read() == CONTENT
+	assert file_server.requests == [("/sound.wav", "bytes=3000-")]
+
+def test_a_server_ignoring_the_range_restarts_the_file(sound_url, file_server, tmp_path):
+	file_server.ignore_range = True
+	output = str(tmp_path / "sound.wav")
+	with open(output + freesound_api.PART_SUFFIX, "wb") as part:
+		part.write(CONTENT[:3000])
+	download(sound_url, output, filesize=len(CONTENT))
+	assert open(output, "rb").read() == CONTENT
+
+def test_a_complete_part_file_of_unknown_size_is_downloaded_again_after_416(sound_url, file_server, tmp_path):
+	output = str(tmp_path / "sound.wav")
+	with open(output + freesound_api.PART_SUFFIX, "wb") as part:
+		part.write(CONTENT)
+	download(sound_url, output)
+	assert open(output, "rb").read() == CONTENT
+	assert file_server.requests == [("/sound.wav", f"bytes={len(CONTENT)}-"), ("/sound.wav", None)]
+
+def test_a_complete_part_file_of_known_size_is_not_requested(sound_url, file_server, tmp_path):
+	output = str(tmp_path / "sound.wav")
+	with open(output + freesound_api.PART_SUFFIX, "wb") as part:
+		part.write(CONTENT)
+	download(sound_url, output, filesize=len(CONTENT))
+	assert open(output, "rb").read() == CONTENT
+	assert file_server.requests == []
+
+def test_failed_streamed_responses_are_closed(sound_url, file_server, tmp_path, monkeypatch):
+	responses = []
+	session = freesound_requests.get_session()
+	request = session.request
+	def recording_request(*args, **kwargs):
+		response = request(*args, **kwargs)
+		responses.append(response)
+		return response
+	monkeypatch.setattr(session, "request", recording_request)
+	file_server.statuses["/sound.wav"] = [503, 503, 503]
+	with pytest.raises(FreesoundError):
+		download(sound_url, str(tmp_path / "sound.wav"))
+	with pytest.raises(FreesoundError):
+		download(file_server.url("/missing.wav"), str(tmp_path / "missing.wav"))
+	assert len(responses) == 4
+	assert all(response.raw.closed for response in responses)
+	assert not os.path.exists(tmp_path / "sound.wav")
+
+def test_the_md5_is_computed_over_a_resumed_part_file(sound_url, file_server, tmp_path):
+	output = str(tmp_path / "sound.wav")
+	with open(output + freesound_api.PART_SUFFIX, "wb") as part:
+		part.write(CONTENT[:3000])
+	download(sound_url, output, md5=MD5.upper())
+	assert open(output, "rb").read() == CONTENT
+	assert file_server.requests == [("/sound.wav", "bytes=3000-")]
+
+def test_a_corrupted_part_file_is_downloaded_again(sound_url, file_server, tmp_path):
+	output = str(tmp_path / "sound.wav")
+	with open(output + freesound_api.PART_SUFFIX, "wb") as part:
+		part.write(b"x" * 3000)
+	download(sound_url, output, md5=MD5)
+	assert open(output, "rb").read() == CONTENT
+	assert file_server.requests == [("/sound.wav", "bytes=3000-"), ("/sound.wav", None)]
+
+def test_an_md5_mismatch_fails_after_the_retries(sound_url, file_server, tmp_path):
+	output = str(tmp_path / "sound.wav")
+	with pytest.raises(DataError):
+		download(sound_url, output, md5=hashlib.md5(b"other").hexdigest())
+	# the policy of `no_limits` makes 3 attempts
+	assert len(file_server.requests) == 3
+	assert not os.path.exists(output) and not os.path.exists(output + freesound_api.PART_SUFFIX)
+
+@pytest.mark.parametrize("filesize", [len(CONTENT) - 1, len(CONTENT) + 1])
+def test_a_filesize_mismatch_fails(sound_url, tmp_path, filesize):
+	output = str(tmp_path / "sound.wav")
+	with pytest.raises(DataError):
+		download(sound_url, output, filesize=filesize)
+	assert not os.path.exists(output) and not os.path.exists(output + freesound_api.PART_SUFFIX)
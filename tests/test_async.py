@@ -0,0 +1,100 @@
+import asyncio
+import hashlib
+import json
+import os
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web
+
+import freesound.freesound_async as freesound_async
+from freesound.freesound_api import PART_SUFFIX
+from freesound.freesound_async import AsyncFreeSoundClient
+from freesound.freesound_errors import AuthorizationError
+
+
+def content(sound_id:int) -> bytes:
+	return bytes([sound_id]) * 5000
+
+class SoundServer:
+	"""an aiohttp server of `/sounds/<id>` which answers `Range` requests and counts the requests in flight"""
+	def __init__(self) -> None:
+		self.requests:list[tuple[int,str|None]] = []
+		self.active = 0
+		self.max_active = 0
+		self.unauthorized:set[int] = set()
+
+	async def sound(self, request:"web.Request") -> "web.Response":
+		sound_id = int(request.match_info['id'])
+		self.requests.append((sound_id, request.headers.get("Range")))
+		self.active += 1
+		self.max_active = max(self.max_active, self.active)
+		try:
+			await asyncio.sleep(0.05)
+			if sound_id in self.unauthorized:
+				return web.Response(status=401)
+			body = content(sound_id)
+			byte_range = request.headers.get("Range")
+			if byte_range is not None:
+				start = int(byte_range.split("=")[1].rstrip("-"))
+				return web.Response(status=206, body=body[start:])
+			return web.Response(body=body)
+		finally:
+			self.active -= 1
+
+async def run(test, monkeypatch, tmp_path, **kwargs):
+	server = SoundServer()
+	app = web.Application()
+	app.router.add_get("/sounds/{id}", server.sound)
+	runner = web.AppRunner(app)
+	await runner.setup()
+	site = web.TCPSite(runner, "127.0.0.1", 0)
+	await site.start()
+	port = site._server.sockets[0].getsockname()[1]
+
+	async def get_my_infos(token, session=None):
+		return {'username':"tester"}
+	monkeypatch.setattr(freesound_async, "async_get_my_infos", get_my_infos)
+	token_file = tmp_path / "token.json"
+	token_file.write_text(json.dumps({'access_token':"token", 'refresh_token':"refresh"}))
+	client = AsyncFreeSoundClient("user", "key", str(tmp_path / "downloads"), str(token_file), **kwargs)
+	sounds = [{'id':sound_id, 'name':f"s{sound_id}", 'type':'wav', 'download':f"http://127.0.0.1:{port}/sounds/{sound_id}"} for sound_id in range(1, 11)]
+	try:
+		async with client:
+			client._results_page = {'count':len(sounds), 'next':None, 'previous':None, 'results':sounds}
+			await test(client, server)
+	finally:
+		await runner.cleanup()
+
+def test_the_downloads_respect_the_concurrency_limit(monkeypatch, tmp_path, no_limits):
+	async def test(client, server):
+		await client.download_results(files_count=10)
+		assert server.max_active == 3
+		assert [sound['id'] for sound in client.download_list['downloaded-files']] == list(range(1, 11))
+		for sound_id in range(1, 11):
+			assert (tmp_path / "downloads" / f"s{sound_id}.wav").read_bytes() == content(sound_id)
+	asyncio.run(run(test, monkeypatch, tmp_path, max_concurrency=3))
+
+def test_a_part_file_is_resumed(monkeypatch, tmp_path, no_limits):
+	folder = tmp_path / "downloads"
+	folder.mkdir()
+	(folder / f"s4.wav{PART_SUFFIX}").write_bytes(content(4)[:1200])
+	async def test(client, server):
+		sound = client._results_page['results'][3]
+		assert await client.download_track(sound['download'], "s4.wav", str(folder), md5=hashlib.md5(content(4)).hexdigest())
+		assert server.requests == [(4, "bytes=1200-")]
+		assert (folder / "s4.wav").read_bytes() == content(4)
+		assert not os.path.exists(folder / f"s4.wav{PART_SUFFIX}")
+	asyncio.run(run(test, monkeypatch, tmp_path))
+
+def test_an_authorization_error_cancels_the_other_downloads(monkeypatch, tmp_path, no_limits):
+	async def test(client, server):
+		server.unauthorized = {2}
+		with pytest.raises(AuthorizationError):
+			await client.download_results(files_count=10)
+		await asyncio.sleep(0.2)
+		# the sounds waiting for a free slot are never requested
+		assert len(server.requests) < 10
+		assert server.active == 0
+	asyncio.run(run(test, monkeypatch, tmp_path, max_concurrency=2))
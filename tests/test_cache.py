@@ -0,0 +1,73 @@
+from typing import Any
+
+import pytest
+
+import freesound.freesound_requests as freesound_requests
+from freesound.freesound_cache import CachedResponse, ResponseCache, SQLiteCache
+
+
+def make_entry(body:bytes=b'{"count": 1}', headers:dict[str,str]|None=None, stored_at:float|None=None) -> CachedResponse:
+	return CachedResponse("https://freesound.org/apiv2/search/text/", 200, headers or {"Content-Type":"application/json"}, body, stored_at)
+
+@pytest.fixture
+def cache(tmp_path:Any) -> SQLiteCache:
+	cache = SQLiteCache(str(tmp_path / "cache.sqlite"), ttl=60, max_size=1000)
+	yield cache
+	cache.close()
+
+def test_incomplete_backend_fails_when_created():
+	class GetOnly(ResponseCache):
+		def get(self, key:str) -> CachedResponse|None:
+			return None
+	with pytest.raises(TypeError):
+		GetOnly()
+
+def test_key_ignores_parameter_order(cache:SQLiteCache):
+	url = "https://freesound.org/apiv2/search/text/"
+	assert cache.key("get", url, {'query':'piano', 'page':1}) == cache.key("GET", url, {'page':1, 'query':'piano'})
+	assert cache.key("GET", url, {'query':'piano'}) != cache.key("GET", url, {'query':'guitar'})
+
+def test_round_trip(cache:SQLiteCache):
+	cache.set("k", make_entry(headers={"ETag":'"v1"', "Content-Type":"application/json"}))
+	entry = cache.get("k")
+	assert entry is not None and entry.body == b'{"count": 1}' and entry.etag == '"v1"'
+	response = entry.to_response()
+	assert response.status_code == 200 and response.json() == {'count':1}
+	assert cache.get("missing") is None
+
+def test_freshness_and_touch(cache:SQLiteCache):
+	cache.set("k", make_entry(stored_at=0))
+	entry = cache.get("k")
+	assert entry is not None and not cache.is_fresh(entry)
+	cache.touch("k")
+	entry = cache.get("k")
+	assert entry is not None and cache.is_fresh(entry)
+
+def test_least_recently_used_are_evicted(cache:SQLiteCache):
+	for key in ("a", "b", "c"):
+		cache.set(key, make_entry(body=b"x" * 400))
+		cache.get("a")
+	assert cache.get("a") is not None
+	assert cache.get("b") is None
+	assert cache.get("c") is not None
+	assert cache.size <= 1000
+
+def test_bodies_larger_than_the_cache_are_not_stored(cache:SQLiteCache):
+	cache.set("big", make_entry(body=b"x" * 2000))
+	assert cache.get("big") is None
+
+def test_stale_entry_is_revalidated(cache:SQLiteCache, monkeypatch:pytest.MonkeyPatch):
+	url = "https://freesound.org/apiv2/search/text/"
+	key = cache.key("GET", url, {'query':'piano'})
+	cache.set(key, make_entry(headers={"ETag":'"v1"'}, stored_at=0))
+	sent:list[dict[str,str]] = []
+	def not_modified(method:str, url:str, headers:dict[str,str], params:dict[str,str]) -> Any:
+		sent.append(headers)
+		return CachedResponse(url, 304, {}, b"").to_response()
+	monkeypatch.setattr(freesound_requests, "_send_request", not_modified)
+	response = freesound_requests._cached_get_request(cache, url, {}, {'query':'piano'})
+	assert sent == [{"If-None-Match":'"v1"'}]
+	assert response.status_code == 200 and response.content == b'{"count": 1}'
+	# the entry is fresh again: no request at all
+	freesound_requests._cached_get_request(cache, url, {}, {'query':'piano'})
+	assert len(sent) == 1
@@ -0,0 +1,85 @@
+import pytest
+
+from freesound.filter_types import Filter
+from freesound.freesound_catalogue import SoundCatalogue
+from freesound.freesound_errors import DataError
+from freesound.freesound_filters import FreeSoundFilters
+
+SOUNDS = [
+	{'id':1, 'name':'Piano12.wav', 'type':'wav', 'samplerate':48000, 'duration':2.5, 'created':'2019-05-01T10:00:00Z',
+		'username':'Jovica', 'pack_name':'Piano', 'tags':['Piano', 'note']},
+	{'id':2, 'name':'rain.aiff', 'type':'aiff', 'samplerate':44100, 'duration':30.0, 'created':'2021-02-01T00:00:00Z',
+		'username':'Jovica', 'pack_name':None, 'tags':['rain', 'nature']},
+	{'id':3, 'name':'kick.wav', 'type':'wav', 'samplerate':44100, 'duration':0.5, 'created':'2020-06-01T00:00:00Z',
+		'username':'drummer', 'pack_name':'Drums', 'tags':['drum', 'note']},
+]
+
+@pytest.fixture
+def catalogue(tmp_path):
+	catalogue = SoundCatalogue(str(tmp_path / "catalogue.sqlite"))
+	catalogue.upsert(SOUNDS)
+	yield catalogue
+	catalogue.close()
+
+def ids(sounds) -> list[int]:
+	return [sound.id for sound in sounds]
+
+def test_upsert_merges_with_the_stored_fields(catalogue):
+	assert len(catalogue) == 3 and 2 in catalogue and 9 not in catalogue
+	catalogue.upsert([{'id':1, 'num_downloads':7}])
+	sound = catalogue.get(1)
+	assert sound.name == 'Piano12.wav'
+	assert sound.num_downloads == 7
+	# the tags are kept when the new result does not contain them
+	assert catalogue.tags(1) == ['note', 'piano']
+	catalogue.upsert([{'id':1, 'tags':['Keys']}])
+	assert catalogue.tags(1) == ['keys']
+	assert catalogue.get(99) is None
+
+def test_find_by_columns_and_ranges(catalogue):
+	assert ids(catalogue.find(type="wav")) == [1, 3]
+	assert ids(catalogue.find(samplerate=[44100, 22050])) == [2, 3]
+	assert ids(catalogue.find(duration=Filter.RANGE(1, 30))) == [1, 2]
+	assert ids(catalogue.find(duration=Filter.AT_LEAST(2.5))) == [1, 2]
+	assert ids(catalogue.find(created=Filter.UP_TO("2020-06-01T00:00:00Z"))) == [1, 3]
+	assert ids(catalogue.find(username="Jovica", pack="Piano")) == [1]
+	assert catalogue.count(username="Jovica") == 2
+
+def test_find_by_tags(catalogue):
+	assert ids(catalogue.find(tag="note")) == [1, 3]
+	assert ids(catalogue.find(tag="PIANO")) == [1]
+	assert ids(catalogue.find(tag=["note", "drum"], duration=Filter.UP_TO(1))) == [3]
+
+def test_order_limit_and_filter(catalogue):
+	assert ids(catalogue.find(order_by="duration desc")) == [2, 1, 3]
+	assert ids(catalogue.find(order_by="created", limit=2)) == [1, 3]
+	assert ids(catalogue.find(filter=FreeSoundFilters(type=Filter.OR("wav", "aiff"), duration=Filter.AT_LEAST(1)), limit=1)) == [1]
+	assert ids(catalogue.find(filter="original_filename:kick")) == [3]
+
+def test_downloaded_paths(catalogue):
+	catalogue.set_path(SOUNDS[0], "sounds/Piano12.wav")
+	catalogue.set_paths([({'id':4, 'name':'new.wav', 'type':'wav'}, "sounds/new.wav")])
+	assert catalogue.downloaded_path(1) == "sounds/Piano12.wav"
+	assert catalogue.downloaded_path(4) == "sounds/new.wav"
+	assert catalogue.downloaded_path(2) is None
+	assert ids(catalogue.find(downloaded=True)) == [1, 4]
+	assert ids(catalogue.find(downloaded=False)) == [2, 3]
+
+def test_the_catalogue_is_persistent(tmp_path):
+	path = str(tmp_path / "catalogue.sqlite")
+	first = SoundCatalogue(path)
+	first.upsert(SOUNDS)
+	first.close()
+	second = SoundCatalogue(path)
+	assert ids(second.find(tag="rain")) == [2]
+	second.close()
+
+def test_invalid_queries(catalogue):
+	with pytest.raises(DataError):
+		catalogue.find(name="Piano12.wav")
+	with pytest.raises(DataError):
+		catalogue.find(order_by="name")
+	with pytest.raises(DataError):
+		catalogue.find(order_by="id; DROP TABLE sounds")
+	with pytest.raises(DataError):
+		catalogue.count(num_downloads=3)
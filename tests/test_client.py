@@ -0,0 +1,356 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import hashlib
+import itertools
+import json
+import random
+import shutil
+import time
+
+import pytest
+
+import freesound.freesound_api as freesound_api
+from freesound.filter_types import Filter
+from freesound.freesound_catalogue import SoundCatalogue
+from freesound.freesound_client import MAX_FILTER_LENGTH
+from freesound.freesound_crawl import CrawlCheckpoint
+from freesound.freesound_filters import FreeSoundFilters
+from freesound.freesound_index import DownloadIndex
+from freesound.freesound_jsonl import SpilledResults, read_jsonl
+from freesound.freesound_local_filter import LocalFilter
+
+from conftest import make_sounds
+
+
+def test_streamed_and_batched_results_are_recorded(make_client, fake_api, tmp_path):
+	fake_api(40)
+	catalogue = SoundCatalogue(str(tmp_path / "catalogue.sqlite"))
+	manifest = str(tmp_path / "results.jsonl")
+	client = make_client(catalogue=catalogue, results_manifest=manifest)
+	assert [sound.id for sound in client.iter_search("x", page_size=15, limit=20)] == list(range(1, 21))
+	assert client.results_list['results'] == []
+	assert len(catalogue) == 30
+	tracks = client.get_tracks_info([35, 36, 99])
+	assert sorted(tracks) == [35, 36]
+	assert client.results_list['results'] == []
+	assert 35 in catalogue and 99 not in catalogue
+	assert [sound['id'] for sound in read_jsonl(manifest)] == [*range(1, 31), 35, 36]
+	catalogue.close()
+
+def sound_id(url:str) -> int:
+	return int(url.split("/")[-3])
+
+class Killed(BaseException):
+	"""stops a crawl like a killed process: no handler of the client catches it"""
+
+@pytest.mark.parametrize("prefetch", [0, 1, 3])
+def test_download_results_follows_the_pages_in_order(make_client, fake_api, fake_downloads, prefetch):
+	api = fake_api(70)
+	client = make_client()
+	client.search("x", page_size=15)
+	client.download_results(files_count=70, prefetch=prefetch)
+	assert [sound_id(url) for url in fake_downloads] == list(range(1, 71))
+	assert api.pages == [1, 2, 3, 4, 5]
+	assert [sound['id'] for sound in client.download_list['downloaded-files']] == list(range(1, 71))
+
+def test_prefetch_is_bounded(make_client, fake_api, monkeypatch):
+	api = fake_api(150)
+	client = make_client(download_index=False)
+	client.search("x", page_size=10)
+	fetched:list[int] = []
+	def download_track(track_url:str, token:str, output_path:str, *args) -> int:
+		# give the producer the time to fetch everything it is allowed to
+		time.sleep(0.3)
+		fetched.append(len(api.pages))
+		raise Killed()
+	monkeypatch.setattr(freesound_api, "download_track", download_track)
+	with pytest.raises(Killed):
+		client.download_results(files_count=150, prefetch=2)
+	# the first page, the `prefetch` pages of the queue and the one waiting to be queued
+	assert fetched == [4]
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_resume_continues_from_the_interrupted_page(make_client, fake_api, monkeypatch, tmp_path, prefetch):
+	api = fake_api(60)
+	client = make_client()
+	client.search("x", page_size=10)
+	downloaded:list[int] = []
+	def download_track(track_url:str, token:str, output_path:str, *args) -> int:
+		if sound_id(track_url) == 35:
+			raise Killed()
+		downloaded.append(sound_id(track_url))
+		with open(output_path, "w") as file:
+			file.write(track_url)
+		return 1
+	monkeypatch.setattr(freesound_api, "download_track", download_track)
+	path = str(tmp_path / "crawl.json")
+	with pytest.raises(Killed):
+		client.download_results(files_count=60, prefetch=prefetch, checkpoint=CrawlCheckpoint(path))
+	checkpoint = CrawlCheckpoint.load(path)
+	assert freesound_api._next_page_params(checkpoint.page_url)['page'] == "4"
+	assert checkpoint.completed == {31, 32, 33, 34}
+	assert checkpoint.downloaded == 34
+
+	del api.pages[:]
+	monkeypatch.setattr(freesound_api, "download_track", lambda track_url, token, output_path, *args: downloaded.append(sound_id(track_url)) or 1)
+	make_client().resume(path, prefetch=prefetch)
+	assert api.pages[0] == 4
+	assert downloaded == list(range(1, 61))
+	assert CrawlCheckpoint.load(path).finished
+
+def test_a_checkpoint_started_after_prefetched_pages_records_the_current_page(make_client, fake_api, fake_downloads, monkeypatch, tmp_path):
+	fake_api(60)
+	client = make_client()
+	client.search("x", page_size=10)
+	client.download_results(files_count=25, prefetch=2)
+	monkeypatch.setattr(freesound_api, "download_track", lambda *args: (_ for _ in ()).throw(Killed()))
+	path = str(tmp_path / "crawl.json")
+	with pytest.raises(Killed):
+		client.download_results(files_count=30, prefetch=2, checkpoint=CrawlCheckpoint(path))
+	# the sounds 21 to 25 were on the third page, which is still the current one
+	assert freesound_api._next_page_params(CrawlCheckpoint.load(path).page_url)['page'] == "3"
+
+@pytest.mark.parametrize("extra, adopted", [
+	({}, False),
+	({'filesize':len("old file")}, True),
+	({'filesize':len("old file") + 1}, False),
+	({'md5':hashlib.md5(b"old file").hexdigest()}, True),
+	({'md5':hashlib.md5(b"other file").hexdigest()}, False),
+])
+def test_an_existing_file_is_adopted_only_if_it_matches(make_client, fake_api, fake_downloads, tmp_path, extra, adopted):
+	sounds = make_sounds(1)
+	sounds[0].update(extra)
+	fake_api(sounds)
+	folder = tmp_path / "downloads"
+	folder.mkdir()
+	(folder / "s1.wav").write_text("old file")
+	client = make_client()
+	client.search("x")
+	client.download_results(files_count=1)
+	index = DownloadIndex(str(folder))
+	assert (folder / "s1.wav").read_text() == "old file"
+	if adopted:
+		assert fake_downloads == []
+		assert index.owner("s1.wav") == 1
+	else:
+		assert len(fake_downloads) == 1
+		assert index.owner("s1.wav") is None
+		assert index.owner("1_s1.wav") == 1
+		assert (folder / "1_s1.wav").exists()
+
+def test_id_batches_hold_at_most_150_ids(make_client):
+	batches = make_client()._make_id_batches(list(range(1, 400)))
+	assert [len(batch) for batch in batches] == [150, 150, 99]
+	assert sum(batches, []) == list(range(1, 400))
+
+def test_id_batches_fit_in_the_filter_length(make_client):
+	ids = list(range(10**11, 10**11 + 300))
+	batches = make_client()._make_id_batches(ids)
+	assert sum(batches, []) == ids
+	for batch in batches:
+		assert len(FreeSoundFilters(id=Filter.OR(*batch)).aslist) <= MAX_FILTER_LENGTH + len("id:()")
+	# 12 digits and " OR " for each id
+	assert [len(batch) for batch in batches] == [93, 93, 93, 21]
+
+def test_search_ids_sends_one_filter(make_client, fake_api):
+	api = fake_api(200)
+	page = make_client()._search_ids([3, 150, 7], None, None)
+	assert sorted(sound['id'] for sound in page['results']) == [3, 7, 150]
+	assert api.searches[-1]['filter'] == "id:(3 OR 150 OR 7)" and api.searches[-1]['page_size'] == "3"
+	assert [sound['id'] for sound in make_client()._search_ids([9], None, None)['results']] == [9]
+
+def test_get_tracks_info_keys_the_sounds_by_id(make_client, fake_api):
+	api = fake_api(400)
+	tracks = make_client().get_tracks_info([*range(1, 301), 5, 9999], workers=3)
+	assert sorted(tracks) == list(range(1, 301))
+	assert tracks[42].name == "s42.wav"
+	# the repeated id is requested once, the missing one is left out
+	assert len(api.searches) == 3
+
+def test_get_all_pages_keeps_the_order_of_the_pages(make_client, fake_api, monkeypatch):
+	api = fake_api(97)
+	get_next_page = api.get_next_page
+	def slow_get_next_page(url:str, token:str):
+		# the first pages are the slowest: they complete last
+		time.sleep(0.05 / int(freesound_api._next_page_params(url)['page']))
+		return get_next_page(url, token)
+	monkeypatch.setattr(freesound_api, "get_next_page", slow_get_next_page)
+	client = make_client()
+	client.search("x", page_size=10)
+	results = client.get_all_pages(workers=8)
+	# 9 full pages and a last page of 7 results
+	assert sorted(api.pages) == list(range(1, 11))
+	assert [sound['id'] for sound in results['results']] == list(range(1, 98))
+	assert results['count'] == 97
+	assert client.get_all_pages() is client.results_list
+
+def test_get_all_pages_stops_after_max_pages(make_client, fake_api):
+	api = fake_api(97)
+	client = make_client()
+	client.search("x", page_size=10)
+	client.get_all_pages(workers=2, max_pages=3)
+	assert sorted(api.pages) == [1, 2, 3, 4]
+	assert len(client.results_list['results']) == 40
+
+def test_iter_search_fetches_pages_lazily(make_client, fake_api):
+	api = fake_api(100)
+	client = make_client()
+	sounds = client.iter_search("x", page_size=10)
+	assert api.pages == []
+	first = next(sounds)
+	assert first.id == 1 and first.name == "s1.wav"
+	assert api.pages == [1]
+	assert [sound.id for sound in itertools.islice(sounds, 14)] == list(range(2, 16))
+	assert api.pages == [1, 2]
+	sounds.close()
+	assert api.pages == [1, 2]
+	assert client.results_list['results'] == [] and client.results_list['count'] == 0
+
+def test_iter_search_limit(make_client, fake_api):
+	api = fake_api(100)
+	client = make_client()
+	assert [sound.id for sound in client.iter_search("x", page_size=10, limit=20)] == list(range(1, 21))
+	# the limit ends on the last result of a page: the next page is not requested
+	assert api.pages == [1, 2]
+	assert len(list(client.iter_search("x", page_size=10, limit=1000))) == 100
+	assert list(client.iter_search("x", limit=0)) == []
+
+def yearly_sounds() -> list[dict]:
+	start = datetime(2020, 1, 1)
+	sounds = [{'id':sound_id, 'name':f"s{sound_id}", 'type':'wav', 'created':(start + timedelta(hours=37 * sound_id)).isoformat()} for sound_id in range(1, 231)]
+	# created exactly in the middle of 2020: both halves of the first split contain it
+	sounds.append({'id':999, 'name':"middle", 'type':'wav', 'created':"2020-07-02T00:00:00"})
+	return sounds
+
+def test_plan_date_shards_splits_until_the_target(make_client, fake_api):
+	sounds = yearly_sounds()
+	fake_api(sounds)
+	shards = make_client().plan_date_shards("x", target=40, start=datetime(2020, 1, 1), end=datetime(2021, 1, 1), workers=4)
+	assert len(shards) >= len(sounds) / 40
+	assert all(0 < shard.count <= 40 for shard in shards)
+	assert shards[0].start == datetime(2020, 1, 1)
+	for previous, shard in zip(shards, shards[1:]):
+		assert previous.end <= shard.start
+	covered = [sound['id'] for shard in shards for sound in LocalFilter(shard.filter).select(sounds)]
+	assert set(covered) == {sound['id'] for sound in sounds}
+	# the sound created on the boundary of two shards belongs to both
+	assert covered.count(999) == 2
+
+def test_plan_date_shards_keeps_a_small_query_whole(make_client, fake_api):
+	api = fake_api(yearly_sounds())
+	shards = make_client().plan_date_shards("x", target=1000, start=datetime(2020, 1, 1), end=datetime(2021, 1, 1))
+	assert len(shards) == 1 and shards[0].count == 231
+	assert len(api.searches) == 1
+
+def test_sharded_search_merges_the_shards_without_duplicates(make_client, fake_api):
+	sounds = yearly_sounds()
+	fake_api(sounds)
+	client = make_client()
+	merged = client.sharded_search("x", target=40, start=datetime(2020, 1, 1), end=datetime(2021, 1, 1), workers=4)
+	ids = [sound['id'] for sound in merged['results']]
+	assert len(ids) == len(set(ids)) == merged['count'] == len(sounds)
+	assert set(ids) == {sound['id'] for sound in sounds}
+	assert client.results_list['count'] == len(sounds)
+
+def test_concurrent_downloads_keep_the_order_of_the_results(make_client, fake_api, monkeypatch):
+	fake_api(60)
+	generator = random.Random(3)
+	delays = {sound_id:generator.random() * 0.02 for sound_id in range(1, 61)}
+	def download_track(track_url:str, token:str, output_path:str, *args) -> int:
+		time.sleep(delays[sound_id(track_url)])
+		with open(output_path, "w") as file:
+			file.write(track_url)
+		return 1
+	monkeypatch.setattr(freesound_api, "download_track", download_track)
+	client = make_client()
+	client.search("x", page_size=25)
+	client.download_results(files_count=55, workers=8)
+	assert [sound['id'] for sound in client.download_list['downloaded-files']] == list(range(1, 56))
+	assert client.download_list['count'] == 55
+
+def test_the_download_list_is_updated_safely_from_many_threads(make_client, tmp_path):
+	manifest = str(tmp_path / "downloads.jsonl")
+	client = make_client(download_manifest=manifest)
+	def record(thread:int) -> None:
+		for number in range(200):
+			client._update_download_list({'id':thread * 1000 + number, 'name':"s"}, number, "s.wav")
+	with ThreadPoolExecutor(max_workers=16) as executor:
+		list(executor.map(record, range(16)))
+	files = client.download_list['downloaded-files']
+	assert len(files) == 16 * 200
+	assert sorted(sound['id'] for sound in read_jsonl(manifest)) == sorted(sound['id'] for sound in files)
+
+def written_file(folder, pattern:str) -> str:
+	paths = list(folder.glob(pattern))
+	assert len(paths) == 1
+	return str(paths[0])
+
+def test_spilled_results_are_written_and_loaded_in_full(make_client, fake_api, tmp_path, capsys):
+	fake_api(45)
+	spill = str(tmp_path / "spill.jsonl")
+	client = make_client(spill_results=spill)
+	client.search("x", page_size=10)
+	client.get_all_pages()
+	results = client.results_list['results']
+	assert isinstance(results, SpilledResults) and len(results) == 45
+	assert [sound['id'] for sound in read_jsonl(spill)] == list(range(1, 46))
+
+	client.write_results_list("results.json", str(tmp_path / "json"))
+	client.write_results_list("results.jsonl", str(tmp_path / "jsonl"))
+	written_json = written_file(tmp_path / "json", "*results.json")
+	with open(written_json) as file:
+		assert [sound['id'] for sound in json.load(file)['results']] == list(range(1, 46))
+	assert [sound['id'] for sound in read_jsonl(written_file(tmp_path / "jsonl", "*results.jsonl"))] == list(range(1, 46))
+
+	other = make_client(spill_results=str(tmp_path / "other.jsonl"))
+	other.load_results_list(written_json)
+	assert isinstance(other.results_list['results'], SpilledResults)
+	assert len(other.results_list['results']) == 45
+	capsys.readouterr()
+	other.dump_results()
+	assert capsys.readouterr().out.count("s45") == 1
+	other.write_results_list("again.json", str(tmp_path / "again"))
+	with open(written_file(tmp_path / "again", "*again.json")) as file:
+		assert len(json.load(file)['results']) == 45
+
+def test_results_that_are_not_kept_still_reach_the_manifests(make_client, fake_api, fake_downloads, tmp_path):
+	fake_api(30)
+	results, downloads = str(tmp_path / "results.jsonl"), str(tmp_path / "downloads.jsonl")
+	client = make_client(keep_results=False, results_manifest=results, download_manifest=downloads)
+	client.search("x", page_size=10)
+	client.download_results(files_count=25)
+	assert client.results_list['results'] == [] and client.results_list['count'] == 30
+	assert [sound['id'] for sound in read_jsonl(results)] == list(range(1, 31))
+	assert [(sound['id'], sound['path']) for sound in read_jsonl(downloads)] == [(number, f"s{number}.wav") for number in range(1, 26)]
+	# a new client appends to the manifests
+	make_client(results_manifest=results).search("x", page_size=10)
+	assert len(list(read_jsonl(results))) == 40
+
+def test_a_killed_crawl_is_counted_exactly(make_client, fake_api, monkeypatch, tmp_path):
+	fake_api(60)
+	path = str(tmp_path / "crawl.json")
+	snapshot = str(tmp_path / "snapshot.json")
+	downloaded:list[int] = []
+	def download_track(track_url:str, token:str, output_path:str, *args) -> int:
+		if sound_id(track_url) == 35:
+			# the checkpoint as a `kill -9` would leave it: the `finally` of download_results never runs
+			shutil.copy(path, snapshot)
+			raise Killed()
+		downloaded.append(sound_id(track_url))
+		with open(output_path, "w") as file:
+			file.write(track_url)
+		return 1
+	monkeypatch.setattr(freesound_api, "download_track", download_track)
+	client = make_client()
+	client.search("x", page_size=10)
+	with pytest.raises(Killed):
+		client.download_results(files_count=50, workers=4, checkpoint=CrawlCheckpoint(path))
+	# the other workers may have written files that the snapshot does not know about
+	assert CrawlCheckpoint.load(snapshot).downloaded <= len(downloaded)
+	monkeypatch.setattr(freesound_api, "download_track", lambda track_url, token, output_path, *args: downloaded.append(sound_id(track_url)) or 1)
+	client = make_client()
+	client.resume(snapshot, workers=4)
+	# every file is downloaded once and the crawl stops at `files_count`
+	assert sorted(downloaded) == list(range(1, 51))
+	assert CrawlCheckpoint.load(snapshot).downloaded == 50
+	assert CrawlCheckpoint.load(snapshot).finished
@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import pytest
+
+from freesound.freesound_crawl import CrawlCheckpoint, DateShard
+from freesound.freesound_index import DownloadIndex
+
+
+def test_checkpoint_round_trip(tmp_path:Any):
+	path = str(tmp_path / "crawl.json")
+	checkpoint = CrawlCheckpoint(path, interval=0)
+	checkpoint.start({'query':'piano'}, "lib", 100, "flat")
+	checkpoint.enter_page("https://freesound.org/apiv2/search/text/?page=2")
+	checkpoint.complete(5)
+	checkpoint.complete(6)
+	loaded = CrawlCheckpoint.load(path)
+	assert loaded.search_args == {'query':'piano'}
+	assert loaded.files_count == 100 and loaded.layout == "flat"
+	assert loaded.page_url.endswith("page=2")
+	assert loaded.completed == {5, 6} and loaded.downloaded == 2
+	assert not loaded.finished
+
+def test_a_new_page_forgets_the_completed_sounds(tmp_path:Any):
+	checkpoint = CrawlCheckpoint(str(tmp_path / "crawl.json"))
+	checkpoint.enter_page(None)
+	checkpoint.complete(1)
+	checkpoint.enter_page(None)
+	assert checkpoint.completed == {1}
+	checkpoint.enter_page("next")
+	assert checkpoint.completed == set() and checkpoint.downloaded == 1
+
+def test_finish_is_saved(tmp_path:Any):
+	path = str(tmp_path / "crawl.json")
+	CrawlCheckpoint(path).finish()
+	assert CrawlCheckpoint.load(path).finished
+
+def test_shard_filter_is_in_utc():
+	start = datetime(2010, 1, 1, 1, 0, 0, 500, tzinfo=timezone(timedelta(hours=1)))
+	shard = DateShard(start, datetime(2011, 1, 1))
+	assert shard.filter == "created:[2010-01-01T00:00:00Z TO 2011-01-01T00:00:00Z]"
+	assert shard.apply("type:wav") == "type:wav " + shard.filter
+
+def test_split_halves_share_the_middle():
+	shard = DateShard(datetime(2010, 1, 1), datetime(2010, 1, 3))
+	first, second = shard.split()
+	assert first.start == shard.start and second.end == shard.end
+	assert first.end == second.start == datetime(2010, 1, 2)
+
+def test_one_second_shards_can_not_be_split():
+	assert not DateShard(datetime(2010, 1, 1), datetime(2010, 1, 1, 0, 0, 1)).can_split()
+	assert DateShard(datetime(2010, 1, 1), datetime(2010, 1, 1, 0, 0, 2)).can_split()
+
+def test_end_before_start():
+	with pytest.raises(ValueError):
+		DateShard(datetime(2011, 1, 1), datetime(2010, 1, 1))
+
+def test_every_download_is_saved_by_default(tmp_path:Any):
+	path = str(tmp_path / "crawl.json")
+	checkpoint = CrawlCheckpoint(path)
+	checkpoint.enter_page(None)
+	checkpoint.complete(1)
+	checkpoint.complete(2)
+	assert CrawlCheckpoint.load(path).downloaded == 2
+
+def test_an_interval_delays_the_saves_within_a_page(tmp_path:Any):
+	path = str(tmp_path / "crawl.json")
+	checkpoint = CrawlCheckpoint(path, interval=3600)
+	checkpoint.enter_page(None)
+	checkpoint.complete(1)
+	assert CrawlCheckpoint.load(path).downloaded == 0
+
+def test_reconcile_recovers_the_downloads_of_the_current_page(tmp_path:Any):
+	index = DownloadIndex(str(tmp_path))
+	index.add(1, "s1.wav")
+	checkpoint = CrawlCheckpoint(str(tmp_path / "crawl.json"))
+	checkpoint.enter_page("page-2")
+	checkpoint.complete(2)
+	index.add(2, "s2.wav")
+	index.add(3, "s3.wav")
+	# the sound 1 was downloaded before the page was entered: it is not part of the crawl
+	assert checkpoint.reconcile([1, 2, 3, 4], index) == [3]
+	loaded = CrawlCheckpoint.load(str(tmp_path / "crawl.json"))
+	assert loaded.completed == {2, 3} and loaded.downloaded == 2
+	# entering the same page again keeps its start
+	loaded.enter_page("page-2")
+	assert loaded.page_started == checkpoint.page_started
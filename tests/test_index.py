@@ -0,0 +1,36 @@
+from typing import Any
+
+from freesound.freesound_index import DownloadIndex
+
+
+def test_records_and_owners(tmp_path:Any):
+	index = DownloadIndex(str(tmp_path))
+	index.add(1, "a.wav", 10, "md5a")
+	index.add(2, "b.wav")
+	assert 1 in index and "1" in index and 3 not in index and None not in index
+	assert len(index) == 2
+	assert index.get(1)['size'] == 10
+	assert index.owner("b.wav") == 2
+	assert index.owner("c.wav") is None
+
+def test_reloaded_from_disk(tmp_path:Any):
+	DownloadIndex(str(tmp_path)).add(1, "a.wav")
+	index = DownloadIndex(str(tmp_path))
+	assert index.get(1)['path'] == "a.wav"
+
+def test_a_moved_sound_releases_its_old_path(tmp_path:Any):
+	index = DownloadIndex(str(tmp_path))
+	index.add(1, "a.wav")
+	index.add(1, "sub/a.wav")
+	assert index.owner("a.wav") is None
+	assert index.owner("sub/a.wav") == 1
+
+def test_torn_append_does_not_break_later_runs(tmp_path:Any):
+	index = DownloadIndex(str(tmp_path))
+	index.add(1, "a.wav")
+	# the process dies in the middle of the next append
+	with open(index.path, "a") as file:
+		file.write('{"id":2,"pa')
+	DownloadIndex(str(tmp_path)).add(3, "c.wav")
+	index = DownloadIndex(str(tmp_path))
+	assert 1 in index and 2 not in index and 3 in index
@@ -0,0 +1,67 @@
+import io
+import json
+from typing import Any
+
+from freesound.freesound_jsonl import JsonlManifest, SpilledResults, append_jsonl, dump_json, read_jsonl, repair_jsonl
+
+
+def test_append_and_read(tmp_path:Any):
+	path = str(tmp_path / "records.jsonl")
+	assert append_jsonl(path, [{'id':1}, {'id':2}]) == 2
+	assert append_jsonl(path, [{'id':3}]) == 1
+	assert list(read_jsonl(path)) == [{'id':1}, {'id':2}, {'id':3}]
+	# one compact line per record
+	assert open(path).read() == '{"id":1}\n{"id":2}\n{"id":3}\n'
+
+def test_corrupted_lines_are_skipped(tmp_path:Any, capsys:Any):
+	path = tmp_path / "records.jsonl"
+	path.write_text('{"id":1}\n{"id":2,"pa{"id":3}\n{"id":4}\n{"id":5,"pa')
+	assert list(read_jsonl(str(path))) == [{'id':1}, {'id':4}]
+	assert "line 2" in capsys.readouterr().out
+
+def test_repair_removes_a_torn_last_line(tmp_path:Any):
+	path = tmp_path / "records.jsonl"
+	path.write_text('{"id":1}\n{"id":2,"pa')
+	repair_jsonl(str(path))
+	append_jsonl(str(path), [{'id':3}])
+	assert list(read_jsonl(str(path))) == [{'id':1}, {'id':3}]
+
+def test_repair_keeps_complete_files(tmp_path:Any):
+	path = tmp_path / "records.jsonl"
+	path.write_text('{"id":1}\n')
+	repair_jsonl(str(path))
+	assert path.read_text() == '{"id":1}\n'
+	repair_jsonl(str(tmp_path / "missing.jsonl"))
+	path.write_text('{"id":1')
+	repair_jsonl(str(path))
+	assert path.read_text() == ''
+
+def test_spilled_results(tmp_path:Any):
+	path = tmp_path / "spill.jsonl"
+	path.write_text('{"id":0}\n')
+	results = SpilledResults(str(path))
+	assert len(results) == 0
+	results.extend([{'id':1}, {'id':2}])
+	results.append({'id':3})
+	assert len(results) == 3
+	assert [record['id'] for record in results] == [1, 2, 3]
+	results.clear()
+	assert len(results) == 0 and list(results) == []
+
+def test_dump_json_streams_spilled_results(tmp_path:Any):
+	results = SpilledResults(str(tmp_path / "spill.jsonl"))
+	results.extend([{'id':1, 'name':'a'}, {'id':2, 'name':'b'}])
+	file = io.StringIO()
+	dump_json({'results':results, 'count':2}, file)
+	assert json.loads(file.getvalue()) == {'results':[{'id':1, 'name':'a'}, {'id':2, 'name':'b'}], 'count':2}
+
+def test_manifest_survives_a_crash(tmp_path:Any):
+	path = str(tmp_path / "manifest.jsonl")
+	manifest = JsonlManifest(path)
+	manifest.extend([{'id':1}, {'id':2}])
+	with open(path, "a") as file:
+		file.write('{"id":3,"na')
+	reopened = JsonlManifest(path)
+	reopened.append({'id':4})
+	assert reopened.written == 1
+	assert [record['id'] for record in reopened] == [1, 2, 4]
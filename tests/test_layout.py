@@ -0,0 +1,31 @@
+import os
+
+import pytest
+
+from freesound.freesound_errors import DataError
+from freesound.freesound_layout import FreeSoundLayout
+from freesound.freesound_sound import FreeSoundSoundInstance
+
+
+SOUND = FreeSoundSoundInstance({'id':524545, 'name':'Piano12', 'type':'wav', 'pack_name':'My Pack', 'username':'jo/vica'})
+
+def test_flat():
+	assert FreeSoundLayout.relative_path(FreeSoundLayout.flat, SOUND) == "Piano12.wav"
+
+def test_id_prefix():
+	assert FreeSoundLayout.relative_path(FreeSoundLayout.id_prefix, SOUND) == os.path.join("52", "45", "524545_Piano12.wav")
+	short = FreeSoundSoundInstance({'id':7, 'name':'a', 'type':'wav'})
+	assert FreeSoundLayout.relative_path(FreeSoundLayout.id_prefix, short) == os.path.join("00", "07", "7_a.wav")
+
+def test_folders_are_safe_names():
+	assert FreeSoundLayout.relative_path(FreeSoundLayout.pack_name, SOUND) == os.path.join("My-Pack", "Piano12.wav")
+	assert FreeSoundLayout.relative_path(FreeSoundLayout.username, SOUND) == os.path.join("jo-vica", "Piano12.wav")
+
+def test_missing_pack_or_user():
+	sound = FreeSoundSoundInstance({'id':1, 'name':'a', 'type':'wav', 'pack_name':'..'})
+	assert FreeSoundLayout.relative_path(FreeSoundLayout.pack_name, sound) == os.path.join("no-pack", "a.wav")
+	assert FreeSoundLayout.relative_path(FreeSoundLayout.username, sound) == os.path.join("no-user", "a.wav")
+
+def test_invalid_layout():
+	with pytest.raises(DataError):
+		FreeSoundLayout.validate("by-date")
@@ -0,0 +1,59 @@
+import pytest
+
+from freesound.filter_types import Filter
+from freesound.freesound_errors import DataError
+from freesound.freesound_filters import FreeSoundFilters
+from freesound.freesound_local_filter import LocalFilter
+
+SOUNDS = [
+	{'id':1, 'name':'Piano12', 'type':'wav', 'duration':2.5, 'tags':['Piano', 'plucked'], 'created':'2019-05-01T10:00:00Z',
+		'description':'A grand piano note', 'geotag':'41.3 2.1', 'ac_analysis':{'ac_loudness':-20.0}},
+	{'id':2, 'name':'rain.aiff', 'type':'aiff', 'duration':30.0, 'tags':['rain', 'nature'], 'created':'2021-02-01T00:00:00.123Z',
+		'description':'rain on a grand roof, piano in the distance', 'geotag':None, 'ac_analysis':{'ac_loudness':-40.0}},
+	{'id':3, 'name':'kick', 'type':'mp3', 'duration':0.5, 'tags':['drum'], 'created':'2020-06-01T00:00:00Z',
+		'description':'kick drum', 'geotag':None, 'ac_analysis':{}},
+	{'id':4, 'name':'no fields'},
+]
+
+def selected(filter:"str|FreeSoundFilters") -> list[int]:
+	return [sound['id'] for sound in LocalFilter(filter).select(SOUNDS)]
+
+def test_equality_is_case_insensitive():
+	assert selected(FreeSoundFilters(type="WAV")) == [1]
+
+def test_or_and_and_groups():
+	assert selected(FreeSoundFilters(type=Filter.OR("wav", "aiff"))) == [1, 2]
+	assert selected(FreeSoundFilters(id=Filter.OR(1, 3, 99))) == [1, 3]
+	assert selected(FreeSoundFilters(tag=Filter.AND("rain", "nature"))) == [2]
+	assert selected(FreeSoundFilters(tag=Filter.AND("rain", "piano"))) == []
+
+def test_numeric_ranges():
+	assert selected(FreeSoundFilters(duration=Filter.RANGE(1, 30))) == [1, 2]
+	assert selected(FreeSoundFilters(duration=Filter.AT_LEAST(2.5))) == [1, 2]
+	assert selected(FreeSoundFilters(duration=Filter.UP_TO(2.5))) == [1, 3]
+	assert selected(FreeSoundFilters(ac_loudness=Filter.AT_LEAST(-30))) == [1]
+
+def test_created_ranges():
+	assert selected(FreeSoundFilters(created=Filter.UP_TO("2020-01-01T00:00:00Z"))) == [1]
+	assert selected(FreeSoundFilters(created=Filter.RANGE("2020-01-01T00:00:00Z", "NOW"))) == [2, 3]
+
+def test_tags_and_text():
+	assert selected(FreeSoundFilters(tag=["piano", "plucked"])) == [1]
+	assert selected(FreeSoundFilters(description="grand piano")) == [1]
+	assert selected(FreeSoundFilters(description="piano")) == [1, 2]
+	assert selected(FreeSoundFilters(original_filename="rain")) == [2]
+
+def test_booleans_and_terms_are_combined():
+	assert selected(FreeSoundFilters(is_geotagged=True)) == [1]
+	assert selected(FreeSoundFilters(is_geotagged=False)) == [2, 3]
+	assert selected(FreeSoundFilters(type=Filter.OR("wav", "mp3"), duration=Filter.UP_TO(1))) == [3]
+
+def test_mask_matches_select():
+	filter = LocalFilter(FreeSoundFilters(duration=Filter.AT_LEAST(1), tag="piano"))
+	assert list(filter.mask(SOUNDS)) == [filter(sound) for sound in SOUNDS] == [True, False, False, False]
+	assert filter.fields == ["duration", "tag"]
+
+@pytest.mark.parametrize("text", ["type:wav garbage", "duration:[1 TO]", "duration:[a TO 2]", "created:[yesterday TO *]"])
+def test_invalid_filters(text:str):
+	with pytest.raises(DataError):
+		LocalFilter(text)
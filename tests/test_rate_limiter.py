@@ -0,0 +1,64 @@
+import pytest
+
+import freesound.freesound_rate_limiter as rate_limiter
+from freesound.freesound_rate_limiter import RateLimiter, TokenBucket
+
+
+class FakeClock:
+	def __init__(self) -> None:
+		self.now = 1000.0
+
+	def __call__(self) -> float:
+		return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch:pytest.MonkeyPatch) -> FakeClock:
+	fake = FakeClock()
+	monkeypatch.setattr(rate_limiter, "monotonic", fake)
+	return fake
+
+def test_bucket_rejects_empty_configuration():
+	with pytest.raises(ValueError):
+		TokenBucket(0, 60)
+	with pytest.raises(ValueError):
+		TokenBucket(10, 0)
+
+def test_burst_up_to_capacity_then_wait(clock:FakeClock):
+	limiter = RateLimiter(per_minute=3, per_day=None)
+	assert [limiter.reserve() for _ in range(3)] == [0, 0, 0]
+	# one token every 20 seconds
+	assert limiter.reserve() == pytest.approx(20)
+	clock.now += 10
+	assert limiter.reserve() == pytest.approx(10)
+	clock.now += 10
+	assert limiter.reserve() == 0
+
+def test_bucket_never_exceeds_capacity(clock:FakeClock):
+	limiter = RateLimiter(per_minute=2, per_day=None)
+	clock.now += 3600
+	assert [limiter.reserve() for _ in range(2)] == [0, 0]
+	assert limiter.reserve() > 0
+
+def test_daily_limit_applies_with_minute_tokens_left(clock:FakeClock):
+	limiter = RateLimiter(per_minute=60, per_day=2)
+	assert [limiter.reserve() for _ in range(2)] == [0, 0]
+	# a daily token every 12 hours, while the minute bucket is almost full
+	assert limiter.reserve() == pytest.approx(12 * 60 * 60)
+
+def test_rejected_reservation_consumes_nothing(clock:FakeClock):
+	limiter = RateLimiter(per_minute=1, per_day=10)
+	assert limiter.reserve() == 0
+	for _ in range(5):
+		assert limiter.reserve() > 0
+	clock.now += 60
+	assert limiter.reserve() == 0
+
+def test_penalize_drains_the_minute_bucket(clock:FakeClock):
+	limiter = RateLimiter(per_minute=60, per_day=None)
+	limiter.penalize()
+	assert limiter.reserve() == pytest.approx(1)
+
+def test_no_limits():
+	limiter = RateLimiter(per_minute=None, per_day=None)
+	assert all(limiter.reserve() == 0 for _ in range(1000))
@@ -0,0 +1,79 @@
+import pytest
+
+import freesound.freesound_requests as freesound_requests
+from freesound.freesound_rate_limiter import RateLimiter
+
+
+class CountingLimiter(RateLimiter):
+	def __init__(self) -> None:
+		super().__init__(per_minute=1000, per_day=1000)
+		self.acquired = 0
+
+	def acquire(self) -> None:
+		self.acquired += 1
+		super().acquire()
+
+@pytest.fixture
+def fresh_session():
+	"""a new shared session, the previous one is put back afterwards"""
+	session, settings = freesound_requests._session, dict(freesound_requests._session_settings)
+	freesound_requests._session = None
+	yield
+	freesound_requests.close_session()
+	freesound_requests._session = session
+	freesound_requests._session_settings.update(settings)
+
+def pool_maxsize(url:str="https://freesound.org") -> int:
+	return freesound_requests.get_session().get_adapter(url)._pool_maxsize
+
+def test_the_session_is_shared(fresh_session):
+	session = freesound_requests.get_session()
+	assert freesound_requests.get_session() is session
+	assert pool_maxsize() == 10
+
+def test_configure_session_closes_the_previous_session(fresh_session, monkeypatch):
+	session = freesound_requests.get_session()
+	closed = []
+	monkeypatch.setattr(session, "close", lambda: closed.append(True))
+	new_session = freesound_requests.configure_session(pool_maxsize=3, keep_alive=False)
+	assert new_session is not session and freesound_requests.get_session() is new_session
+	assert closed == [True]
+	assert pool_maxsize("http://localhost") == 3
+	assert new_session.headers["Connection"] == "close"
+
+def test_connections_are_reused_across_requests(fresh_session, file_server, no_limits):
+	file_server.files["/page"] = b"{}"
+	url = file_server.url("/page")
+	for _ in range(3):
+		freesound_requests.make_get_request(url, cache=False)
+	pool = freesound_requests.get_session().get_adapter(url).poolmanager.connection_from_url(url)
+	assert pool.num_connections == 1
+	assert len(file_server.requests) == 3
+
+def test_ensure_pool_size_only_grows_the_pool(fresh_session):
+	session = freesound_requests.configure_session(pool_maxsize=8, pool_block=True, keep_alive=False)
+	assert freesound_requests.ensure_pool_size(8) is session
+	grown = freesound_requests.ensure_pool_size(17)
+	assert grown is not session and pool_maxsize() == 17
+	assert grown.get_adapter("https://freesound.org")._pool_block
+	assert grown.headers["Connection"] == "close"
+
+@pytest.mark.parametrize("prefetch, size", [(1, 17), (0, 16)])
+def test_download_results_fits_the_pool_to_the_workers(fresh_session, make_client, fake_api, fake_downloads, prefetch, size):
+	fake_api(40)
+	client = make_client()
+	client.search("x", page_size=20)
+	client.download_results(files_count=40, workers=16, prefetch=prefetch)
+	assert len(fake_downloads) == 40
+	assert pool_maxsize() == size
+
+def test_the_rate_limiter_is_consulted_for_every_request(file_server, no_limits):
+	limiter = CountingLimiter()
+	freesound_requests._rate_limiter = limiter
+	file_server.files["/page"] = b"{}"
+	file_server.statuses["/page"] = [503]
+	freesound_requests.make_get_request(file_server.url("/page"), cache=False)
+	freesound_requests.make_get_request(file_server.url("/page"), cache=False)
+	# the retry of the 503 goes through the limiter too
+	assert limiter.acquired == 3
+	assert len(file_server.requests) == 3
@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from freesound.freesound_errors import ThrottlingError
+from freesound.freesound_retry import RetryPolicy
+
+
+def test_should_retry_transient_statuses_only():
+	policy = RetryPolicy(max_attempts=3)
+	assert policy.should_retry(1, None)
+	assert policy.should_retry(1, 429)
+	assert policy.should_retry(2, 503)
+	assert not policy.should_retry(1, 404)
+	assert not policy.should_retry(3, 503)
+
+def test_exponential_backoff_without_jitter():
+	policy = RetryPolicy(backoff_factor=0.5, max_backoff=3, jitter=False)
+	assert [policy.delay(attempt) for attempt in range(1, 6)] == [0.5, 1, 2, 3, 3]
+
+def test_jitter_stays_below_the_backoff():
+	policy = RetryPolicy(backoff_factor=1, max_backoff=60, jitter=True)
+	assert all(0 <= policy.delay(4) <= 8 for _ in range(100))
+
+def test_retry_after_seconds_is_honoured_in_full():
+	policy = RetryPolicy(backoff_factor=0.1, max_backoff=60)
+	assert policy.delay(1, retry_after="45") == 45
+
+def test_retry_after_http_date():
+	policy = RetryPolicy(max_backoff=60)
+	retry_date = datetime.now(timezone.utc) + timedelta(seconds=30)
+	assert 25 <= policy.delay(1, retry_after=format_datetime(retry_date, usegmt=True)) <= 30
+
+def test_retry_after_longer_than_max_backoff_gives_up():
+	policy = RetryPolicy(max_backoff=60)
+	with pytest.raises(ThrottlingError):
+		policy.delay(1, retry_after="3600")
+
+def test_invalid_retry_after_falls_back_to_backoff():
+	policy = RetryPolicy(backoff_factor=2, jitter=False)
+	assert policy.delay(2, retry_after="soon") == 4
+
+def test_at_least_one_attempt():
+	with pytest.raises(ValueError):
+		RetryPolicy(max_attempts=0)
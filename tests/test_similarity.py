@@ -0,0 +1,82 @@
+import pytest
+
+numpy = pytest.importorskip("numpy")
+
+from freesound.freesound_analysis import descriptor_matrix
+from freesound.freesound_similarity import SimilarityIndex
+
+
+def make_results(count:int, dimensions:int=4, seed:int=1) -> list[dict]:
+	generator = numpy.random.default_rng(seed)
+	return [
+		{'id':sound_id, 'name':f"s{sound_id}", 'analysis':{'lowlevel':{'mfcc':[float(value) for value in generator.normal(size=dimensions)]}}}
+		for sound_id in range(1, count + 1)
+	]
+
+def standardized(results:list[dict]) -> "numpy.ndarray":
+	values = numpy.asarray([sound['analysis']['lowlevel']['mfcc'] for sound in results], dtype=numpy.float64)
+	return (values - values.mean(axis=0)) / values.std(axis=0)
+
+def index_for(results:list[dict], **kwargs) -> SimilarityIndex:
+	return SimilarityIndex(descriptor_matrix(results, ["lowlevel.mfcc"]), results, **kwargs)
+
+@pytest.mark.parametrize("metric", ["cosine", "l2"])
+def test_exact_nearest_neighbours(metric:str):
+	results = make_results(60)
+	vectors = standardized(results)
+	if metric == "cosine":
+		vectors /= numpy.linalg.norm(vectors, axis=1, keepdims=True)
+		expected_scores = -(vectors @ vectors[0])
+	else:
+		expected_scores = numpy.linalg.norm(vectors - vectors[0], axis=1)
+	expected_scores[0] = numpy.inf
+	expected = [int(row) + 1 for row in numpy.argsort(expected_scores)[:5]]
+
+	neighbours = index_for(results, metric=metric).similar_to(1, k=5)
+	assert [sound.id for sound, _ in neighbours] == expected
+	scores = [score for _, score in neighbours]
+	assert scores == sorted(scores, reverse=(metric == "cosine"))
+	if metric == "l2":
+		assert scores == pytest.approx(sorted(expected_scores)[:5], rel=1e-4)
+
+def test_query_finds_the_sound_itself():
+	results = make_results(30)
+	index = index_for(results, metric="l2")
+	sound, distance = index.query(results[7]['analysis']['lowlevel']['mfcc'], k=1)[0]
+	assert sound.id == 8
+	assert distance == pytest.approx(0, abs=1e-3)
+
+def test_similar_to_many_matches_similar_to():
+	index = index_for(make_results(40))
+	many = index.similar_to_many([1, 2, 3], k=4)
+	for sound_id in (1, 2, 3):
+		assert [sound.id for sound, _ in many[sound_id]] == [sound.id for sound, _ in index.similar_to(sound_id, k=4)]
+		assert sound_id not in [sound.id for sound, _ in many[sound_id]]
+
+def test_k_larger_than_the_index():
+	index = index_for(make_results(3))
+	assert len(index.similar_to(1, k=10)) == 2
+
+def test_repeated_sounds_are_not_their_own_neighbours():
+	results = make_results(10)
+	index = index_for(results + results[:3])
+	assert len(index) == 10
+	for sound_id in (1, 2, 3):
+		ids = [sound.id for sound, _ in index.similar_to(sound_id, k=9)]
+		assert sound_id not in ids
+		assert len(ids) == len(set(ids)) == 9
+
+def test_clustered_index():
+	index = index_for(make_results(200, seed=3), clusters=8, probes=8)
+	assert index.approximate
+	exact = index_for(make_results(200, seed=3))
+	# probing every cluster is an exact search
+	assert [sound.id for sound, _ in index.similar_to(5, k=5)] == [sound.id for sound, _ in exact.similar_to(5, k=5)]
+
+def test_invalid_arguments():
+	with pytest.raises(ValueError):
+		index_for(make_results(3), metric="manhattan")
+	with pytest.raises(ValueError):
+		index_for(make_results(3), clusters=0)
+	with pytest.raises(KeyError):
+		index_for(make_results(3)).similar_to(99)
@@ -0,0 +1,55 @@
+import pytest
+
+from freesound.freesound_errors import DataError, FieldError
+from freesound.freesound_fields import FIELD_NAMES, Field
+from freesound.freesound_sound import FreeSoundSoundInstance
+
+DATA = {'id':524545, 'name':'Piano12 B Flat', 'type':'mp3', 'tags':['note', 'Piano'], 'filesize':None}
+
+def test_fields_are_read_from_the_track_data():
+	sound = FreeSoundSoundInstance(DATA)
+	assert sound.id == 524545
+	assert sound.tags == ['note', 'Piano']
+	assert sound.type == "mp3"
+	assert sound.download is None
+	assert sound.track_data is DATA
+	assert sound.ensure_value("type") == "mp3"
+	with pytest.raises(FieldError):
+		sound.ensure_value("download")
+
+def test_name_becomes_a_file_name():
+	assert FreeSoundSoundInstance(DATA).name == "Piano12-B-Flat.mp3"
+	# the extension does not depend on the order of the keys
+	assert FreeSoundSoundInstance({'type':'wav', 'id':1, 'name':'kick'}).name == "kick.wav"
+	assert FreeSoundSoundInstance({'id':1, 'name':'kick.wav', 'type':'wav'}).name == "kick.wav"
+	assert FreeSoundSoundInstance({'id':1, 'name':'kick'}).name == "kick"
+
+def test_the_data_is_validated_against_the_field_names():
+	with pytest.raises(AttributeError):
+		FreeSoundSoundInstance({'id':1})
+	with pytest.raises(DataError):
+		FreeSoundSoundInstance({'id':1, 'name':'a', 'loudness':3})
+	assert set(FreeSoundSoundInstance.all().split(",")) == FIELD_NAMES
+	assert FreeSoundSoundInstance.all() == Field.all()
+
+def test_as_dict_round_trip():
+	sound = FreeSoundSoundInstance(DATA)
+	data = sound.as_dict()
+	assert data == {'id':524545, 'name':'Piano12-B-Flat.mp3', 'type':'mp3', 'tags':['note', 'Piano']}
+	assert FreeSoundSoundInstance(data).as_dict() == data
+
+def test_assigning_a_field_copies_the_data():
+	data = dict(DATA)
+	sound = FreeSoundSoundInstance(data)
+	sound.tags = ['changed']
+	sound.name = "renamed.mp3"
+	assert data == DATA
+	assert sound.tags == ['changed']
+	assert sound.as_dict()['tags'] == ['changed']
+	assert sound.as_dict()['name'] == "renamed.mp3"
+
+def test_instances_are_slotted():
+	sound = FreeSoundSoundInstance(DATA)
+	assert not hasattr(sound, "__dict__")
+	with pytest.raises(AttributeError):
+		sound.loudness = 3
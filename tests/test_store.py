@@ -0,0 +1,43 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+from typing import Any
+
+from freesound.freesound_store import ContentStore
+
+
+def test_add_and_link(tmp_path:Any):
+	store = ContentStore(str(tmp_path / "store"))
+	source = tmp_path / "download.wav"
+	source.write_bytes(b"audio")
+	store.add(str(source), "ABCDEF")
+	assert store.contains("abcdef")
+	assert store.path_for("abcdef") == os.path.join(str(tmp_path / "store"), "ab", "abcdef")
+	destination = tmp_path / "lib" / "copy.wav"
+	destination.parent.mkdir()
+	store.link("abcdef", str(destination))
+	assert destination.read_bytes() == b"audio"
+
+def test_link_replaces_an_existing_file(tmp_path:Any):
+	store = ContentStore(str(tmp_path / "store"))
+	source = tmp_path / "download.wav"
+	source.write_bytes(b"audio")
+	store.add(str(source), "abcdef")
+	destination = tmp_path / "old.wav"
+	destination.write_bytes(b"old")
+	store.link("abcdef", str(destination))
+	assert destination.read_bytes() == b"audio"
+
+def test_concurrent_links_of_the_same_md5(tmp_path:Any):
+	store = ContentStore(str(tmp_path / "store"))
+	source = tmp_path / "download.wav"
+	source.write_bytes(b"audio")
+	out = tmp_path / "out"
+	out.mkdir()
+	def link(position:int) -> None:
+		store.add(str(source), "abcdef")
+		store.link("abcdef", str(out / f"sound{position % 3}.wav"))
+	with ThreadPoolExecutor(max_workers=16) as executor:
+		list(executor.map(link, range(500)))
+	# no temporary file is left behind
+	assert sorted(os.listdir(out)) == ["sound0.wav", "sound1.wav", "sound2.wav"]
+	assert os.listdir(tmp_path / "store" / "ab") == ["abcdef"]
@@ -0,0 +1,39 @@
+from typing import Any
+
+from freesound.freesound_sync import SyncState
+
+
+def test_unknown_query_has_no_mark(tmp_path:Any):
+	assert SyncState(str(tmp_path / "sync.json")).mark("rain") is None
+
+def test_mark_follows_the_newest_sounds(tmp_path:Any):
+	path = str(tmp_path / "sync.json")
+	state = SyncState(path)
+	state.update("rain", "", [
+		{'id':1, 'created':'2024-01-01T10:00:00Z'},
+		{'id':3, 'created':'2024-01-02T10:00:00'},
+		{'id':2, 'created':'2024-01-02T10:00:00'},
+	])
+	mark = state.mark("rain")
+	assert mark is not None and mark['created'] == '2024-01-02T10:00:00' and mark['ids'] == [2, 3]
+	# older sounds do not move the mark back
+	state.update("rain", "", [{'id':9, 'created':'2023-01-01T00:00:00'}])
+	assert SyncState(path).mark("rain")['ids'] == [2, 3]
+
+def test_sounds_at_the_same_instant_are_added(tmp_path:Any):
+	state = SyncState(str(tmp_path / "sync.json"))
+	state.update("rain", "", [{'id':1, 'created':'2024-01-01T00:00:00'}])
+	state.update("rain", "", [{'id':4, 'created':'2024-01-01T00:00:00'}])
+	assert state.mark("rain")['ids'] == [1, 4]
+
+def test_queries_and_filters_are_separate(tmp_path:Any):
+	state = SyncState(str(tmp_path / "sync.json"))
+	state.update("rain", "type:wav", [{'id':1, 'created':'2024-01-01T00:00:00'}])
+	assert state.mark("rain") is None
+	assert state.mark("rain", "type:wav") is not None
+	assert len(state) == 1
+
+def test_nothing_new_writes_nothing(tmp_path:Any):
+	path = tmp_path / "sync.json"
+	SyncState(str(path)).update("rain", "", [])
+	assert not path.exists()
@@ -0,0 +1,18 @@
+import sys
+import os
+import asyncio
+
+sys.path.append(os.path.join(os.path.dirname(__file__),".."))
+
+from freesound import *
+
+API_KEY = "<your-api-key>"
+USER_ID = "<your-user-id>"
+
+async def main():
+	async with AsyncFreeSoundClient(USER_ID,API_KEY,max_concurrency=16) as c:
+		await c.search(query="piano", fields=Field.download, filter=FreeSoundFilters(type="wav").aslist, page_size=150)
+		await c.download_results(output_folder="tutorials/sound_lib",files_count=300)
+		print(c.download_list['count'])
+
+asyncio.run(main())
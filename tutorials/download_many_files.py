@@ -12,4 +12,4 @@ c = FreeSoundClient(USER_ID,API_KEY)
 
 filters = FreeSoundFilters(type="wav", samplerate=48000).aslist
 c.search(query="piano", fields=Field.download, filter=filters, page_size=100)
-c.download_results(output_folder="tutorials/sound_lib",files_count=100)
\ No newline at end of file
+c.download_results(output_folder="tutorials/sound_lib",files_count=100,workers=8)
\ No newline at end of file
@@ -0,0 +1,15 @@
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__),".."))
+
+from freesound import *
+
+API_KEY = "<your-api-key>"
+USER_ID = "<your-user-id>"
+
+c = FreeSoundClient(USER_ID,API_KEY)
+
+# pages are fetched one at a time while iterating and are never accumulated in c.results_list
+for sound in c.iter_search(query="rain", fields=FreeSoundFields([Field.duration,Field.username]).aslist, limit=1000):
+	print(sound.id, sound.name, sound.duration, sound.username)
@@ -0,0 +1,20 @@
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__),".."))
+
+from freesound import *
+
+API_KEY = "<your-api-key>"
+USER_ID = "<your-user-id>"
+
+CHECKPOINT = "rain_crawl.json"
+
+c = FreeSoundClient(USER_ID,API_KEY)
+
+if os.path.exists(CHECKPOINT):
+	# continue from the page where the previous run stopped
+	c.resume(CHECKPOINT, workers=8)
+else:
+	c.search(query="rain", fields=FreeSoundFields([Field.download,Field.filesize,Field.md5]).aslist, page_size=150)
+	c.download_results("rain_lib", 10000, workers=8, checkpoint=CrawlCheckpoint(CHECKPOINT))
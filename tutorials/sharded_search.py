@@ -0,0 +1,16 @@
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__),".."))
+
+from freesound import *
+
+API_KEY = "<your-api-key>"
+USER_ID = "<your-user-id>"
+
+c = FreeSoundClient(USER_ID,API_KEY)
+
+# the query is split into ranges of upload dates holding at most 5000 sounds each,
+# which are crawled at the same time and merged into a single list of results
+c.sharded_search(query="field-recording", filter=FreeSoundFilters(type="wav", samplerate=48000).aslist, fields=Field.download, target=5000)
+c.download_results("field_recordings", workers=8)